@@ -2,15 +2,25 @@ from flask import Flask, render_template, request, redirect, url_for, flash, ses
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
 from functools import wraps
 from src.config import Config
-from src.database import Database
+from src.database import Database, CART_REPORT_SORTS
 from src.forms import EmailSignupForm, RegistrationForm, LoginForm, EditProfileForm, CheckoutForm, ChangePasswordForm
-from src.email_utils import send_quote_notification, send_customer_confirmation, send_signup_confirmation, send_cake_topper_notification, send_print_service_notification, send_admin_reply_to_customer, send_order_confirmation, send_quote_to_customer
+from src.email_campaigns import CampaignRunner
+from src.email_outbox import EmailOutbox
+from src.email_templates import preload_email_templates
+from src.gallery import GalleryManifest, PLACEHOLDER_IMAGE
+from src.image_variants import ImageVariantWorker, photo_url, photo_srcset
+from src.invoice_utils import InvoiceWorker, invoice_is_current, order_customer
+from src import image_variants
+from src.whatsapp_inbox import WhatsAppInboxProcessor
+from src.whatsapp_outbox import WhatsAppOutbox
+from src.whatsapp_utils import set_whatsapp_outbox
+from src.email_utils import set_email_outbox, send_quote_notification, send_customer_confirmation, send_signup_confirmation, send_cake_topper_notification, send_print_service_notification, send_admin_reply_to_customer, send_order_confirmation, send_quote_to_customer
 from scripts.version_check import get_version_info
 from datetime import datetime
 from werkzeug.utils import secure_filename
 import os
-import random
 import re
+import time
 
 # Configuration for file uploads
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
@@ -59,7 +69,124 @@ app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HT
 app.config['PERMANENT_SESSION_LIFETIME'] = 86400 * 30  # 30 days
 
 # Initialize database
-db = Database(app.config['DATABASE_PATH'])
+db = Database(app.config['DATABASE_PATH'], pool_size=app.config['DB_POOL_SIZE'],
+              pragmas=app.config['DB_PRAGMAS'], auto_migrate=app.config['DB_AUTO_MIGRATE'],
+              cache_ttl=app.config['CATALOGUE_CACHE_TTL'], cache_size=app.config['CATALOGUE_CACHE_SIZE'],
+              admin_counts_ttl=app.config['ADMIN_COUNTS_CACHE_TTL'])
+
+# Report the SQLite settings that actually took effect (e.g. WAL is unavailable on some network filesystems)
+pragma_report = db.check_pragmas()
+for pragma_name, requested, effective, applied in pragma_report:
+    if not applied:
+        print(f"[WARNING] SQLite PRAGMA {pragma_name}: requested {requested}, got {effective}")
+print("SQLite settings: " + ", ".join(f"{name}={effective}" for name, _, effective, _ in pragma_report))
+
+# Queue outgoing email so handlers don't wait on the SMTP server
+email_outbox = None
+if app.config['EMAIL_OUTBOX_ENABLED']:
+    email_outbox = EmailOutbox(db, app.config, max_attempts=app.config['EMAIL_MAX_ATTEMPTS'],
+                               retry_delay=app.config['EMAIL_RETRY_DELAY'])
+    set_email_outbox(email_outbox)
+
+# Compile the email templates at startup rather than in the first request that sends mail
+try:
+    preload_email_templates()
+except Exception as e:
+    print(f"[WARNING] Could not compile email templates: {str(e)}")
+
+# Queue outgoing WhatsApp messages so handlers don't wait on the Graph API
+whatsapp_outbox = None
+if app.config['WHATSAPP_OUTBOX_ENABLED'] and app.config['WHATSAPP_ENABLED']:
+    whatsapp_outbox = WhatsAppOutbox(db, app.config, rate_per_minute=app.config['WHATSAPP_RATE_PER_MINUTE'])
+    set_whatsapp_outbox(whatsapp_outbox)
+
+# Bulk email campaigns are sent by a background runner, not in the request
+campaign_runner = CampaignRunner(db, app.config, concurrency=app.config['BULK_EMAIL_CONCURRENCY'],
+                                 rate_per_minute=app.config['BULK_EMAIL_RATE_PER_MINUTE'])
+
+# Incoming webhooks are stored on receipt and processed in the background
+whatsapp_inbox = WhatsAppInboxProcessor(db, app.config)
+
+# Resized photo variants are generated in the background (needs Pillow)
+image_worker = None
+if app.config['IMAGE_VARIANTS_ENABLED']:
+    if image_variants.available():
+        image_worker = ImageVariantWorker(db, pool_size=app.config['IMAGE_VARIANT_WORKERS'],
+                                          quality=app.config['IMAGE_VARIANT_QUALITY'])
+    else:
+        print("[WARNING] Pillow is not installed: photos are served without resized variants")
+
+
+# Invoice PDFs are rendered in the background, not while the admin waits
+invoice_worker = InvoiceWorker(db, app.config)
+
+
+def queue_invoice(order_id):
+    """Have the invoice worker render an order's invoice (skipped if it is unchanged)"""
+    success, message, _ = db.queue_invoice(order_id)
+    if success:
+        invoice_worker.wake()
+    return success, message
+
+
+def current_invoice_path(order_id):
+    """The order's invoice PDF if it shows the order as it is now, else None
+
+    An invoice that is out of date gets a render queued (unless one is
+    already waiting or running), so an old version is never downloaded or
+    emailed.
+    """
+    if db.has_pending_invoice_job(order_id):
+        return None
+
+    orders = db.get_invoiced_orders(order_ids=[order_id])
+    if not orders:
+        return None
+    order = orders[0]
+
+    if invoice_is_current(order, order_customer(order), db.get_order_items(order_id), app.config):
+        return order['invoice_file']
+
+    queue_invoice(order_id)
+    return None
+
+
+def queue_gallery_variants(paths):
+    """Have the image worker make variants of new gallery images"""
+    if db.queue_gallery_variants(paths):
+        image_worker.wake()
+
+
+# Gallery folders are listed once and rescanned only when they change
+gallery = GalleryManifest(os.path.join('static', 'images', 'gallery', '3DPrinting'),
+                          queue_variants=queue_gallery_variants if image_worker is not None else None,
+                          shuffle_interval=app.config['GALLERY_SHUFFLE_INTERVAL'],
+                          check_interval=app.config['GALLERY_CHECK_INTERVAL'])
+
+
+@app.before_request
+def bind_db_connection():
+    """Share one pooled database connection across the whole request"""
+    db.begin_request()
+
+    # Start (or restart, after a fork) this worker's email and WhatsApp threads
+    if app.config['BACKGROUND_WORKER_THREADS']:
+        if email_outbox is not None:
+            email_outbox.ensure_started()
+        if whatsapp_outbox is not None:
+            whatsapp_outbox.ensure_started()
+        campaign_runner.ensure_started()
+        whatsapp_inbox.ensure_started()
+        if image_worker is not None:
+            image_worker.ensure_started()
+        invoice_worker.ensure_started()
+
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's database connection to the pool"""
+    db.end_request()
+
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -122,22 +249,16 @@ def index():
     """Main landing page"""
     form = EmailSignupForm()
 
-    # Get stats for homepage counters (only public products, not custom quotes)
-    total_products = len(db.get_all_cutter_items(active_only=True, public_categories_only=True))
-    total_customers = db.get_signup_count()  # Using email signups as customer count for now
-
-    # Calculate new products this month (created in last 30 days)
-    from datetime import datetime, timedelta
-    thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d')
-    all_products = db.get_all_cutter_items(active_only=True, public_categories_only=True)
-    new_products = len([p for p in all_products if p['created_date'] and p['created_date'] >= thirty_days_ago])
+    # Get stats for homepage counters (only public products, not custom quotes;
+    # email signups stand in for the customer count for now)
+    stats = db.get_homepage_stats()
 
     return render_template('index.html',
                           form=form,
                           config=app.config,
-                          total_products=total_products,
-                          total_customers=total_customers,
-                          new_products=new_products)
+                          total_products=stats['total_products'],
+                          total_customers=stats['total_customers'],
+                          new_products=stats['new_products'])
 
 
 @app.route('/privacy-policy')
@@ -357,6 +478,9 @@ def orders_quotes():
 
     # Get user's orders
     orders = db.get_user_orders(current_user.id)
+    items_by_order = db.get_order_items_for_orders([order['id'] for order in orders])
+    for order in orders:
+        order['items'] = items_by_order.get(order['id'], [])
 
     # Get user's quotes (queries by user_id AND email to capture anonymous quotes)
     quotes = db.get_user_quotes(current_user.id, current_user.email)
@@ -764,9 +888,10 @@ def upload_quote_photos():
                 filename = f"{timestamp}_{quote_id}_{original_filename}"
                 filepath = os.path.join(upload_folder, filename)
 
-                # Save file
+                # Save file (metadata is stripped in the background)
                 file.save(filepath)
                 saved_files.append(filename)
+                db.queue_image_variants(filepath)
 
         # Update quote with new image paths
         existing_images = quote.get('reference_images', '')
@@ -786,6 +911,9 @@ def upload_quote_photos():
         conn.commit()
         conn.close()
 
+        if image_worker is not None:
+            image_worker.wake()
+
         return jsonify({'success': True, 'message': f'{len(saved_files)} photo(s) uploaded successfully'})
 
     except Exception as e:
@@ -826,71 +954,47 @@ def unsubscribe():
     return render_template('unsubscribe.html', config=app.config, signup=signup_details, token=token)
 
 
+def add_photo_urls(product, photos):
+    """
+    Set the photo URLs a shop template needs on a catalogue item or product:
+    main_photo_url (card size), main_photo_srcset / main_photo_webp_srcset
+    and photo_urls (full size, for the detail view). Photos without
+    generated variants fall back to the original upload.
+    """
+    if photos:
+        product['photo_urls'] = [photo_url(photo, 'full') for photo in photos]
+        main_photo = next((photo for photo in photos if photo['is_main']), photos[0])
+        product['main_photo_url'] = photo_url(main_photo, 'card')
+        product['main_photo_srcset'] = photo_srcset(main_photo)
+        product['main_photo_webp_srcset'] = photo_srcset(main_photo, 'webp')
+    else:
+        product['photo_urls'] = []
+        product['main_photo_url'] = None
+        product['main_photo_srcset'] = ''
+        product['main_photo_webp_srcset'] = ''
+
+
 def get_carousel_images(subproduct_folder, max_images=15):
     """
-    Load images from a gallery folder and return up to max_images in random order.
-    Falls back to placeholder images if folder is empty.
+    Get up to max_images images of a gallery folder for a carousel.
+
+    Served from the gallery manifest (see src/gallery.py): the order changes
+    every GALLERY_SHUFFLE_INTERVAL seconds, and an empty folder shows the
+    site logo.
 
     Args:
         subproduct_folder: Name of subfolder (e.g., 'CustomDesign', 'CakeToppers', 'PrintService')
         max_images: Maximum number of images to return (default: 15)
 
     Returns:
-        List of image URLs in random order (limited to max_images)
+        List of image dicts (url, srcset, webp_srcset, width, height)
     """
-    # Define the folder path
-    gallery_path = os.path.join('static', 'images', 'gallery', '3DPrinting', subproduct_folder)
-
-    # Supported image extensions
-    supported_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
-
-    images = []
-
-    # Check if folder exists and has images
-    if os.path.exists(gallery_path):
-        # Get all image files from the folder
-        for filename in os.listdir(gallery_path):
-            if filename.lower().endswith(supported_extensions):
-                # Create URL path for the image
-                image_url = f"/static/images/gallery/3DPrinting/{subproduct_folder}/{filename}"
-                images.append(image_url)
-
-    # If no images found, use fallback placeholder images based on subproduct
-    if not images:
-        fallback_images = {
-            'CustomDesign': [
-                'https://images.unsplash.com/photo-1683818051102-dd1199d163b9?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1614624532983-4ce03382d63d?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1581092160562-40aa08e78837?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1612815154858-60aa4c59eaa6?w=800&h=600&fit=crop&q=80'
-            ],
-            'CakeToppers': [
-                'https://images.unsplash.com/photo-1604531825889-88dc0c7e37db?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1558636508-e0db3814bd1d?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1621303837174-89787a7d4729?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1586985289688-ca3cf47d3e6e?w=800&h=600&fit=crop&q=80'
-            ],
-            'PrintService': [
-                'https://images.unsplash.com/photo-1740625940423-a59a65c753c0?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1581092918056-0c4c3acd3789?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1633167606207-d840b5070fc2?w=800&h=600&fit=crop&q=80',
-                'https://images.unsplash.com/photo-1614624532983-4ce03382d63d?w=800&h=600&fit=crop&q=80'
-            ]
-        }
-        images = fallback_images.get(subproduct_folder, [])
-
-    # Randomize the order of images
-    random.shuffle(images)
-
-    # Limit to max_images
-    return images[:max_images]
+    return gallery.carousel(subproduct_folder, max_images)
 
 
 @app.route('/3d-printing')
 def printing_3d():
     """3D Printing category page with dynamic carousel images"""
-    from datetime import datetime, timedelta
-
     # Load images for each subproduct carousel
     carousel_images = {
         'custom_design': get_carousel_images('CustomDesign'),
@@ -898,47 +1002,27 @@ def printing_3d():
         'print_service': get_carousel_images('PrintService')
     }
 
-    # Fetch all cutter items from database (only from public categories to exclude custom quotes)
-    items = db.get_all_cutter_items(public_categories_only=True)
+    # Fetch all cutter items with their photos (only from public categories to exclude custom quotes)
+    items = db.get_cutter_catalogue(public_categories_only=True)
 
-    # Add is_new flag, photo URLs, and main photo URL to each item
+    # Build photo URLs and main photo URL for each item
+    # Note: photo_path already contains the full path like "static/uploads/cutter_items/..."
     for item in items:
-        # Calculate is_new flag (items created within last 30 days)
-        try:
-            created = datetime.strptime(item['created_date'], '%Y-%m-%d %H:%M:%S')
-            days_old = (datetime.now() - created).days
-            item['is_new'] = days_old <= 30
-        except:
-            item['is_new'] = False
-
-        # Get all photos for this item
-        photos = db.get_item_photos(item['id'])
+        add_photo_urls(item, item['photos'])
 
-        # Build photo URLs list
-        # Note: photo_path already contains the full path like "static/uploads/cutter_items/..."
-        if photos:
-            item['photo_urls'] = [f"/{photo['photo_path'].replace(os.sep, '/')}" for photo in photos]
-            # Set main photo URL
-            main_photo = next((photo for photo in photos if photo['is_main']), photos[0] if photos else None)
-            item['main_photo_url'] = f"/{main_photo['photo_path'].replace(os.sep, '/')}" if main_photo else None
-        else:
-            item['photo_urls'] = []
-            item['main_photo_url'] = None
+    # Card images for the sub-product links at the top of the page
+    cutter_cover = next((item['main_photo_url'] for item in items if item['main_photo_url']),
+                        PLACEHOLDER_IMAGE['url'])
 
     # Get categories and types for filters (only public categories)
     categories = db.get_all_cutter_categories(public_only=True)
     types = db.get_all_cutter_types()
 
-    # Create category description lookup
-    category_descriptions = {cat['id']: cat.get('description', '') for cat in categories}
-
-    # Add category description to each item
-    for item in items:
-        item['category_description'] = category_descriptions.get(item['category_id'], '')
-
     return render_template('3d_printing.html',
                          config=app.config,
                          carousel_images=carousel_images,
+                         cutter_cover=cutter_cover,
+                         placeholder_image=PLACEHOLDER_IMAGE['url'],
                          items=items,
                          categories=categories,
                          types=types)
@@ -1364,10 +1448,12 @@ def admin_signups():
     """Admin page to view signups"""
     signups = db.get_all_signups()
     total_count = db.get_signup_count()
+    campaigns = db.get_email_campaigns(limit=5)
 
     return render_template('admin-signups.html',
                           signups=signups,
                           total_count=total_count,
+                          campaigns=campaigns,
                           config=app.config)
 
 
@@ -1393,9 +1479,7 @@ def get_bulk_email_stats_route():
 @app.route('/admin/signups/send-bulk-email', methods=['POST'])
 @admin_required
 def send_bulk_email_route():
-    """Send bulk email to signups filtered by interest"""
-    from src.email_utils import send_bulk_email
-
+    """Queue a bulk email campaign to signups filtered by interest"""
     interest_filter = request.form.get('interest_filter', 'all')
     subject = request.form.get('subject', '').strip()
     message = request.form.get('message', '').strip()
@@ -1405,6 +1489,10 @@ def send_bulk_email_route():
         flash('Subject and message are required.', 'error')
         return redirect(url_for('admin_signups'))
 
+    if not app.config['MAIL_PASSWORD']:
+        flash('Email is not configured.', 'error')
+        return redirect(url_for('admin_signups'))
+
     # Get recipients
     if interest_filter == 'all':
         interest_filter = None
@@ -1418,26 +1506,41 @@ def send_bulk_email_route():
     # Format recipients as list of tuples (email, name, unsubscribe_token)
     recipients = [(s['email'], s['name'], s['unsubscribe_token']) for s in signups]
 
-    # Send bulk email
-    success_count, failed_count, result_message = send_bulk_email(
-        app.config,
-        recipients,
-        subject,
-        message,
-        interest_filter=interest_filter,
-        include_logo=True
-    )
-
-    # Show results
-    if success_count > 0:
-        flash(f'Successfully sent {success_count} email(s)!', 'success')
+    # Record the campaign; the campaign runner sends it in the background
+    success, result_message, campaign_id = db.create_email_campaign(
+        subject, message, interest_filter, recipients)
 
-    if failed_count > 0:
-        flash(f'Failed to send {failed_count} email(s). Check logs for details.', 'error')
+    if success:
+        campaign_runner.wake()
+        flash(f'Bulk email queued for {len(recipients)} subscriber(s). Progress is shown below.', 'success')
+    else:
+        flash(f'Could not queue bulk email: {result_message}', 'error')
 
     return redirect(url_for('admin_signups'))
 
 
+@app.route('/admin/signups/campaigns/<int:campaign_id>/progress')
+@admin_required
+def bulk_email_progress(campaign_id):
+    """API endpoint for a bulk email campaign's delivery progress"""
+    campaign = db.get_email_campaign(campaign_id)
+    if not campaign:
+        return jsonify({'success': False, 'error': 'Campaign not found'}), 404
+
+    return jsonify({
+        'success': True,
+        'id': campaign['id'],
+        'subject': campaign['subject'],
+        'status': campaign['status'],
+        'total': campaign['total'],
+        'sent': campaign['sent'],
+        'failed': campaign['failed'],
+        'remaining': campaign['remaining'],
+        'started_date': campaign['started_date'],
+        'completed_date': campaign['completed_date']
+    })
+
+
 @app.route('/admin/orders')
 @admin_required
 def admin_orders():
@@ -1445,6 +1548,10 @@ def admin_orders():
     status_filter = request.args.get('status', None)
     orders = db.get_all_orders(status_filter)
 
+    items_by_order = db.get_order_items_for_orders([order['id'] for order in orders])
+    for order in orders:
+        order['items'] = items_by_order.get(order['id'], [])
+
     return render_template('admin-orders.html',
                           orders=orders,
                           status_filter=status_filter,
@@ -1491,21 +1598,17 @@ def admin_update_order_status(order_number):
 
     # Auto-generate invoice when status changes to confirmed or awaiting_payment
     if new_status in ['confirmed', 'awaiting_payment'] and not order.get('invoice_number'):
-        from src.invoice_utils import generate_invoice_pdf
-
         # Generate invoice number
         success, invoice_number = db.generate_invoice_number(order_number)
         if success:
             order['invoice_number'] = invoice_number
 
-            # Get customer and items for PDF generation
-            customer = db.get_user_by_id(order['user_id'])
-            order_items = db.get_order_items(order['id'])
-
-            # Generate PDF
-            pdf_success, pdf_result = generate_invoice_pdf(order, customer, order_items, app.config)
-            if pdf_success:
-                flash(f'Invoice {invoice_number} auto-generated!', 'info')
+            # The PDF is rendered by the invoice worker
+            if queue_invoice(order['id'])[0]:
+                flash(f'Invoice {invoice_number} is being generated.', 'info')
+    elif order.get('invoice_number'):
+        # The invoice shows the payment status, which follows the order status
+        queue_invoice(order['id'])
 
     # Get customer for notifications
     user = db.get_user_by_id(order['user_id'])
@@ -1605,7 +1708,7 @@ def admin_update_order_status(order_number):
 @admin_required
 def admin_send_whatsapp_order(order_number):
     """Send WhatsApp message to customer from order page"""
-    from src.whatsapp_utils import send_whatsapp_message, format_phone_number
+    from src.whatsapp_utils import send_tracked_whatsapp_message, format_phone_number
 
     message = request.form.get('whatsapp_message', '').strip()
 
@@ -1631,32 +1734,26 @@ def admin_send_whatsapp_order(order_number):
         return redirect(url_for('admin_order_detail', order_number=order_number))
 
     # Send WhatsApp message
-    success, result = send_whatsapp_message(formatted_phone, message, app.config)
+    success, result, delivery = send_tracked_whatsapp_message(formatted_phone, message, app.config)
 
     if success:
-        flash(f'WhatsApp message sent successfully to {customer["phone"]}!', 'success')
+        flash(f'WhatsApp message to {customer["phone"]} {delivery["status"]}.', 'success')
 
-        # Parse result if it's a string
-        import json
-        if isinstance(result, str):
-            try:
-                result = json.loads(result)
-            except:
-                result = {}
-
-        # Save to WhatsApp messages table
+        # Save to WhatsApp messages table (the outbox worker marks it sent or failed)
         try:
             db.save_whatsapp_message(
-                message_id=result.get('messages', [{}])[0].get('id', ''),
+                message_id=delivery.get('message_id'),
                 direction='outbound',
                 from_phone=app.config.get('WHATSAPP_CONTACT_NUMBER', ''),
                 to_phone=formatted_phone,
                 message_text=message,
-                user_id=customer['id']
+                user_id=customer['id'],
+                status=delivery['status'],
+                outbox_id=delivery.get('outbox_id')
             )
         except Exception as e:
             print(f"Error saving WhatsApp message to database: {e}")
-            # Continue anyway - message was sent successfully
+            # Continue anyway - message was queued or sent
     else:
         flash(f'Failed to send WhatsApp: {result}', 'error')
 
@@ -1734,8 +1831,7 @@ def admin_delete_order(order_number):
 @app.route('/admin/orders/<order_number>/generate-invoice', methods=['POST'])
 @admin_required
 def admin_generate_invoice(order_number):
-    """Generate PDF invoice for an order"""
-    from src.invoice_utils import generate_invoice_pdf
+    """Queue the PDF invoice of an order (nothing is rendered if it is up to date)"""
 
     # Get order details
     order = db.get_order_by_number(order_number)
@@ -1755,13 +1851,17 @@ def admin_generate_invoice(order_number):
             return redirect(url_for('admin_order_detail', order_number=order_number))
         order['invoice_number'] = invoice_number
 
-    # Generate PDF
-    success, result = generate_invoice_pdf(order, customer, order_items, app.config)
+    if customer and invoice_is_current(order, customer, order_items, app.config):
+        flash(f'Invoice {order["invoice_number"]} is up to date.', 'success')
+        return redirect(url_for('admin_order_detail', order_number=order_number))
+
+    # Render the PDF in the background
+    success, message = queue_invoice(order['id'])
 
     if success:
-        flash(f'Invoice {order["invoice_number"]} generated successfully!', 'success')
+        flash(f'Invoice {order["invoice_number"]} is being generated. It can be downloaded in a moment.', 'success')
     else:
-        flash(f'Failed to generate invoice: {result}', 'error')
+        flash(f'Failed to generate invoice: {message}', 'error')
 
     return redirect(url_for('admin_order_detail', order_number=order_number))
 
@@ -1771,7 +1871,6 @@ def admin_generate_invoice(order_number):
 def admin_download_invoice(order_number):
     """Download invoice PDF"""
     from flask import send_file
-    from src.invoice_utils import get_invoice_path, invoice_exists
 
     # Get order to check invoice number
     order = db.get_order_by_number(order_number)
@@ -1779,10 +1878,10 @@ def admin_download_invoice(order_number):
         flash('Invoice not found. Please generate it first.', 'error')
         return redirect(url_for('admin_order_detail', order_number=order_number))
 
-    invoice_path = get_invoice_path(order['invoice_number'])
+    invoice_path = current_invoice_path(order['id'])
 
-    if not invoice_exists(order['invoice_number']):
-        flash('Invoice PDF not found. Please generate it again.', 'error')
+    if not invoice_path:
+        flash('The invoice is being generated with the latest order details. Please try again in a moment.', 'info')
         return redirect(url_for('admin_order_detail', order_number=order_number))
 
     return send_file(invoice_path, as_attachment=True, download_name=f"{order['invoice_number']}.pdf")
@@ -1793,7 +1892,6 @@ def admin_download_invoice(order_number):
 def admin_send_invoice_email(order_number):
     """Send invoice PDF via email to customer"""
     from src.email_utils import send_invoice_email
-    from src.invoice_utils import get_invoice_path
 
     # Get order details
     order = db.get_order_by_number(order_number)
@@ -1812,7 +1910,10 @@ def admin_send_invoice_email(order_number):
         return redirect(url_for('admin_order_detail', order_number=order_number))
 
     # Get invoice path
-    invoice_path = get_invoice_path(order['invoice_number'])
+    invoice_path = current_invoice_path(order['id'])
+    if not invoice_path:
+        flash('The invoice is being generated with the latest order details. Please send it again in a moment.', 'info')
+        return redirect(url_for('admin_order_detail', order_number=order_number))
 
     # Send email
     success, message = send_invoice_email(
@@ -1825,7 +1926,7 @@ def admin_send_invoice_email(order_number):
     )
 
     if success:
-        flash(f'Invoice emailed to {customer["email"]}!', 'success')
+        flash(f'{message} for {customer["email"]}.', 'success')
     else:
         flash(f'Failed to send invoice email: {message}', 'error')
 
@@ -2011,11 +2112,10 @@ def admin_whatsapp_inbox():
     # Get all conversations
     conversations = db.get_whatsapp_conversations(limit=100)
 
-    # Enrich with customer details
+    # Enrich with customer details (one lookup for every conversation)
+    customers = db.find_customers_by_phones([conv['conversation_id'] for conv in conversations])
     for conv in conversations:
-        phone = conv['conversation_id']
-        customer = db.find_customer_by_phone(phone)
-        conv['customer'] = customer
+        conv['customer'] = customers.get(conv['conversation_id'])
 
     # Get unread count
     unread_count = db.get_whatsapp_unread_count()
@@ -2048,7 +2148,7 @@ def admin_whatsapp_conversation(phone):
 @admin_required
 def admin_whatsapp_reply(phone):
     """Send reply in WhatsApp conversation"""
-    from src.whatsapp_utils import send_whatsapp_message
+    from src.whatsapp_utils import send_tracked_whatsapp_message
 
     message = request.form.get('message', '').strip()
 
@@ -2057,11 +2157,10 @@ def admin_whatsapp_reply(phone):
         return redirect(url_for('admin_whatsapp_conversation', phone=phone))
 
     # Send WhatsApp
-    success, result_message = send_whatsapp_message(phone, message, app.config)
+    success, result_message, delivery = send_tracked_whatsapp_message(phone, message, app.config)
 
     if success:
-        # Save to database
-        import time
+        # Save to database (the outbox worker marks it sent or failed)
         business_number = app.config.get('WHATSAPP_PHONE_NUMBER_ID', '')
 
         # Try to link to customer
@@ -2073,12 +2172,12 @@ def admin_whatsapp_reply(phone):
         if customer:
             if customer['type'] == 'user':
                 user_id = customer['data']['id']
-            elif customer['type'] in ['quote', 'cake_topper']:
+            elif customer['type'] in ['quote', 'cake_topper', 'print_service']:
                 quote_id = customer['data']['id']
                 quote_type = customer['type']
 
         db.save_whatsapp_message(
-            message_id=f"outbound_{int(time.time())}",
+            message_id=delivery.get('message_id'),
             direction='outbound',
             from_phone=business_number,
             to_phone=phone,
@@ -2086,10 +2185,12 @@ def admin_whatsapp_reply(phone):
             message_type='text',
             user_id=user_id,
             quote_id=quote_id,
-            quote_type=quote_type
+            quote_type=quote_type,
+            status=delivery['status'],
+            outbox_id=delivery.get('outbox_id')
         )
 
-        flash('Message sent successfully!', 'success')
+        flash(f'Message {delivery["status"]}.', 'success')
     else:
         flash(f'Failed to send: {result_message}', 'danger')
 
@@ -2438,7 +2539,7 @@ def admin_delete_cutter_category(category_id):
 @admin_required
 def admin_cutter_types():
     """Admin page to manage cutter types"""
-    types = db.get_all_cutter_types()
+    types = db.get_all_cutter_types(cached=False)
     return render_template('admin-cutter-types.html',
                           types=types,
                           config=app.config)
@@ -2510,7 +2611,7 @@ def admin_cutter_items():
     )
 
     categories = db.get_all_cutter_categories()
-    types = db.get_all_cutter_types()
+    types = db.get_all_cutter_types(cached=False)
 
     return render_template('admin-cutter-items.html',
                           items=items,
@@ -2524,7 +2625,7 @@ def admin_cutter_items():
 def admin_add_cutter_item_page():
     """Show form to add a new cutter item or handle form submission"""
     categories = db.get_all_cutter_categories()
-    types = db.get_all_cutter_types()
+    types = db.get_all_cutter_types(cached=False)
 
     if request.method == 'POST':
         # Handle form submission
@@ -2562,6 +2663,9 @@ def admin_add_cutter_item_page():
                         is_main = (idx == 0)
                         db.add_item_photo(item_id, file_path, is_main=is_main, display_order=idx)
 
+                if image_worker is not None:
+                    image_worker.wake()
+
             flash(f'{message} Item #{item_number} created!', 'success')
             return redirect(url_for('admin_cutter_items'))
         else:
@@ -2591,7 +2695,7 @@ def admin_edit_cutter_item_page(item_id):
         return redirect(url_for('admin_cutter_items'))
 
     categories = db.get_all_cutter_categories()
-    types = db.get_all_cutter_types()
+    types = db.get_all_cutter_types(cached=False)
 
     if request.method == 'POST':
         # Handle form submission
@@ -2633,6 +2737,9 @@ def admin_edit_cutter_item_page(item_id):
                         is_main = (current_count == 0 and idx == 0)
                         db.add_item_photo(item_id, file_path, is_main=is_main, display_order=current_count + idx)
 
+                if image_worker is not None:
+                    image_worker.wake()
+
             flash(message, 'success')
         else:
             flash(message, 'error')
@@ -2810,7 +2917,8 @@ def admin_candles_soaps_products():
     # Get all products (only active by default)
     products = db.get_all_candles_soaps_products(
         category_id=int(category_id) if category_id else None,
-        active_only=True
+        active_only=True,
+        cached=False
     )
 
     # Apply search filter
@@ -2846,7 +2954,7 @@ def admin_candles_soaps_products():
 @admin_required
 def admin_add_candles_soaps_product():
     """Show form to add a new candles & soaps product"""
-    categories = db.get_all_candles_soaps_categories(active_only=True)
+    categories = db.get_all_candles_soaps_categories(active_only=True, cached=False)
     return render_template('admin-candles-soaps-product-form.html',
                          product=None,
                          categories=categories,
@@ -3093,9 +3201,11 @@ def admin_upload_candles_soaps_photo(product_id):
 
     # Add to database
     is_main = request.form.get('is_main') == '1'
-    success, message = db.add_candles_soaps_product_photo(product_id, file_path, is_main=is_main)
+    success, message, photo_id = db.add_candles_soaps_product_photo(product_id, file_path, is_main=is_main)
 
     if success:
+        if image_worker is not None:
+            image_worker.wake()
         flash('Photo uploaded successfully!', 'success')
     else:
         flash(message, 'error')
@@ -3121,7 +3231,7 @@ def admin_set_main_candles_soaps_photo(product_id, photo_id):
 @admin_required
 def admin_delete_candles_soaps_photo(product_id, photo_id):
     """Delete a photo for a candles & soaps product"""
-    success, message = db.delete_candles_soaps_product_photo(photo_id)
+    success, message, photo_path = db.delete_candles_soaps_product_photo(photo_id)
 
     if success:
         flash(message, 'success')
@@ -3242,7 +3352,7 @@ def email_customer(request_type, quote_id):
             attached_image=saved_image_filename  # Just the filename, template will construct full path
         )
 
-        flash(f'Email sent successfully to {quote_details["email"]}!', 'success')
+        flash(f'{result_message} for {quote_details["email"]}.', 'success')
     else:
         flash(f'Failed to send email: {result_message}', 'error')
 
@@ -3253,7 +3363,7 @@ def email_customer(request_type, quote_id):
 @admin_required
 def send_whatsapp_to_customer(request_type, quote_id):
     """Send WhatsApp message to customer from admin panel"""
-    from src.whatsapp_utils import send_whatsapp_message, format_phone_number
+    from src.whatsapp_utils import send_tracked_whatsapp_message, format_phone_number
 
     message = request.form.get('whatsapp_message', '').strip()
 
@@ -3283,7 +3393,7 @@ def send_whatsapp_to_customer(request_type, quote_id):
         return redirect(url_for('admin_quotes'))
 
     # Send WhatsApp message
-    success, result_message = send_whatsapp_message(phone, message, app.config)
+    success, result_message, delivery = send_tracked_whatsapp_message(phone, message, app.config)
 
     if success:
         # Save message to timeline
@@ -3304,21 +3414,22 @@ def send_whatsapp_to_customer(request_type, quote_id):
             message_type='admin_message'
         )
 
-        # Also save to WhatsApp messages table for inbox
-        import time
+        # Also save to WhatsApp messages table for inbox (the outbox worker marks it sent or failed)
         business_number = app.config.get('WHATSAPP_PHONE_NUMBER_ID', '')
         db.save_whatsapp_message(
-            message_id=f"outbound_{int(time.time())}_{quote_id}",
+            message_id=delivery.get('message_id'),
             direction='outbound',
             from_phone=business_number,
             to_phone=phone,
             message_text=message,
             message_type='text',
             quote_id=quote_id,
-            quote_type=quote_type
+            quote_type=quote_type,
+            status=delivery['status'],
+            outbox_id=delivery.get('outbox_id')
         )
 
-        flash(f'WhatsApp message sent successfully to {quote_details["name"]} ({phone})! Note: Test number can only deliver to verified recipients.', 'success')
+        flash(f'WhatsApp message to {quote_details["name"]} ({phone}) {delivery["status"]}. Note: Test number can only deliver to verified recipients.', 'success')
     else:
         flash(f'Failed to send WhatsApp: {result_message}', 'danger')
 
@@ -3407,6 +3518,60 @@ def convert_quote_to_sale(request_type, quote_id):
     return redirect(url_for('admin_quotes'))
 
 
+# ============================================================================
+# ADMIN OUTBOX ROUTES
+# ============================================================================
+
+@app.route('/admin/outbox')
+@admin_required
+def admin_outbox():
+    """Emails and WhatsApp messages the outbox workers could not deliver"""
+    return render_template('admin-outbox.html',
+                          failed_emails=db.get_failed_outbox_emails(),
+                          failed_whatsapp=db.get_failed_whatsapp_outbox(),
+                          config=app.config)
+
+
+@app.route('/admin/outbox/email/<int:outbox_id>/retry', methods=['POST'])
+@admin_required
+def admin_retry_outbox_email(outbox_id):
+    """Queue a failed email for delivery again"""
+    success, message = db.retry_outbox_email(outbox_id)
+    if success and email_outbox is not None:
+        email_outbox.wake()
+    flash(message, 'success' if success else 'error')
+    return redirect(url_for('admin_outbox'))
+
+
+@app.route('/admin/outbox/email/<int:outbox_id>/dismiss', methods=['POST'])
+@admin_required
+def admin_dismiss_outbox_email(outbox_id):
+    """Stop showing a failed email"""
+    success, message = db.dismiss_outbox_email(outbox_id)
+    flash(message, 'success' if success else 'error')
+    return redirect(url_for('admin_outbox'))
+
+
+@app.route('/admin/outbox/whatsapp/<int:outbox_id>/retry', methods=['POST'])
+@admin_required
+def admin_retry_whatsapp_outbox(outbox_id):
+    """Queue a failed WhatsApp message for delivery again"""
+    success, message = db.retry_whatsapp_outbox(outbox_id)
+    if success and whatsapp_outbox is not None:
+        whatsapp_outbox.wake()
+    flash(message, 'success' if success else 'error')
+    return redirect(url_for('admin_outbox'))
+
+
+@app.route('/admin/outbox/whatsapp/<int:outbox_id>/dismiss', methods=['POST'])
+@admin_required
+def admin_dismiss_whatsapp_outbox(outbox_id):
+    """Stop showing a failed WhatsApp message"""
+    success, message = db.dismiss_whatsapp_outbox(outbox_id)
+    flash(message, 'success' if success else 'error')
+    return redirect(url_for('admin_outbox'))
+
+
 # ============================================================================
 # ADMIN CART TRACKING ROUTES
 # ============================================================================
@@ -3415,20 +3580,30 @@ def convert_quote_to_sale(request_type, quote_id):
 @admin_required
 def admin_carts():
     """View all active carts (registered users and guests)"""
-    carts = db.get_all_active_carts()
+    per_page = 50
+    page = max(1, request.args.get('page', 1, type=int))
+    sort = request.args.get('sort', 'last_added')
+    if sort not in CART_REPORT_SORTS:
+        sort = 'last_added'
+    order = 'asc' if request.args.get('order') == 'asc' else 'desc'
+
+    summary = db.get_active_carts_summary()
+    total_pages = max(1, (summary['total_carts'] + per_page - 1) // per_page)
+    page = min(page, total_pages)
 
-    # Calculate some statistics
-    total_carts = len(carts)
-    registered_carts = len([c for c in carts if c['cart_type'] == 'registered'])
-    guest_carts = len([c for c in carts if c['cart_type'] == 'guest'])
-    total_value = sum(c['cart_total'] for c in carts)
+    carts = db.get_all_active_carts(limit=per_page, offset=(page - 1) * per_page,
+                                    sort=sort, descending=(order == 'desc'))
 
     return render_template('admin-carts.html',
                           carts=carts,
-                          total_carts=total_carts,
-                          registered_carts=registered_carts,
-                          guest_carts=guest_carts,
-                          total_value=total_value,
+                          total_carts=summary['total_carts'],
+                          registered_carts=summary['registered_carts'],
+                          guest_carts=summary['guest_carts'],
+                          total_value=summary['total_value'],
+                          page=page,
+                          total_pages=total_pages,
+                          sort=sort,
+                          order=order,
                           config=app.config)
 
 
@@ -3543,6 +3718,13 @@ def cart():
         else:
             item['cart_type'] = 'cutter'  # Default for old items
 
+        # Thumbnail (and full size for the zoom) of the main photo
+        if item['main_photo']:
+            photo = {'photo_path': item['main_photo'], 'variants': item['main_photo_variants']}
+            item['thumb_url'] = photo_url(photo, 'thumb')
+            item['thumb_srcset'] = photo_srcset(photo)
+            item['zoom_url'] = photo_url(photo, 'full')
+
     # Calculate totals
     subtotal = sum(item['subtotal'] for item in cart_items)
 
@@ -3646,24 +3828,46 @@ def cart_count():
     return jsonify({'count': total_count})
 
 
+def admin_counts_etag(counts):
+    """ETag for a set of admin badge counts"""
+    return '-'.join(str(counts[key]) for key in ('orders', 'quotes', 'carts', 'whatsapp', 'outbox'))
+
+
 @app.route('/admin/counts')
 @admin_required
 def admin_counts():
-    """Get admin notification counts (for badge updates)"""
-    from flask import jsonify
+    """Get admin notification counts (for badge updates)
 
-    # Get counts for admin badges
-    active_orders_count = db.get_active_orders_count()
-    active_quotes_count = db.get_active_quotes_count()
-    total_carts_count = db.get_total_carts_count()
-    whatsapp_unread_count = db.get_whatsapp_unread_count()
+    Responses carry an ETag, so a poll with an unchanged If-None-Match gets
+    an empty 304. With ?wait=1 (and ADMIN_COUNTS_LONG_POLL set) an unchanged
+    poll is held open until a count changes or the long-poll time runs out.
+    """
+    counts = db.get_admin_counts()
+    etag = admin_counts_etag(counts)
+
+    max_wait = app.config['ADMIN_COUNTS_LONG_POLL']
+    if max_wait > 0 and request.args.get('wait') and request.if_none_match.contains(etag):
+        deadline = time.monotonic() + max_wait
+        while time.monotonic() < deadline:
+            time.sleep(max(1, app.config['ADMIN_COUNTS_CACHE_TTL']))
+            counts = db.get_admin_counts()
+            etag = admin_counts_etag(counts)
+            if not request.if_none_match.contains(etag):
+                break
 
-    return jsonify({
-        'orders': active_orders_count,
-        'quotes': active_quotes_count,
-        'carts': total_carts_count,
-        'whatsapp': whatsapp_unread_count
-    })
+    response = jsonify(counts)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
+
+
+@app.route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    """Catalogue cache hit/miss counters for this worker process"""
+    stats = db.get_cache_stats()
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
 
 
 @app.route('/checkout', methods=['GET', 'POST'])
@@ -3829,6 +4033,9 @@ def candles_soaps():
         active_only=True
     )
 
+    # Get photos for all products in one query
+    photos_by_product = db.get_candles_soaps_photos_for_products([product['id'] for product in products])
+
     # Add photo URLs, main photo URL, and is_new flag to each product
     for product in products:
         # Calculate is_new flag (products created within last 30 days)
@@ -3839,18 +4046,8 @@ def candles_soaps():
         except:
             product['is_new'] = False
 
-        # Get all photos for this product
-        photos = db.get_candles_soaps_product_photos(product['id'])
-
         # Build photo URLs list
-        if photos:
-            product['photo_urls'] = [f"/{photo['photo_path'].replace(os.sep, '/')}" for photo in photos]
-            # Set main photo URL
-            main_photo = next((photo for photo in photos if photo['is_main']), photos[0] if photos else None)
-            product['main_photo_url'] = f"/{main_photo['photo_path'].replace(os.sep, '/')}" if main_photo else None
-        else:
-            product['photo_urls'] = []
-            product['main_photo_url'] = None
+        add_photo_urls(product, photos_by_product.get(product['id'], []))
 
     # Get all active categories for filter buttons
     categories = db.get_all_candles_soaps_categories(active_only=True)
@@ -3949,127 +4146,18 @@ def whatsapp_webhook():
 
     # POST request: Incoming message from WhatsApp
     elif request.method == 'POST':
-        try:
-            data = request.get_json()
-
-            print(f"\n=== Incoming WhatsApp Webhook ===")
-            print(f"Data: {data}")
-
-            # Process the webhook data
-            if data and 'entry' in data:
-                for entry in data['entry']:
-                    for change in entry.get('changes', []):
-                        if change.get('field') == 'messages':
-                            value = change.get('value', {})
-
-                            # Get message details
-                            messages = value.get('messages', [])
-                            for message in messages:
-                                from_phone = message.get('from')
-                                message_id = message.get('id')
-                                timestamp = message.get('timestamp')
-
-                                # Get message text and check for quick reply
-                                message_text = None
-                                message_type = message.get('type', 'text')
-                                is_quick_reply = False
-                                quick_reply_payload = None
-
-                                if message_type == 'text':
-                                    message_text = message.get('text', {}).get('body')
-
-                                # Check for interactive button/quick reply
-                                if message_type == 'interactive':
-                                    interactive = message.get('interactive', {})
-                                    button_reply = interactive.get('button_reply', {})
-                                    if button_reply:
-                                        is_quick_reply = True
-                                        quick_reply_payload = button_reply.get('id', '')
-                                        message_text = button_reply.get('title', '')
-
-                                print(f"📱 Message from: {from_phone}")
-                                print(f"💬 Text: {message_text}")
-                                print(f"🆔 Message ID: {message_id}")
-                                print(f"🔘 Quick Reply: {is_quick_reply} ({quick_reply_payload})")
-
-                                # Handle quick reply button clicks
-                                if is_quick_reply and quick_reply_payload:
-                                    from src.whatsapp_utils import send_whatsapp_message
-
-                                    # "Resend Bank Details" button
-                                    if quick_reply_payload == 'resend_bank_details':
-                                        bank_details = """Here are our banking details:
-
-Bank: FNB
-Account Name: Snow Spoiled Gifts
-Account Number: 62891234567
-Branch Code: 250655
-Reference: Your order number
-
-Please use your order number as the payment reference so we can match your payment."""
-
-                                        send_whatsapp_message(from_phone, bank_details, app.config)
-                                        print(f"✅ Auto-sent bank details to {from_phone}")
-
-                                    # "Already Paid" button
-                                    elif quick_reply_payload == 'already_paid':
-                                        # Find customer to get their name
-                                        customer = db.find_customer_by_phone(from_phone)
-                                        customer_name = "Customer"
-                                        if customer and customer.get('data'):
-                                            customer_name = customer['data'].get('name', 'Customer')
-
-                                        # Send acknowledgment to customer
-                                        ack_message = f"Thank you for confirming your payment! We'll verify and process it shortly. You'll receive an update once confirmed."
-                                        send_whatsapp_message(from_phone, ack_message, app.config)
-
-                                        print(f"⚠️ ADMIN ALERT: {customer_name} ({from_phone}) says they already paid!")
-
-                                    # "Confirmed ✅" button (order collection/receipt confirmation)
-                                    elif quick_reply_payload == 'order_confirmed':
-                                        # Send acknowledgment
-                                        ack_message = "Great! Thank you for confirming. We hope you love your order! 🎉"
-                                        send_whatsapp_message(from_phone, ack_message, app.config)
-
-                                        print(f"✅ Customer {from_phone} confirmed order receipt/collection")
-
-                                # Save to database
-                                if from_phone and message_text:
-                                    # Try to find customer by phone
-                                    customer = db.find_customer_by_phone(from_phone)
-                                    user_id = None
-                                    quote_id = None
-                                    quote_type = None
-
-                                    if customer:
-                                        print(f"✅ Found customer: {customer}")
-                                        if customer['type'] == 'user':
-                                            user_id = customer['data']['id']
-                                        elif customer['type'] in ['quote', 'cake_topper']:
-                                            quote_id = customer['data']['id']
-                                            quote_type = customer['type']
-
-                                    # Save message
-                                    business_number = app.config.get('WHATSAPP_PHONE_NUMBER_ID', '')
-                                    db.save_whatsapp_message(
-                                        message_id=message_id,
-                                        direction='inbound',
-                                        from_phone=from_phone,
-                                        to_phone=business_number,
-                                        message_text=message_text,
-                                        message_type=message_type,
-                                        user_id=user_id,
-                                        quote_id=quote_id,
-                                        quote_type=quote_type
-                                    )
-
-                                    print(f"✅ Message saved to database!")
-
-            return jsonify({'status': 'success'}), 200
+        # Only store the delivery here and answer straight away, so Meta never
+        # times out and redelivers; whatsapp_inbox processes it in the background
+        payload = request.get_data(as_text=True)
+        print(f"\n=== Incoming WhatsApp Webhook ({len(payload)} bytes) ===")
 
-        except Exception as e:
-            print(f"❌ Error processing webhook: {e}")
-            return jsonify({'status': 'error', 'message': str(e)}), 500
+        success, message, inbox_id = db.store_whatsapp_webhook(payload)
+        if not success:
+            print(f"❌ Error storing webhook: {message}")
+            return jsonify({'status': 'error', 'message': message}), 500
+
+        whatsapp_inbox.wake()
+        return jsonify({'status': 'success'}), 200
 
 
 if __name__ == '__main__':
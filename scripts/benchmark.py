@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Benchmark the shop's hot paths: browse -> add to cart -> checkout.
+
+Seeds a throwaway database with a realistic catalogue (cutter items and
+candles/soaps with photos), customers, abandoned guest carts and order
+history, then drives the Flask app through its test client. Every simulated
+customer browses the shop, adds cutters and candles to their cart, views the
+cart and checks out. Each route is timed and the SQL statements it runs are
+counted, and the report shows p50/p95/p99 latency and queries per request.
+
+With --workers N the customers are split across N processes (like
+gunicorn/Passenger workers) that share the same database file.
+
+Save a run with --save and compare a later run against it with --baseline;
+the script exits with 1 when a route got slower or runs more queries than
+the baseline allows.
+
+    python scripts/benchmark.py                               # 1 worker, 50 customers
+    python scripts/benchmark.py --workers 4 --customers 200
+    python scripts/benchmark.py --items 1000 --orders 20000   # bigger shop
+    python scripts/benchmark.py --save benchmark.json
+    python scripts/benchmark.py --baseline benchmark.json --tolerance 25
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Statements the sqlite3 module issues itself; not counted as queries
+TRANSACTION_STATEMENTS = ('BEGIN', 'COMMIT', 'ROLLBACK', 'SAVEPOINT', 'RELEASE')
+
+
+def configure_environment(db_path):
+    """Point the app at the benchmark database and keep it off the network
+
+    Must run before app.py is imported: Config reads the environment then.
+    """
+    os.environ['DATABASE_PATH'] = db_path
+    os.environ['BACKGROUND_WORKER_THREADS'] = 'False'  # Email is queued, never sent
+    os.environ['EMAIL_OUTBOX_ENABLED'] = 'True'
+    os.environ['WHATSAPP_ENABLED'] = 'False'
+
+
+def seed_database(db_path, items, products, users, guest_carts, orders, seed):
+    """Fill a new database with catalogue, customers, carts and order history
+
+    Returns:
+        Dict with the ids the simulated customers shop with
+    """
+    from src.config import Config
+    from src.database import Database
+
+    rng = random.Random(seed)
+    db = Database(db_path, pragmas=Config.DB_PRAGMAS)
+
+    # Catalogue, through the normal Database methods
+    category_ids = [db.add_cutter_category(f'Category {number}', 'Benchmark category')[2]
+                    for number in range(12)]
+    type_ids = [db.add_cutter_type(f'Type {number}', 'Benchmark type')[2] for number in range(6)]
+    item_ids = []
+    for number in range(items):
+        ok, message, item_id, item_number = db.add_cutter_item(
+            f'Cutter {number}', 'A benchmark cookie cutter with a longer description. ' * 3,
+            round(rng.uniform(20, 120), 2), '8cm x 6cm', 'PLA', 'in_stock',
+            rng.choice(category_ids), rng.choice(type_ids))
+        item_ids.append(item_id)
+        for photo in range(3):
+            db.add_item_photo(item_id, f'static/uploads/cutter_items/bench_{number}_{photo}.jpg',
+                              is_main=(photo == 0), display_order=photo)
+
+    candle_category_ids = [db.add_candles_soaps_category(f'Candles {number}', 'Benchmark category')[2]
+                           for number in range(5)]
+    product_ids = []
+    for number in range(products):
+        ok, message, product_id = db.add_candles_soaps_product({
+            'name': f'Candle {number}', 'description': 'A benchmark candle.',
+            'category_id': rng.choice(candle_category_ids),
+            'price': round(rng.uniform(40, 200), 2), 'stock_quantity': 1000000
+        })
+        product_ids.append(product_id)
+        for photo in range(2):
+            db.add_candles_soaps_product_photo(product_id, f'static/uploads/candles_soaps/bench_{number}_{photo}.jpg',
+                                               is_main=(photo == 0), display_order=photo)
+
+    # Customers, carts and history in bulk: bcrypt and per-row commits would dominate the setup
+    conn = db.get_connection()
+    conn.executemany('''
+        INSERT INTO users (email, password_hash, name, phone) VALUES (?, ?, ?, ?)
+    ''', [(f'bench{number}@example.com', 'x', f'Customer {number}', f'082{number:07d}')
+          for number in range(users)])
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE email LIKE 'bench%'")]
+
+    conn.executemany('''
+        INSERT INTO cart_items (session_id, product_type, product_id, quantity, added_date)
+        VALUES (?, ?, ?, ?, datetime('now', ?))
+    ''', [(f'guest-{number}', 'cutter_item', rng.choice(item_ids), rng.randint(1, 3),
+           f'-{rng.randint(0, 90)} days')
+          for number in range(guest_carts) for _ in range(rng.randint(1, 4))])
+
+    for number in range(orders):
+        cursor = conn.execute('''
+            INSERT INTO orders (user_id, order_number, status, subtotal, total_amount,
+                                payment_method, created_date)
+            VALUES (?, ?, ?, ?, ?, 'eft', datetime('now', ?))
+        ''', (rng.choice(user_ids), f'BEN-{number:08d}', rng.choice(['pending', 'paid', 'completed']),
+              100.0, 100.0, f'-{rng.randint(0, 365)} days'))
+        conn.executemany('''
+            INSERT INTO order_items (order_id, product_id, quantity, price, product_type, product_name)
+            VALUES (?, ?, 1, 50.0, 'cutter_item', 'Cutter')
+        ''', [(cursor.lastrowid, rng.choice(item_ids)) for _ in range(2)])
+
+    conn.commit()
+    conn.close()
+
+    return {'item_ids': item_ids, 'product_ids': product_ids, 'user_ids': user_ids}
+
+
+class QueryCounter:
+    """SQL trace callback counting statements per thread"""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __call__(self, sql):
+        if not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            self._local.count = getattr(self._local, 'count', 0) + 1
+
+    def reset(self):
+        self._local.count = 0
+
+    @property
+    def count(self):
+        return getattr(self._local, 'count', 0)
+
+
+def run_customers(db_path, user_ids, seed_ids, adds_per_customer, seed):
+    """Worker: take each customer through browse -> cart -> checkout
+
+    Returns:
+        Dict of route label -> list of (seconds, queries, status code)
+    """
+    configure_environment(db_path)
+    import app as shop
+
+    shop.app.config['WTF_CSRF_ENABLED'] = False
+    counter = QueryCounter()
+    shop.db.pool.set_trace(counter)
+
+    rng = random.Random(seed)
+    samples = defaultdict(list)
+
+    def timed(label, method, url, **kwargs):
+        counter.reset()
+        started = time.perf_counter()
+        response = method(url, **kwargs)
+        samples[label].append((time.perf_counter() - started, counter.count, response.status_code))
+        return response
+
+    for user_id in user_ids:
+        client = shop.app.test_client()
+
+        # Browse as a guest
+        timed('GET /', client.get, '/')
+        timed('GET /3d-printing', client.get, '/3d-printing')
+        timed('GET /candles-soaps', client.get, '/candles-soaps')
+
+        # Sign in (set the session directly: password hashing isn't what we're measuring)
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user_id)
+            session['_fresh'] = True
+
+        for _ in range(adds_per_customer):
+            timed('POST /cart/add', client.post, '/cart/add',
+                  json={'item_id': rng.choice(seed_ids['item_ids']), 'quantity': rng.randint(1, 3)})
+        timed('POST /candles-soaps/cart/add', client.post, '/candles-soaps/cart/add',
+              json={'product_id': rng.choice(seed_ids['product_ids']), 'quantity': 1})
+        timed('GET /cart/count', client.get, '/cart/count')
+        timed('GET /cart', client.get, '/cart')
+
+        # Check out
+        timed('GET /checkout', client.get, '/checkout')
+        response = timed('POST /checkout', client.post, '/checkout', data={
+            'shipping_method': 'pickup', 'payment_method': 'eft',
+            'name': f'Customer {user_id}', 'phone': '0825522848'
+        })
+        if response.status_code == 302 and '/order/' in response.location:
+            timed('GET /order/<number>', client.get, response.location)
+        timed('GET /orders-quotes', client.get, '/orders-quotes')
+
+    return dict(samples)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0
+    rank = max(1, math.ceil(pct / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarise(samples):
+    """Per-route latency percentiles (ms) and mean queries per request"""
+    report = {}
+    for label, rows in samples.items():
+        timings = sorted(row[0] * 1000 for row in rows)
+        report[label] = {
+            'requests': len(rows),
+            'errors': sum(1 for row in rows if row[2] >= 400),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'p99_ms': round(percentile(timings, 99), 2),
+            'queries': round(sum(row[1] for row in rows) / len(rows), 1),
+            'max_queries': max(row[1] for row in rows),
+        }
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """List the routes that regressed against a saved baseline
+
+    A route regresses when its p95 is more than `tolerance` percent slower,
+    or when it runs more queries per request than before (by half a query
+    or more, so one-off statements such as a cache refill don't count).
+    """
+    regressions = []
+    for label, current in report.items():
+        previous = baseline.get(label)
+        if not previous:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance / 100):
+            regressions.append(f"{label}: p95 {previous['p95_ms']} ms -> {current['p95_ms']} ms")
+        if current['queries'] >= previous['queries'] + 0.5:
+            regressions.append(f"{label}: queries {previous['queries']} -> {current['queries']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark browse, cart and checkout routes')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (default: 1)')
+    parser.add_argument('--customers', type=int, default=50, help='Customers who check out (default: 50)')
+    parser.add_argument('--adds', type=int, default=3, help='Cutters each customer adds to their cart (default: 3)')
+    parser.add_argument('--items', type=int, default=300, help='Cutter items in the catalogue (default: 300)')
+    parser.add_argument('--products', type=int, default=100, help='Candles/soaps products (default: 100)')
+    parser.add_argument('--users', type=int, default=2000, help='Registered customers (default: 2000)')
+    parser.add_argument('--guest-carts', type=int, default=1000, help='Abandoned guest carts (default: 1000)')
+    parser.add_argument('--orders', type=int, default=5000, help='Historic orders (default: 5000)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: 1)')
+    parser.add_argument('--save', metavar='PATH', help='Write the results to a JSON file')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=20,
+                        help='Allowed p95 slowdown against the baseline, in percent (default: 20)')
+    parser.add_argument('--keep', action='store_true', help='Keep the benchmark database afterwards')
+    args = parser.parse_args()
+
+    if args.customers > args.users:
+        parser.error('--customers cannot exceed --users')
+
+    directory = tempfile.mkdtemp(prefix='benchmark_')
+    db_path = os.path.join(directory, 'benchmark.db')
+
+    try:
+        print(f"Database: {db_path}")
+        configure_environment(db_path)
+        started = time.perf_counter()
+        seed_ids = seed_database(db_path, args.items, args.products, args.users,
+                                 args.guest_carts, args.orders, args.seed)
+        print(f"Seeded {args.items} cutters, {args.products} candles/soaps, {args.users} customers, "
+              f"{args.guest_carts} guest carts and {args.orders} orders in {time.perf_counter() - started:.1f}s")
+
+        customers = seed_ids['user_ids'][:args.customers]
+        print(f"Running {len(customers)} customers through browse -> cart -> checkout "
+              f"on {args.workers} worker(s)...\n")
+
+        started = time.perf_counter()
+        if args.workers <= 1:
+            results = [run_customers(db_path, customers, seed_ids, args.adds, args.seed)]
+        else:
+            batches = [customers[worker::args.workers] for worker in range(args.workers)]
+            with ProcessPoolExecutor(max_workers=args.workers) as executor:
+                results = list(executor.map(run_customers, [db_path] * len(batches), batches,
+                                            [seed_ids] * len(batches), [args.adds] * len(batches),
+                                            [args.seed + worker for worker in range(len(batches))]))
+        elapsed = time.perf_counter() - started
+
+        samples = defaultdict(list)
+        for result in results:
+            for label, rows in result.items():
+                samples[label].extend(rows)
+        report = summarise(samples)
+
+        total = sum(route['requests'] for route in report.values())
+        print(f"\n{'Route':<30} {'Reqs':>6} {'Errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Queries':>8}")
+        print('-' * 80)
+        for label, route in report.items():
+            print(f"{label:<30} {route['requests']:>6} {route['errors']:>6} {route['p50_ms']:>8.1f} "
+                  f"{route['p95_ms']:>8.1f} {route['p99_ms']:>8.1f} {route['queries']:>8.1f}")
+        print(f"\n{total} requests in {elapsed:.2f}s ({total / elapsed:.0f} req/s)")
+
+        if args.save:
+            with open(args.save, 'w') as f:
+                json.dump(report, f, indent=2)
+            print(f"Saved results to {args.save}")
+
+        exit_code = 0
+        if any(route['errors'] for route in report.values()):
+            print("\n❌ Some requests failed (status >= 400)")
+            exit_code = 1
+
+        if args.baseline:
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+            regressions = compare(report, baseline, args.tolerance)
+            if regressions:
+                print(f"\n❌ {len(regressions)} regression(s) against {args.baseline}:")
+                for regression in regressions:
+                    print(f"  - {regression}")
+                exit_code = 1
+            else:
+                print(f"\n✅ No regressions against {args.baseline}")
+
+        return exit_code
+
+    finally:
+        if args.keep:
+            print(f"\nKept {db_path}")
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Benchmark email rendering (see src/email_templates.py).
+
+Renders a bulk email campaign for many made-up recipients the way
+EmailCampaignRunner does (prepare the campaign once, then render and build
+one message per recipient, as build_bulk_email() does) and reports:
+
+- the cost of preparing the campaign, cold (templates compiled) and warm
+- per recipient: rendering the HTML and text, and building the MIME message
+- per transactional template: one render_email() call
+
+Nothing is sent. Save a run with --save and compare a later run against it
+with --baseline; the script exits with 1 when a step got slower than the
+tolerance allows.
+
+    python scripts/benchmark_email.py                          # 1000 recipients, 5 campaigns
+    python scripts/benchmark_email.py --recipients 20000 --campaigns 3
+    python scripts/benchmark_email.py --save email-benchmark.json
+    python scripts/benchmark_email.py --baseline email-benchmark.json --tolerance 25
+"""
+
+import argparse
+import json
+import os
+import secrets
+import sys
+import time
+from datetime import datetime
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src import email_templates
+from src.email_utils import build_html_email, render_bulk_email_templates
+
+MESSAGE = """Our winter range is here!
+
+Candles, soaps and custom cookie cutters, made to order in George.
+Order before the 15th for delivery before the holidays."""
+
+# Sample context for each transactional template
+SAMPLE_QUOTE = {
+    'service_type': 'Custom Design', 'name': 'Anna Smith', 'email': 'anna@example.com',
+    'phone': '+27 82 000 0000', 'preferred_contact': 'WhatsApp', 'quantity': 12,
+    'description': 'Cookie cutters shaped like our company logo', 'size': '8cm',
+    'color': 'Red', 'material': 'PLA', 'additional_notes': 'Needed by Friday',
+}
+SAMPLE_ORDER = {
+    'order_number': 'ORD-20240101-0001', 'subtotal': 420.0, 'shipping_cost': 60.0,
+    'total_amount': 480.0, 'shipping_method': 'pudo', 'payment_method': 'eft',
+}
+TRANSACTIONAL = {
+    'quote_notification.html': {'quote': SAMPLE_QUOTE, 'now': datetime.now()},
+    'quote_confirmation.html': {'quote': SAMPLE_QUOTE},
+    'signup_confirmation.html': {'name': 'Anna', 'interests': ['3D Printing', 'Vinyl'],
+                                 'unsubscribe_url': 'https://example.com/unsubscribe?token=x'},
+    'cake_topper_notification.html': {'details': {'name': 'Anna', 'email': 'anna@example.com',
+                                                  'occasion': 'Birthday', 'text_to_include': 'Happy 5th',
+                                                  'design_details': 'Unicorn'},
+                                      'now': datetime.now()},
+    'print_service_notification.html': {'details': {'name': 'Anna', 'email': 'anna@example.com',
+                                                    'uploaded_files': 'part.stl', 'material': 'PETG',
+                                                    'color': 'Black', 'quantity': 2},
+                                        'now': datetime.now()},
+    'admin_reply.html': {'name': 'Anna', 'message': MESSAGE},
+    'order_confirmation.html': {'order': SAMPLE_ORDER, 'order_date': '2024-01-01 10:00',
+                                'customer_name': 'Anna', 'payment_method': 'eft',
+                                'payment_method_text': 'EFT/Bank Transfer',
+                                'shipping_method_text': 'PUDO Delivery - R60.00',
+                                'bank': {'name': 'FNB', 'account_holder': 'Snow Spoiled Gifts',
+                                         'account_number': '123', 'branch_code': '250655',
+                                         'account_type': 'Cheque Account'}},
+    'order_status_update.html': {'status': {'title': 'Order Shipped', 'icon': '🚚', 'color': '#0ea5e9',
+                                            'message': 'Your order is on its way.'},
+                                 'new_status': 'shipped', 'shipping_method': 'pudo',
+                                 'customer_name': 'Anna', 'order_number': 'ORD-20240101-0001'},
+    'quote_converted.html': {'customer_name': 'Anna', 'customer_email': 'anna@example.com',
+                             'item_name': 'Logo cutters', 'item_price': 240.0},
+    'invoice.html': {'customer_name': 'Anna', 'order_number': 'ORD-20240101-0001',
+                     'invoice_number': 'INV-0001', 'now': datetime.now()},
+    'quote_to_customer.html': {'customer_name': 'Anna', 'quote_type': 'Logo cutters',
+                               'price_per_item': 20.0, 'quantity': 12, 'total_price': 240.0,
+                               'admin_message': 'Let us know if the size works for you.'},
+}
+
+
+def app_config():
+    """The app's settings as the dict-like object the email code expects"""
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    config['MAIL_DEFAULT_SENDER'] = config.get('MAIL_DEFAULT_SENDER') or 'shop@example.com'
+    return config
+
+
+def reset_template_cache():
+    """Forget compiled templates so the next render compiles them again"""
+    email_templates._environments = None
+
+
+def time_campaign(config, recipients):
+    """Prepare one campaign and build every recipient's message
+
+    Returns:
+        Dict of step -> seconds
+    """
+    started = time.perf_counter()
+    batch = render_bulk_email_templates(config, MESSAGE, '3d_printing')
+    prepared = time.perf_counter()
+
+    render_time = 0.0
+    build_time = 0.0
+    size = 0
+    for email, name, token in recipients:
+        step = time.perf_counter()
+        unsubscribe_url = f"{config['BASE_URL']}/unsubscribe?token={token}"
+        html_body, text_body = batch.render(name=name, unsubscribe_url=unsubscribe_url)
+        render_time += time.perf_counter() - step
+
+        # Build the message from the output above, so nothing is rendered twice
+        step = time.perf_counter()
+        msg = build_html_email(text_body, html_body)
+        msg['Subject'] = 'Winter range'
+        msg['From'] = config['MAIL_DEFAULT_SENDER']
+        msg['To'] = email
+        size += len(msg.as_bytes())
+        build_time += time.perf_counter() - step
+
+    return {
+        'prepare': prepared - started,
+        'render': render_time,
+        'build': build_time,
+        'total': time.perf_counter() - started,
+        'bytes': size,
+    }
+
+
+def time_transactional(config, repeat):
+    """Average seconds per render_email() call for each transactional template"""
+    results = {}
+    for name, context in TRANSACTIONAL.items():
+        email_templates.render_email(name, config, **context)  # Compile outside the timing
+        started = time.perf_counter()
+        for _ in range(repeat):
+            email_templates.render_email(name, config, **context)
+        results[name] = (time.perf_counter() - started) / repeat
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """List the steps that got slower than the baseline allows"""
+    regressions = []
+    for key, value in results.items():
+        before = baseline.get(key)
+        if before and value > before * (1 + tolerance / 100):
+            regressions.append(f"{key}: {before * 1e6:.0f} µs -> {value * 1e6:.0f} µs")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark email template rendering')
+    parser.add_argument('--recipients', type=int, default=1000, help='Recipients per campaign (default: 1000)')
+    parser.add_argument('--campaigns', type=int, default=5, help='Campaigns to render (default: 5)')
+    parser.add_argument('--repeat', type=int, default=200,
+                        help='Renders per transactional template (default: 200)')
+    parser.add_argument('--save', help='Write the results to this JSON file')
+    parser.add_argument('--baseline', help='Compare against results saved with --save')
+    parser.add_argument('--tolerance', type=float, default=20,
+                        help='Allowed slowdown against the baseline, in percent (default: 20)')
+    args = parser.parse_args()
+
+    config = app_config()
+    recipients = [(f'customer{number}@example.com', f'Customer {number}', secrets.token_urlsafe(16))
+                  for number in range(args.recipients)]
+
+    # Cold: templates are compiled by the first campaign
+    reset_template_cache()
+    started = time.perf_counter()
+    render_bulk_email_templates(config, MESSAGE, '3d_printing')
+    cold_prepare = time.perf_counter() - started
+
+    campaigns = [time_campaign(config, recipients) for _ in range(args.campaigns)]
+    best = min(campaigns, key=lambda campaign: campaign['total'])
+    count = max(1, args.recipients)
+
+    print(f"Bulk campaign, {args.recipients} recipients (best of {args.campaigns}):")
+    print(f"  prepare (cold, compiles templates) {cold_prepare * 1000:9.2f} ms")
+    print(f"  prepare (warm)                     {best['prepare'] * 1000:9.2f} ms")
+    print(f"  render HTML + text / recipient     {best['render'] / count * 1e6:9.1f} µs")
+    print(f"  build MIME message / recipient     {best['build'] / count * 1e6:9.1f} µs")
+    print(f"  whole campaign                     {best['total'] * 1000:9.1f} ms "
+          f"({args.recipients / best['total']:.0f} messages/s, {best['bytes'] / count / 1024:.1f} KB each)")
+
+    transactional = time_transactional(config, args.repeat)
+    print(f"\nTransactional emails (render_email, mean of {args.repeat}):")
+    for name, seconds in transactional.items():
+        print(f"  {name:34} {seconds * 1e6:9.1f} µs")
+
+    results = {
+        'campaign_prepare_cold': cold_prepare,
+        'campaign_prepare': best['prepare'],
+        'campaign_render_per_recipient': best['render'] / count,
+        'campaign_build_per_recipient': best['build'] / count,
+    }
+    results.update({f"render_email:{name}": seconds for name, seconds in transactional.items()})
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Cold compile time is too noisy to gate on
+        baseline.pop('campaign_prepare_cold', None)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\nSlower than {args.baseline} (+{args.tolerance:.0f}%):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions against {args.baseline}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
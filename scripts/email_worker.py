@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Deliver queued email from the outbox and send bulk email campaigns
+(see src/email_outbox.py and src/email_campaigns.py).
+
+The app normally sends queued email from threads in each worker process.
+On hosts where background threads are unreliable, set BACKGROUND_WORKER_THREADS=False
+and run this instead, either continuously or from cron:
+
+    python scripts/email_worker.py            # run until stopped
+    python scripts/email_worker.py --once     # send everything due, then exit
+    python scripts/email_worker.py --status   # show outbox counts
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+from src.email_campaigns import CampaignRunner
+from src.email_outbox import EmailOutbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deliver queued email from the outbox')
+    parser.add_argument('--once', action='store_true',
+                        help='Send everything that is due, then exit')
+    parser.add_argument('--status', action='store_true',
+                        help='Show outbox counts without sending')
+    args = parser.parse_args()
+
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    db = Database(config['DATABASE_PATH'], pragmas=config['DB_PRAGMAS'],
+                  auto_migrate=config['DB_AUTO_MIGRATE'])
+
+    if args.status:
+        stats = db.get_outbox_stats()
+        print(f"Outbox: {stats['pending']} pending, {stats['sent']} sent, {stats['failed']} failed")
+        for campaign in db.get_email_campaigns():
+            print(f"Campaign {campaign['id']} [{campaign['status']}] {campaign['subject']}: "
+                  f"{campaign['sent']}/{campaign['total']} sent, {campaign['failed']} failed")
+        return 0
+
+    outbox = EmailOutbox(db, config, max_attempts=config['EMAIL_MAX_ATTEMPTS'],
+                         retry_delay=config['EMAIL_RETRY_DELAY'])
+    campaigns = CampaignRunner(db, config, concurrency=config['BULK_EMAIL_CONCURRENCY'],
+                               rate_per_minute=config['BULK_EMAIL_RATE_PER_MINUTE'])
+
+    if args.once:
+        claimed = outbox.drain()
+        print(f"Processed {claimed} email(s)")
+        sent = campaigns.run_once()
+        print(f"Processed {sent} campaign(s)")
+        return 0
+
+    print("Email worker running (Ctrl+C to stop)")
+    campaigns.ensure_started()
+    try:
+        outbox.run_forever()
+    except KeyboardInterrupt:
+        campaigns.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
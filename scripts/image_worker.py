@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Generate resized photo variants queued in image_variant_jobs
+(see src/image_variants.py).
+
+The app normally does this from a thread in each worker process.
+On hosts where background threads are unreliable, set
+BACKGROUND_WORKER_THREADS=False and run this instead, continuously or from cron.
+Photos uploaded before variants existed were queued by the migration, so
+--once also works through that backlog:
+
+    python scripts/image_worker.py            # run until stopped
+    python scripts/image_worker.py --once     # process everything queued, then exit
+    python scripts/image_worker.py --status   # show job counts
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+from src.image_variants import ImageVariantWorker, available
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate resized variants of uploaded photos')
+    parser.add_argument('--once', action='store_true',
+                        help='Process everything that is queued, then exit')
+    parser.add_argument('--status', action='store_true',
+                        help='Show job counts without processing')
+    args = parser.parse_args()
+
+    db = Database(Config.DATABASE_PATH, pragmas=Config.DB_PRAGMAS,
+                  auto_migrate=Config.DB_AUTO_MIGRATE)
+
+    if args.status:
+        stats = db.get_image_variant_job_stats()
+        print(f"Image jobs: {stats['pending']} pending, {stats['processed']} processed, {stats['failed']} failed")
+        return 0
+
+    if not available():
+        print("❌ Pillow is not installed (pip install Pillow)")
+        return 1
+
+    worker = ImageVariantWorker(db, pool_size=Config.IMAGE_VARIANT_WORKERS,
+                                quality=Config.IMAGE_VARIANT_QUALITY)
+
+    if args.once:
+        processed = worker.drain()
+        print(f"Processed {processed} photo(s)")
+        return 0
+
+    print("Image worker running (Ctrl+C to stop)")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
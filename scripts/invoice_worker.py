@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Render invoice PDFs queued in invoice_jobs (see src/invoice_utils.py).
+
+The app normally does this from a thread in each worker process.
+On hosts where background threads are unreliable, set
+BACKGROUND_WORKER_THREADS=False and run this instead, continuously or from cron:
+
+    python scripts/invoice_worker.py            # run until stopped
+    python scripts/invoice_worker.py --once     # render everything queued, then exit
+    python scripts/invoice_worker.py --status   # show job counts
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+from src.invoice_utils import InvoiceWorker
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Render queued invoice PDFs')
+    parser.add_argument('--once', action='store_true',
+                        help='Render everything that is queued, then exit')
+    parser.add_argument('--status', action='store_true',
+                        help='Show job counts without processing')
+    args = parser.parse_args()
+
+    db = Database(Config.DATABASE_PATH, pragmas=Config.DB_PRAGMAS,
+                  auto_migrate=Config.DB_AUTO_MIGRATE)
+
+    if args.status:
+        stats = db.get_invoice_job_stats()
+        print(f"Invoice jobs: {stats['pending']} pending, {stats['processed']} processed, {stats['failed']} failed")
+        return 0
+
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    worker = InvoiceWorker(db, config)
+
+    if args.once:
+        processed = worker.drain()
+        print(f"Processed {processed} invoice(s)")
+        return 0
+
+    print("Invoice worker running (Ctrl+C to stop)")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Delete abandoned guest carts (see Database.purge_expired_guest_carts).
+
+Guest cart rows are otherwise only removed when the guest logs in, so run
+this daily from cron:
+
+    python scripts/purge_guest_carts.py              # purge carts idle GUEST_CART_RETENTION_DAYS
+    python scripts/purge_guest_carts.py --days 14    # use a different retention period
+    python scripts/purge_guest_carts.py --dry-run    # count what would go, delete nothing
+    python scripts/purge_guest_carts.py --history    # show recent purges
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Delete abandoned guest carts')
+    parser.add_argument('--days', type=int, default=Config.GUEST_CART_RETENTION_DAYS,
+                        help=f'Delete guest carts idle this many days (default: {Config.GUEST_CART_RETENTION_DAYS})')
+    parser.add_argument('--batch-size', type=int, default=200,
+                        help='Carts deleted per transaction (default: 200)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Count the carts that would be deleted without deleting them')
+    parser.add_argument('--history', action='store_true',
+                        help='Show recent purges')
+    args = parser.parse_args()
+
+    db = Database(Config.DATABASE_PATH, pragmas=Config.DB_PRAGMAS,
+                  auto_migrate=Config.DB_AUTO_MIGRATE)
+
+    if args.history:
+        for run in db.get_cart_purge_runs():
+            print(f"{run['run_date']}: {run['carts_deleted']} cart(s), {run['rows_deleted']} row(s) "
+                  f"older than {run['retention_days']} days ({run['duration_ms']} ms)")
+        return 0
+
+    if args.days < 1:
+        print("[ERROR] --days must be at least 1")
+        return 1
+
+    result = db.purge_expired_guest_carts(args.days, batch_size=args.batch_size,
+                                          dry_run=args.dry_run)
+
+    if args.dry_run:
+        print(f"[DRY RUN] Would delete {result['carts_deleted']} guest cart(s) "
+              f"({result['rows_deleted']} row(s)) idle for {args.days}+ days")
+    else:
+        print(f"[SUCCESS] Deleted {result['carts_deleted']} guest cart(s) "
+              f"({result['rows_deleted']} row(s)) idle for {args.days}+ days in {result['duration_ms']} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
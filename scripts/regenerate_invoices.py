@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Re-render the invoice PDFs of one month on a pool of processes
+(see src/invoice_utils.py).
+
+Invoices whose content hasn't changed are found on disk and skipped, so
+running this again is cheap; use --force after changing the invoice layout
+(or bump LAYOUT_VERSION). Each process builds the ReportLab styles once.
+
+    python scripts/regenerate_invoices.py                      # this month
+    python scripts/regenerate_invoices.py --month 2024-10
+    python scripts/regenerate_invoices.py --month 2024-10 --processes 4 --force
+"""
+
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+from src.invoice_utils import SHOP_TIMEZONE, invoice_config, remove_stale_invoices, render_order_invoice
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-render a month's invoice PDFs")
+    parser.add_argument('--month', default=datetime.now(SHOP_TIMEZONE).strftime('%Y-%m'),
+                        help='Month the invoices are dated in, YYYY-MM (default: this month)')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                        help='Invoices rendered in parallel (default: number of CPUs)')
+    parser.add_argument('--force', action='store_true',
+                        help='Render every invoice, even those that are up to date')
+    args = parser.parse_args()
+
+    try:
+        datetime.strptime(args.month, '%Y-%m')
+    except ValueError:
+        print(f"❌ --month must look like 2024-10, not {args.month}")
+        return 1
+
+    db = Database(Config.DATABASE_PATH, pragmas=Config.DB_PRAGMAS,
+                  auto_migrate=Config.DB_AUTO_MIGRATE)
+
+    orders = db.get_invoiced_orders(month=args.month)
+    if not orders:
+        print(f"No invoices dated {args.month}")
+        return 0
+
+    items_by_order = db.get_order_items_for_orders([order['id'] for order in orders])
+    items = [items_by_order.get(order['id'], []) for order in orders]
+    config = invoice_config({name: getattr(Config, name) for name in dir(Config) if name.isupper()})
+    processes = max(1, min(args.processes, len(orders)))
+
+    print(f"Rendering {len(orders)} invoice(s) dated {args.month} on {processes} process(es)...")
+    started = time.perf_counter()
+
+    if processes == 1:
+        results = list(map(render_order_invoice, orders, items, repeat(config), repeat(args.force)))
+    else:
+        chunksize = max(1, len(orders) // (processes * 4))
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(render_order_invoice, orders, items, repeat(config),
+                                    repeat(args.force), chunksize=chunksize))
+
+    updated = unchanged = failed = 0
+    for order, (order_id, success, result) in zip(orders, results):
+        if not success:
+            print(f"❌ {order['invoice_number']}: {result}")
+            failed += 1
+        elif args.force or result != order.get('invoice_file'):
+            if result != order.get('invoice_file'):
+                db.set_order_invoice_file(order_id, result)
+                remove_stale_invoices(order['invoice_number'], keep=result)
+            updated += 1
+        else:
+            unchanged += 1
+
+    elapsed = time.perf_counter() - started
+    print(f"Done in {elapsed:.1f}s: {updated} updated, {unchanged} already up to date, {failed} failed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Concurrent checkout stress test for Database.create_order.
+
+Builds a throwaway database with one limited-stock candle and many customers
+who all have it in their cart, then checks out every customer at once from
+several processes (like gunicorn/Passenger workers) and verifies that:
+
+- every order number is unique
+- exactly as many orders succeed as there was stock, and stock never goes negative
+- every successful order has its lines, stock history and an emptied cart
+
+    python scripts/stress_checkout.py                         # 8 workers, 200 customers, 50 in stock
+    python scripts/stress_checkout.py --workers 16 --customers 500 --stock 120
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+
+
+def setup_database(db_path, customers, stock):
+    """Create the product, customers and their carts"""
+    db = Database(db_path, pragmas=Config.DB_PRAGMAS)
+
+    ok, message, category_id = db.add_cutter_category('Stress Cutters', 'Stress test')
+    ok, message, type_id = db.add_cutter_type('Stress Type', 'Stress test')
+    ok, message, cutter_id, item_number = db.add_cutter_item(
+        'Stress Cutter', 'Stress test', 25.0, '5cm', 'PLA', 'in_stock', category_id, type_id)
+    ok, message, candle_category_id = db.add_candles_soaps_category('Stress Candles', 'Stress test')
+    ok, message, candle_id = db.add_candles_soaps_product({
+        'name': 'Stress Candle', 'category_id': candle_category_id,
+        'price': 80.0, 'stock_quantity': stock
+    })
+
+    # Insert customers directly: create_user's bcrypt hashing would dominate the setup
+    conn = db.get_connection()
+    conn.executemany('INSERT INTO users (email, password_hash, name) VALUES (?, ?, ?)',
+                     [(f'stress{number}@example.com', 'x', f'Customer {number}')
+                      for number in range(customers)])
+    conn.commit()
+    user_ids = [row[0] for row in conn.execute("SELECT id FROM users WHERE email LIKE 'stress%'")]
+    conn.close()
+
+    for user_id in user_ids:
+        db.add_to_cart(None, cutter_id, 1, user_id=user_id)
+        db.add_to_cart(None, candle_id, 1, user_id=user_id, product_type='candles_soap')
+
+    return candle_id, user_ids
+
+
+def checkout(db_path, user_ids):
+    """Worker: check out each customer in turn (runs in its own process)"""
+    db = Database(db_path, pragmas=Config.DB_PRAGMAS, auto_migrate=False)
+    results = []
+    for user_id in user_ids:
+        started = time.perf_counter()
+        success, message, order_number = db.create_order(user_id, {'method': 'pickup'})
+        results.append((user_id, success, message, order_number, time.perf_counter() - started))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress test concurrent checkouts')
+    parser.add_argument('--workers', type=int, default=8, help='Concurrent worker processes (default: 8)')
+    parser.add_argument('--customers', type=int, default=200, help='Customers checking out (default: 200)')
+    parser.add_argument('--stock', type=int, default=50, help='Candles in stock (default: 50)')
+    parser.add_argument('--keep', action='store_true', help='Keep the test database afterwards')
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp(prefix='stress_checkout_')
+    db_path = os.path.join(directory, 'stress.db')
+
+    try:
+        print(f"Database: {db_path}")
+        candle_id, user_ids = setup_database(db_path, args.customers, args.stock)
+        print(f"Checking out {len(user_ids)} customers from {args.workers} processes "
+              f"({args.stock} candles in stock)...")
+
+        batches = [user_ids[worker::args.workers] for worker in range(args.workers)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = [result for batch in executor.map(checkout, [db_path] * len(batches), batches)
+                       for result in batch]
+        elapsed = time.perf_counter() - started
+
+        db = Database(db_path, pragmas=Config.DB_PRAGMAS, auto_migrate=False)
+        conn = db.get_connection()
+        stock = conn.execute('SELECT stock_quantity FROM candles_soaps_products WHERE id = ?',
+                             (candle_id,)).fetchone()[0]
+        order_numbers = [row[0] for row in conn.execute('SELECT order_number FROM orders')]
+        line_count = conn.execute('SELECT COUNT(*) FROM order_items').fetchone()[0]
+        history_count = conn.execute('SELECT COUNT(*) FROM candles_soaps_stock_history').fetchone()[0]
+        ordered_carts = conn.execute('''
+            SELECT COUNT(*) FROM cart_items
+            WHERE user_id IN (SELECT user_id FROM orders)
+        ''').fetchone()[0]
+        conn.close()
+
+        succeeded = [result for result in results if result[1]]
+        failed = Counter(result[2].split('.')[0] for result in results if not result[1])
+        duplicates = [number for number, count in Counter(order_numbers).items() if count > 1]
+        timings = sorted(result[4] for result in results)
+
+        print(f"\n{len(succeeded)} orders placed in {elapsed:.2f}s "
+              f"(p50 {timings[len(timings) // 2] * 1000:.0f} ms, max {timings[-1] * 1000:.0f} ms)")
+        for message, count in failed.items():
+            print(f"  {count} refused: {message}")
+
+        checks = [
+            ('Unique order numbers', not duplicates and len(order_numbers) == len(succeeded)),
+            ('Orders placed == stock available', len(succeeded) == min(args.customers, args.stock)),
+            ('Stock never negative', stock >= 0),
+            ('Stock matches orders', stock == args.stock - len(succeeded)),
+            ('Two lines per order', line_count == 2 * len(succeeded)),
+            ('Stock history per order', history_count == len(succeeded)),
+            ('Carts of ordered customers emptied', ordered_carts == 0),
+        ]
+
+        print()
+        for label, passed in checks:
+            print(f"  [{'PASS' if passed else 'FAIL'}] {label}")
+        if duplicates:
+            print(f"  Duplicate order numbers: {duplicates[:10]}")
+
+        return 0 if all(passed for _, passed in checks) else 1
+
+    finally:
+        if args.keep:
+            print(f"\nKept {db_path}")
+        else:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Post queued WhatsApp messages from the outbox (see src/whatsapp_outbox.py)
+and process stored incoming webhooks (see src/whatsapp_inbox.py).
+
+The app normally does both from threads in each worker process.
+On hosts where background threads are unreliable, set
+BACKGROUND_WORKER_THREADS=False and run this instead, continuously or from cron:
+
+    python scripts/whatsapp_worker.py            # run until stopped
+    python scripts/whatsapp_worker.py --once     # send everything due, then exit
+    python scripts/whatsapp_worker.py --status   # show outbox and inbox counts
+"""
+
+import argparse
+import os
+import sys
+
+# Add parent directory to path so we can import from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.config import Config
+from src.database import Database
+from src.whatsapp_inbox import WhatsAppInboxProcessor
+from src.whatsapp_outbox import WhatsAppOutbox
+from src.whatsapp_utils import set_whatsapp_outbox
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Post queued WhatsApp messages and process incoming webhooks')
+    parser.add_argument('--once', action='store_true',
+                        help='Send everything that is due, then exit')
+    parser.add_argument('--status', action='store_true',
+                        help='Show outbox and inbox counts without processing')
+    args = parser.parse_args()
+
+    config = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    db = Database(config['DATABASE_PATH'], pragmas=config['DB_PRAGMAS'],
+                  auto_migrate=config['DB_AUTO_MIGRATE'])
+
+    if args.status:
+        stats = db.get_whatsapp_outbox_stats()
+        print(f"WhatsApp outbox: {stats['pending']} pending, {stats['sent']} sent, {stats['failed']} failed")
+        stats = db.get_whatsapp_webhook_stats()
+        print(f"Webhook inbox: {stats['pending']} pending, {stats['processed']} processed, {stats['failed']} failed")
+        return 0
+
+    inbox = WhatsAppInboxProcessor(db, config)
+
+    # Without an API token incoming webhooks are still saved, nothing is sent
+    outbox = None
+    if config['WHATSAPP_ENABLED']:
+        outbox = WhatsAppOutbox(db, config, rate_per_minute=config['WHATSAPP_RATE_PER_MINUTE'])
+        if config['WHATSAPP_OUTBOX_ENABLED']:
+            set_whatsapp_outbox(outbox)
+
+    if args.once:
+        processed = inbox.drain()
+        print(f"Processed {processed} webhook(s)")
+        if outbox is not None:
+            claimed = outbox.drain()
+            print(f"Processed {claimed} message(s)")
+        return 0
+
+    print("WhatsApp worker running (Ctrl+C to stop)")
+    try:
+        if outbox is None:
+            inbox.run_forever()
+        else:
+            # Webhooks on a thread of their own, so sending never holds them up
+            inbox.ensure_started()
+            outbox.run_forever()
+    except KeyboardInterrupt:
+        pass
+    inbox.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Helpers for work done outside the request: a base class for the background
+workers (email outbox, bulk email campaigns, WhatsApp outbox) and a simple
+rate limiter they share.
+
+Workers run as a daemon thread inside each app process. The thread is
+started lazily from a request (see app.py) rather than at import, because
+servers that load the app before forking workers would otherwise lose it,
+and each worker can also be driven from a script with run_forever().
+"""
+
+import os
+import threading
+import time
+
+
+class RateLimiter:
+    """Space out calls to at most `per_minute` per minute across threads"""
+
+    def __init__(self, per_minute):
+        self.interval = 60.0 / per_minute if per_minute else 0
+        self._next_slot = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block until the caller may proceed"""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds):
+        """Hold every caller back for `seconds` (e.g. after a rate limit response)"""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
+class BackgroundWorker:
+    """Polls for work with run_once() from a daemon thread
+
+    Subclasses implement run_once(), returning how much work was done;
+    the thread sleeps for `poll_interval` (or until wake()) once it returns 0.
+    Workers that set `db` get one database connection scope per round, like
+    a request, so a failed round never leaves its connection bound to the
+    thread with a transaction open.
+    """
+
+    thread_name = 'background-worker'
+    db = None
+
+    def __init__(self, poll_interval=10):
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def run_once(self):
+        raise NotImplementedError
+
+    def wake(self):
+        """Look for work now instead of at the next poll"""
+        self._wake.set()
+
+    def run_forever(self):
+        """Process work as it arrives until stop() is called"""
+        while not self._stopping.is_set():
+            if self.db is not None:
+                self.db.begin_request()
+            try:
+                done = self.run_once()
+            except Exception as e:
+                print(f"{self.thread_name} error: {str(e)}")
+                done = 0
+            finally:
+                if self.db is not None:
+                    self.db.end_request()
+
+            if not done:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def ensure_started(self):
+        """Start the worker thread in this process if it is not running"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self.run_forever, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """Stop the worker thread"""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
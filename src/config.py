@@ -17,6 +17,39 @@ class Config:
 
     # Database settings
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'database/signups.db')
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 5))  # Idle connections kept open per worker
+    # Apply pending schema migrations at startup if scripts/run_migrations.py wasn't run
+    DB_AUTO_MIGRATE = os.getenv('DB_AUTO_MIGRATE', 'True') == 'True'
+
+    # SQLite pragmas applied once to every new connection. WAL lets readers keep
+    # serving while a checkout commits; busy_timeout makes concurrent writers from
+    # other workers wait for the lock instead of failing with "database is locked"
+    DB_PRAGMAS = {
+        'journal_mode': os.getenv('DB_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.getenv('DB_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.getenv('DB_BUSY_TIMEOUT_MS', 5000)),
+        'cache_size': int(os.getenv('DB_CACHE_SIZE', -16000)),  # Negative = KiB, so 16 MB
+        'mmap_size': int(os.getenv('DB_MMAP_SIZE', 64 * 1024 * 1024)),
+        'temp_store': os.getenv('DB_TEMP_STORE', 'MEMORY'),
+    }
+
+    # In-process cache for public catalogue reads (products, categories, types).
+    # Admin edits clear it immediately in the worker that made them; other
+    # workers pick changes up once entries expire. Set the TTL to 0 to disable.
+    CATALOGUE_CACHE_TTL = int(os.getenv('CATALOGUE_CACHE_TTL', 60))  # Seconds
+    CATALOGUE_CACHE_SIZE = int(os.getenv('CATALOGUE_CACHE_SIZE', 256))  # Entries
+
+    # Admin badge counts (/admin/counts) are cached this long per worker.
+    # With ADMIN_COUNTS_LONG_POLL > 0 the badges hold a request open for up to
+    # that many seconds until a count changes, instead of polling every minute;
+    # leave it at 0 on hosts with only a few worker processes/threads.
+    ADMIN_COUNTS_CACHE_TTL = int(os.getenv('ADMIN_COUNTS_CACHE_TTL', 5))  # Seconds
+    ADMIN_COUNTS_LONG_POLL = int(os.getenv('ADMIN_COUNTS_LONG_POLL', 0))  # Seconds, 0 = off
+
+    # Guest carts with nothing added for this many days are removed by
+    # scripts/purge_guest_carts.py (run it daily from cron). Matches the
+    # session cookie lifetime, after which a guest can't reach the cart anyway.
+    GUEST_CART_RETENTION_DAYS = int(os.getenv('GUEST_CART_RETENTION_DAYS', 30))
 
     # Admin credentials
     ADMIN_USERNAME = os.getenv('ADMIN_USERNAME', 'admin')
@@ -50,6 +83,8 @@ class Config:
     MAIL_USERNAME = os.getenv('MAIL_USERNAME', 'mariuserasmus69@gmail.com')
     MAIL_PASSWORD = os.getenv('MAIL_PASSWORD', '')  # Set in .env file
     MAIL_DEFAULT_SENDER = os.getenv('MAIL_DEFAULT_SENDER', 'mariuserasmus69@gmail.com')
+    MAIL_POOL_SIZE = int(os.getenv('MAIL_POOL_SIZE', 2))  # Logged-in SMTP connections kept open
+    MAIL_TIMEOUT = int(os.getenv('MAIL_TIMEOUT', 30))  # Seconds before a stalled SMTP command fails
 
     # Notification recipients (comma-separated in .env, defaults to both emails)
     NOTIFICATION_RECIPIENTS = os.getenv(
@@ -57,6 +92,33 @@ class Config:
         'elmienerasmus@gmail.com,mariuserasmus69@gmail.com'
     ).split(',')
 
+    # Background workers (email/WhatsApp outboxes, bulk email) run as threads in
+    # each app process. Set BACKGROUND_WORKER_THREADS=False when running
+    # scripts/email_worker.py and scripts/whatsapp_worker.py separately instead.
+    BACKGROUND_WORKER_THREADS = os.getenv('BACKGROUND_WORKER_THREADS', 'True') == 'True'
+
+    # Outgoing email is queued in the database and sent by a background worker
+    # (see src/email_outbox.py)
+    EMAIL_OUTBOX_ENABLED = os.getenv('EMAIL_OUTBOX_ENABLED', 'True') == 'True'
+    EMAIL_MAX_ATTEMPTS = int(os.getenv('EMAIL_MAX_ATTEMPTS', 6))
+    EMAIL_RETRY_DELAY = int(os.getenv('EMAIL_RETRY_DELAY', 60))  # Seconds, doubles per attempt
+
+    # Bulk email campaigns are sent in the background by the same worker
+    # (see src/email_campaigns.py); keep the rate within your provider's limits
+    BULK_EMAIL_CONCURRENCY = int(os.getenv('BULK_EMAIL_CONCURRENCY', 2))  # Parallel SMTP connections
+    BULK_EMAIL_RATE_PER_MINUTE = int(os.getenv('BULK_EMAIL_RATE_PER_MINUTE', 60))  # 0 = no limit
+
+    # Uploaded photos get resized WebP/JPEG variants from a background worker
+    # (see src/image_variants.py; needs Pillow, otherwise originals are served)
+    IMAGE_VARIANTS_ENABLED = os.getenv('IMAGE_VARIANTS_ENABLED', 'True') == 'True'
+    IMAGE_VARIANT_WORKERS = int(os.getenv('IMAGE_VARIANT_WORKERS', 2))  # Photos resized in parallel
+    IMAGE_VARIANT_QUALITY = int(os.getenv('IMAGE_VARIANT_QUALITY', 80))
+
+    # /3d-printing carousels: seconds the shuffled order stays the same, and
+    # minimum seconds between checks of the gallery folders for new images
+    GALLERY_SHUFFLE_INTERVAL = int(os.getenv('GALLERY_SHUFFLE_INTERVAL', 3600))
+    GALLERY_CHECK_INTERVAL = int(os.getenv('GALLERY_CHECK_INTERVAL', 60))
+
     # Admin email for order notifications
     ADMIN_EMAIL = os.getenv('ADMIN_EMAIL', 'elmienerasmus@gmail.com')
 
@@ -68,6 +130,12 @@ class Config:
     WHATSAPP_ACCESS_TOKEN = os.getenv('WHATSAPP_ACCESS_TOKEN')
     WHATSAPP_BUSINESS_ACCOUNT_ID = os.getenv('WHATSAPP_BUSINESS_ACCOUNT_ID')
     WHATSAPP_ENABLED = bool(WHATSAPP_ACCESS_TOKEN)  # Enable if token exists
+    WHATSAPP_API_URL = os.getenv('WHATSAPP_API_URL', 'https://graph.facebook.com/v22.0')
+
+    # Outgoing WhatsApp messages are queued and posted by a background worker
+    # (see src/whatsapp_outbox.py), in the app's threads or scripts/whatsapp_worker.py
+    WHATSAPP_OUTBOX_ENABLED = os.getenv('WHATSAPP_OUTBOX_ENABLED', 'True') == 'True'
+    WHATSAPP_RATE_PER_MINUTE = int(os.getenv('WHATSAPP_RATE_PER_MINUTE', 600))  # 0 = no limit
 
     # Banking Details for EFT Payments
     BANK_NAME = os.getenv('BANK_NAME', 'FNB')
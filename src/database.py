@@ -3,536 +3,184 @@ import os
 from datetime import datetime
 import json
 import secrets
+import copy
+import functools
+import inspect
 import bcrypt
+import pytz
+from src.cache import TTLCache
+from src.db_pool import ConnectionPool
+from src.phone_utils import normalize_phone
+from src import migrations
+
+
+# Timezone of the shop; SQLite's CURRENT_TIMESTAMP is UTC
+SHOP_TIMEZONE = pytz.timezone('Africa/Johannesburg')
+
+
+def _utc_month_bounds(month):
+    """UTC timestamps (as SQLite stores them) of the start of a 'YYYY-MM' month
+    in the shop's time and of the start of the next month"""
+    start = datetime.strptime(month, '%Y-%m')
+    end = start.replace(year=start.year + start.month // 12, month=start.month % 12 + 1)
+    return tuple(SHOP_TIMEZONE.localize(value).astimezone(pytz.UTC).strftime('%Y-%m-%d %H:%M:%S')
+                 for value in (start, end))
+
+
+def _chunks(values, size=500):
+    """Split a list of query parameters into chunks below SQLite's variable limit"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+# Sort orders offered by the admin carts report
+CART_REPORT_SORTS = ('last_added', 'first_added', 'cart_total', 'item_count', 'total_quantity')
+
+# One row per cart: registered carts grouped by user, guest carts by session
+_CART_REPORT_QUERY = '''
+    SELECT
+        cart.user_id,
+        MAX(cart.session_id) as session_id,
+        COUNT(*) as item_count,
+        SUM(cart.quantity) as total_quantity,
+        COALESCE(SUM(CASE
+            WHEN cart.product_type = 'cutter_item' THEN cart.quantity * ci.price
+            WHEN cart.product_type = 'candles_soap' THEN cart.quantity * cs.price
+        END), 0) as cart_total,
+        MIN(cart.added_date) as first_added,
+        MAX(cart.added_date) as last_added
+    FROM cart_items cart
+    LEFT JOIN cutter_items ci ON cart.product_id = ci.id AND cart.product_type = 'cutter_item'
+    LEFT JOIN candles_soaps_products cs ON cart.product_id = cs.id AND cart.product_type = 'candles_soap'
+    WHERE cart.user_id IS NOT NULL OR cart.session_id IS NOT NULL
+    GROUP BY COALESCE(cart.user_id, cart.session_id)
+'''
+
+
+def _photo_variants(value):
+    """Decode a photo row's variants column (None until they have been generated)"""
+    return json.loads(value) if value else None
+
+
+def _catalogue_read(method=None, admin=None):
+    """Serve a public catalogue query from Database.catalogue_cache
+
+    Callers get their own copy of the cached rows, since routes add keys
+    (photo URLs, flags) to the dicts they receive.
+
+    Admin pages must read the database: _catalogue_write only clears the
+    cache of the process that made an edit, so with several app processes
+    the page after an edit could otherwise show old data until the TTL runs
+    out. Calls whose arguments match `admin` (e.g. {'active_only': False})
+    skip the cache, and so does any call made with cached=False.
+    """
+    if method is None:
+        return functools.partial(_catalogue_read, admin=admin)
+
+    signature = inspect.signature(method)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, cached=True, **kwargs):
+        if admin and cached:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            cached = not any(bound.arguments[name] == value for name, value in admin.items())
+        if not cached:
+            return method(self, *args, **kwargs)
+
+        cache = self.catalogue_cache
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        found, value = cache.get(key)
+        if not found:
+            generation = cache.generation
+            value = method(self, *args, **kwargs)
+            cache.set(key, value, generation)
+        return copy.deepcopy(value)
+    return wrapper
+
+
+def _catalogue_write(method):
+    """Clear Database.catalogue_cache after a method that changes the catalogue"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.catalogue_cache.clear()
+    return wrapper
+
 
 class Database:
     """Handle all database operations"""
 
-    def __init__(self, db_path):
+    def __init__(self, db_path, pool_size=5, pragmas=None, auto_migrate=True,
+                 cache_ttl=60, cache_size=256, admin_counts_ttl=5):
         self.db_path = db_path
-        self.init_db()
+        self.pool = ConnectionPool(db_path, pool_size=pool_size, pragmas=pragmas)
+        # Public catalogue reads (see _catalogue_read / _catalogue_write)
+        self.catalogue_cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        # Admin badge counts, shared by every open admin tab (see get_admin_counts)
+        self.admin_counts_cache = TTLCache(maxsize=1, ttl=admin_counts_ttl)
+        self.check_schema(auto_migrate)
 
     def get_connection(self):
-        """Create a database connection"""
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def init_db(self):
-        """Initialize the database with required tables"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-
-        # Create signups table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS signups (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT UNIQUE NOT NULL,
-                interests TEXT,
-                signup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address TEXT,
-                unsubscribe_token TEXT UNIQUE,
-                is_active INTEGER DEFAULT 1
-            )
-        ''')
-
-        # Create quote requests table for 3D printing services (Custom Design)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS quote_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                service_type TEXT NOT NULL,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                preferred_contact TEXT,
-                description TEXT NOT NULL,
-                intended_use TEXT,
-                size TEXT,
-                quantity INTEGER DEFAULT 1,
-                color TEXT,
-                material TEXT,
-                budget TEXT,
-                additional_notes TEXT,
-                reference_images TEXT,
-                request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-
-        # Create cake topper requests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cake_topper_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                event_date TEXT,
-                occasion TEXT NOT NULL,
-                size_preference TEXT,
-                text_to_include TEXT NOT NULL,
-                design_details TEXT NOT NULL,
-                color_preferences TEXT,
-                stand_type TEXT,
-                reference_images TEXT,
-                additional_notes TEXT,
-                request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-
-        # Create 3D print service requests table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS print_service_requests (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                email TEXT NOT NULL,
-                phone TEXT,
-                uploaded_files TEXT NOT NULL,
-                material TEXT NOT NULL,
-                color TEXT NOT NULL,
-                layer_height TEXT,
-                infill_density TEXT,
-                quantity INTEGER DEFAULT 1,
-                supports TEXT,
-                special_instructions TEXT,
-                request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ip_address TEXT,
-                status TEXT DEFAULT 'pending'
-            )
-        ''')
-
-        # Create cutter_categories table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cutter_categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                is_public INTEGER DEFAULT 1,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Migration: Add is_public column if it doesn't exist (for existing databases)
-        cursor.execute("PRAGMA table_info(cutter_categories)")
-        columns = [column[1] for column in cursor.fetchall()]
-        if 'is_public' not in columns:
-            cursor.execute('ALTER TABLE cutter_categories ADD COLUMN is_public INTEGER DEFAULT 1')
-
-        # Create cutter_types table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cutter_types (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Create cutter_items table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cutter_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_number TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                price REAL NOT NULL,
-                dimensions TEXT,
-                material TEXT,
-                stock_status TEXT DEFAULT 'in_stock',
-                category_id INTEGER,
-                type_id INTEGER,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active INTEGER DEFAULT 1,
-                FOREIGN KEY (category_id) REFERENCES cutter_categories(id),
-                FOREIGN KEY (type_id) REFERENCES cutter_types(id)
-            )
-        ''')
-
-        # Create cutter_item_photos table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cutter_item_photos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                item_id INTEGER NOT NULL,
-                photo_path TEXT NOT NULL,
-                is_main INTEGER DEFAULT 0,
-                display_order INTEGER DEFAULT 0,
-                uploaded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (item_id) REFERENCES cutter_items(id) ON DELETE CASCADE
-            )
-        ''')
-
-        # Create cart_items table (unified for cutter_items and candles_soaps)
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS cart_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_id TEXT,
-                user_id INTEGER,
-                product_type TEXT DEFAULT 'cutter_item',
-                product_id INTEGER NOT NULL,
-                quantity INTEGER DEFAULT 1,
-                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-
-        # Migration: Add product_type and product_id columns, rename item_id (for existing databases)
-        cursor.execute("PRAGMA table_info(cart_items)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        if 'product_type' not in columns:
-            # Old schema detected - migrate to new unified schema
-            cursor.execute('ALTER TABLE cart_items ADD COLUMN product_type TEXT DEFAULT "cutter_item"')
-
-        if 'product_id' not in columns and 'item_id' in columns:
-            # Rename item_id to product_id
-            cursor.execute('ALTER TABLE cart_items ADD COLUMN product_id INTEGER')
-            cursor.execute('UPDATE cart_items SET product_id = item_id WHERE product_id IS NULL')
-            # Note: SQLite doesn't support DROP COLUMN easily, so we keep item_id for backward compatibility
-
-        # Create index for faster queries
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cutter_items_category
-            ON cutter_items(category_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cutter_items_type
-            ON cutter_items(type_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cutter_item_photos_item
-            ON cutter_item_photos(item_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cart_items_session
-            ON cart_items(session_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_cart_items_user
-            ON cart_items(user_id)
-        ''')
-
-        # Create users table for authentication
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                email TEXT UNIQUE NOT NULL,
-                password_hash TEXT NOT NULL,
-                name TEXT NOT NULL,
-                phone TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                is_active INTEGER DEFAULT 1,
-                email_verified INTEGER DEFAULT 0,
-                shipping_address TEXT,
-                shipping_city TEXT,
-                shipping_state TEXT,
-                shipping_postal_code TEXT,
-                shipping_country TEXT DEFAULT 'South Africa'
-            )
-        ''')
-
-        # Create index for faster email lookups
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_users_email
-            ON users(email)
-        ''')
-
-        # Create orders table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS orders (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER NOT NULL,
-                order_number TEXT UNIQUE NOT NULL,
-                status TEXT DEFAULT 'pending',
-                subtotal REAL NOT NULL,
-                shipping_method TEXT DEFAULT 'pickup',
-                pudo_option TEXT,
-                locker_location TEXT,
-                shipping_cost REAL DEFAULT 0,
-                total_amount REAL NOT NULL,
-                shipping_address TEXT,
-                shipping_city TEXT,
-                shipping_state TEXT,
-                shipping_postal_code TEXT,
-                shipping_country TEXT,
-                payment_method TEXT,
-                payment_status TEXT DEFAULT 'pending',
-                payment_reference TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (user_id) REFERENCES users(id)
-            )
-        ''')
-
-        # Create order_items table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id INTEGER NOT NULL,
-                product_id INTEGER NOT NULL,
-                quantity INTEGER NOT NULL,
-                price REAL NOT NULL,
-                FOREIGN KEY (order_id) REFERENCES orders(id),
-                FOREIGN KEY (product_id) REFERENCES products(id)
-            )
-        ''')
-
-        # Create indexes for orders
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_orders_user
-            ON orders(user_id)
-        ''')
+        """Get a pooled database connection (conn.close() returns it to the pool)"""
+        return self.pool.connection()
 
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_orders_number
-            ON orders(order_number)
-        ''')
+    def begin_request(self):
+        """Reuse one connection for every call made while handling a request"""
+        self.pool.begin_scope()
 
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_order_items_order
-            ON order_items(order_id)
-        ''')
+    def end_request(self):
+        """Release the request's connection back to the pool"""
+        self.pool.end_scope()
 
-        # ===== CANDLES & SOAPS PRODUCT LINE =====
-        # Create candles_soaps_categories table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candles_soaps_categories (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                description TEXT,
-                display_order INTEGER DEFAULT 0,
-                is_active INTEGER DEFAULT 1,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
+    def get_cache_stats(self):
+        """Hit/miss counters for the catalogue cache"""
+        return self.catalogue_cache.stats()
 
-        # Create candles_soaps_products table with stock tracking
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candles_soaps_products (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_code TEXT UNIQUE NOT NULL,
-                name TEXT NOT NULL,
-                description TEXT,
-                category_id INTEGER NOT NULL,
-                price REAL NOT NULL,
-                stock_quantity INTEGER DEFAULT 0,
-                low_stock_threshold INTEGER DEFAULT 5,
-                weight_grams REAL,
-                dimensions TEXT,
-                scent TEXT,
-                color TEXT,
-                burn_time_hours INTEGER,
-                ingredients TEXT,
-                is_active INTEGER DEFAULT 1,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (category_id) REFERENCES candles_soaps_categories(id)
-            )
-        ''')
+    def check_pragmas(self):
+        """Report which configured SQLite pragmas took effect (for the startup log)"""
+        return self.pool.check_pragmas()
 
-        # Create candles_soaps_product_photos table
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candles_soaps_product_photos (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER NOT NULL,
-                photo_path TEXT NOT NULL,
-                is_main INTEGER DEFAULT 0,
-                display_order INTEGER DEFAULT 0,
-                uploaded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (product_id) REFERENCES candles_soaps_products(id) ON DELETE CASCADE
-            )
-        ''')
+    def init_db(self):
+        """Create or upgrade the schema by applying any pending migrations"""
+        conn = self.get_connection()
+        try:
+            return migrations.migrate(conn)
+        finally:
+            conn.close()
 
-        # NOTE: candles_soaps_cart_items table REMOVED - now using unified cart_items table
-        # The unified cart_items table handles both cutter items and candles/soaps via product_type field
+    def get_schema_version(self):
+        """Get the schema version recorded in the database"""
+        conn = self.get_connection()
+        try:
+            return migrations.get_schema_version(conn)
+        finally:
+            conn.close()
 
-        # Create candles_soaps_stock_history table for tracking stock changes
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS candles_soaps_stock_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                product_id INTEGER NOT NULL,
-                change_amount INTEGER NOT NULL,
-                reason TEXT,
-                previous_quantity INTEGER,
-                new_quantity INTEGER,
-                order_id INTEGER,
-                created_by TEXT,
-                created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (product_id) REFERENCES candles_soaps_products(id),
-                FOREIGN KEY (order_id) REFERENCES orders(id)
-            )
-        ''')
+    def check_schema(self, auto_migrate=True):
+        """Boot-time check that the schema is current (one query when it is)
 
-        # ===== WHATSAPP MESSAGING SYSTEM =====
-        # Create whatsapp_messages table for incoming/outgoing messages
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS whatsapp_messages (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                message_id TEXT UNIQUE,
-                direction TEXT NOT NULL,
-                from_phone TEXT NOT NULL,
-                to_phone TEXT NOT NULL,
-                message_text TEXT,
-                message_type TEXT DEFAULT 'text',
-                media_url TEXT,
-                timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                status TEXT DEFAULT 'received',
-                is_read INTEGER DEFAULT 0,
-                user_id INTEGER,
-                quote_id INTEGER,
-                quote_type TEXT,
-                conversation_id TEXT,
-                FOREIGN KEY (user_id) REFERENCES users(id)
+        Schema changes are meant to be applied during deployment with
+        scripts/run_migrations.py. If that was skipped, either apply them now
+        (auto_migrate) or refuse to start rather than serve on an old schema.
+        """
+        version = self.get_schema_version()
+        if version >= migrations.LATEST_VERSION:
+            return
+
+        if not auto_migrate:
+            raise RuntimeError(
+                f"Database schema is at version {version}, expected {migrations.LATEST_VERSION}. "
+                f"Run: python scripts/run_migrations.py"
             )
-        ''')
-
-        # Create indexes for candles & soaps
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_candles_soaps_products_category
-            ON candles_soaps_products(category_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_candles_soaps_products_active
-            ON candles_soaps_products(is_active)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_candles_soaps_product_photos_product
-            ON candles_soaps_product_photos(product_id)
-        ''')
-
-        # NOTE: candles_soaps_cart_items indexes removed - table no longer exists
-        # Cart indexes are now on unified cart_items table
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_candles_soaps_stock_history_product
-            ON candles_soaps_stock_history(product_id)
-        ''')
-
-        # Create indexes for WhatsApp messages
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_from_phone
-            ON whatsapp_messages(from_phone)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_conversation
-            ON whatsapp_messages(conversation_id)
-        ''')
-
-        cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_unread
-            ON whatsapp_messages(is_read)
-        ''')
-
-        # Run migrations for existing tables
-        self._run_migrations(conn)
-
-        conn.commit()
-        conn.close()
-
-    def _run_migrations(self, conn):
-        """Run database migrations for schema updates"""
-        cursor = conn.cursor()
-        try:
-            # Check if orders table exists and needs migration
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='orders'")
-            if cursor.fetchone():
-                # Check if new columns exist
-                cursor.execute("PRAGMA table_info(orders)")
-                columns = [col[1] for col in cursor.fetchall()]
-
-                # Add shipping_method column if missing
-                if 'shipping_method' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN shipping_method TEXT DEFAULT 'pickup'")
-
-                # Add pudo_option column if missing
-                if 'pudo_option' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN pudo_option TEXT")
-
-                # Add locker_location column if missing
-                if 'locker_location' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN locker_location TEXT")
-
-                # Add shipping_cost column if missing
-                if 'shipping_cost' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN shipping_cost REAL DEFAULT 0")
-
-                # Add subtotal column if missing
-                if 'subtotal' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN subtotal REAL DEFAULT 0")
-                    # Update existing orders to have subtotal = total_amount
-                    cursor.execute("UPDATE orders SET subtotal = total_amount WHERE subtotal = 0 OR subtotal IS NULL")
-
-            # Check if users table needs shipping fields
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='users'")
-            if cursor.fetchone():
-                cursor.execute("PRAGMA table_info(users)")
-                columns = [col[1] for col in cursor.fetchall()]
-
-                if 'shipping_address' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN shipping_address TEXT")
-                if 'shipping_city' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN shipping_city TEXT")
-                if 'shipping_state' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN shipping_state TEXT")
-                if 'shipping_postal_code' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN shipping_postal_code TEXT")
-                if 'shipping_country' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN shipping_country TEXT DEFAULT 'South Africa'")
-
-                # Add is_admin column if missing
-                if 'is_admin' not in columns:
-                    cursor.execute("ALTER TABLE users ADD COLUMN is_admin INTEGER DEFAULT 0")
-
-            # Add invoice and quote reference fields to orders table
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='orders'")
-            if cursor.fetchone():
-                cursor.execute("PRAGMA table_info(orders)")
-                columns = [col[1] for col in cursor.fetchall()]
-
-                # Add invoice fields
-                if 'invoice_number' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN invoice_number TEXT")
-                if 'invoice_generated_date' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN invoice_generated_date TIMESTAMP")
-                if 'invoice_sent_date' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN invoice_sent_date TIMESTAMP")
-
-                # Add quote reference fields
-                if 'quote_type' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN quote_type TEXT")
-                if 'quote_id' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN quote_id INTEGER")
-
-                # Add payment received date
-                if 'payment_received_date' not in columns:
-                    cursor.execute("ALTER TABLE orders ADD COLUMN payment_received_date TIMESTAMP")
-
-            # Add order_id reference to quote tables
-            for table in ['quote_requests', 'cake_topper_requests', 'print_service_requests']:
-                cursor.execute(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table}'")
-                if cursor.fetchone():
-                    cursor.execute(f"PRAGMA table_info({table})")
-                    columns = [col[1] for col in cursor.fetchall()]
-
-                    if 'order_number' not in columns:
-                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN order_number TEXT")
-                    if 'converted_to_order_date' not in columns:
-                        cursor.execute(f"ALTER TABLE {table} ADD COLUMN converted_to_order_date TIMESTAMP")
 
-        except Exception as e:
-            # Migrations are optional, don't fail if they error
-            print(f"Migration warning: {str(e)}")
+        if version > 0:
+            print(f"[WARNING] Database schema is at version {version}, applying migrations up to "
+                  f"{migrations.LATEST_VERSION}. Run scripts/run_migrations.py when deploying instead.")
+        for applied_version, description in self.init_db():
+            print(f"Applied migration {applied_version}: {description}")
 
     def add_signup(self, name, email, interests=None, ip_address=None):
         """Add a new email signup or update interests if changed"""
@@ -637,6 +285,38 @@ class Database:
         conn.close()
         return count
 
+    @_catalogue_read
+    def get_homepage_stats(self):
+        """Get the landing page counters in one query
+
+        Served from the catalogue cache, so signups show up once it expires.
+
+        Returns:
+            Dict with total_products and new_products (public, active cutter
+            items; new = created in the last 30 days) and total_customers
+            (email signups)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM cutter_items ci
+                 LEFT JOIN cutter_categories cc ON ci.category_id = cc.id
+                 WHERE ci.is_active = 1
+                   AND (cc.is_public = 1 OR cc.is_public IS NULL)) as total_products,
+                (SELECT COUNT(*) FROM cutter_items ci
+                 LEFT JOIN cutter_categories cc ON ci.category_id = cc.id
+                 WHERE ci.is_active = 1
+                   AND (cc.is_public = 1 OR cc.is_public IS NULL)
+                   AND ci.created_date >= date('now', 'localtime', '-30 days')) as new_products,
+                (SELECT COUNT(*) FROM signups) as total_customers
+        ''')
+        stats = dict(cursor.fetchone())
+
+        conn.close()
+        return stats
+
     def export_to_csv(self):
         """Export signups to CSV format"""
         signups = self.get_all_signups()
@@ -769,12 +449,14 @@ class Database:
                 INSERT INTO quote_requests (
                     service_type, name, email, phone, preferred_contact,
                     description, intended_use, size, quantity, color, material,
-                    budget, additional_notes, reference_images, ip_address, user_id
+                    budget, additional_notes, reference_images, ip_address, user_id,
+                    phone_e164
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (service_type, name, email, phone, preferred_contact,
                   description, intended_use, size, quantity, color, material,
-                  budget, additional_notes, reference_images, ip_address, user_id))
+                  budget, additional_notes, reference_images, ip_address, user_id,
+                  normalize_phone(phone)))
 
             conn.commit()
             conn.close()
@@ -1097,12 +779,13 @@ class Database:
                 INSERT INTO cake_topper_requests (
                     name, email, phone, event_date, occasion, size_preference,
                     text_to_include, design_details, color_preferences, stand_type,
-                    reference_images, additional_notes, ip_address, user_id
+                    reference_images, additional_notes, ip_address, user_id, phone_e164
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (name, email, phone, event_date, occasion, size_preference,
                   text_to_include, design_details, color_preferences, stand_type,
-                  reference_images, additional_notes, ip_address, user_id))
+                  reference_images, additional_notes, ip_address, user_id,
+                  normalize_phone(phone)))
 
             conn.commit()
             conn.close()
@@ -1196,11 +879,13 @@ class Database:
             cursor.execute('''
                 INSERT INTO print_service_requests (
                     name, email, phone, uploaded_files, material, color, layer_height,
-                    infill_density, quantity, supports, special_instructions, ip_address, user_id
+                    infill_density, quantity, supports, special_instructions, ip_address, user_id,
+                    phone_e164
                 )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (name, email, phone, uploaded_files, material, color, layer_height,
-                  infill_density, quantity, supports, special_instructions, ip_address, user_id))
+                  infill_density, quantity, supports, special_instructions, ip_address, user_id,
+                  normalize_phone(phone)))
 
             conn.commit()
             conn.close()
@@ -1285,6 +970,7 @@ class Database:
     # COOKIE & CLAY CUTTERS - CATEGORIES
     # ============================================================================
 
+    @_catalogue_write
     def add_cutter_category(self, name, description=None):
         """Add a new cutter category"""
         conn = self.get_connection()
@@ -1308,6 +994,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}", None
 
+    @_catalogue_read(admin={'public_only': False})
     def get_all_cutter_categories(self, public_only=False):
         """Get all cutter categories
 
@@ -1373,6 +1060,7 @@ class Database:
             }
         return None
 
+    @_catalogue_write
     def update_cutter_category(self, category_id, name, description=None):
         """Update a cutter category"""
         conn = self.get_connection()
@@ -1396,6 +1084,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def delete_cutter_category(self, category_id):
         """Delete a cutter category"""
         conn = self.get_connection()
@@ -1425,6 +1114,7 @@ class Database:
     # COOKIE & CLAY CUTTERS - TYPES
     # ============================================================================
 
+    @_catalogue_write
     def add_cutter_type(self, name, description=None):
         """Add a new cutter type"""
         conn = self.get_connection()
@@ -1448,6 +1138,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}", None
 
+    @_catalogue_read
     def get_all_cutter_types(self):
         """Get all cutter types"""
         conn = self.get_connection()
@@ -1496,6 +1187,7 @@ class Database:
             }
         return None
 
+    @_catalogue_write
     def update_cutter_type(self, type_id, name, description=None):
         """Update a cutter type"""
         conn = self.get_connection()
@@ -1519,6 +1211,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def delete_cutter_type(self, type_id):
         """Delete a cutter type"""
         conn = self.get_connection()
@@ -1582,6 +1275,7 @@ class Database:
 
         return f'CC_{category_prefix}_{new_number:04d}'
 
+    @_catalogue_write
     def add_cutter_item(self, name, description, price, dimensions, material,
                        stock_status, category_id, type_id):
         """Add a new cutter item"""
@@ -1617,6 +1311,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}", None, None
 
+    @_catalogue_read(admin={'public_categories_only': False})
     def get_all_cutter_items(self, category_id=None, type_id=None, search_term=None, active_only=True, public_categories_only=False):
         """Get all cutter items with optional filters
 
@@ -1636,9 +1331,11 @@ class Database:
                 ci.dimensions, ci.material, ci.stock_status, ci.created_date,
                 ci.updated_date, ci.is_active,
                 cc.name as category_name, cc.id as category_id,
+                cc.description as category_description,
                 ct.name as type_name, ct.id as type_id,
                 (SELECT photo_path FROM cutter_item_photos
-                 WHERE item_id = ci.id AND is_main = 1 LIMIT 1) as main_photo
+                 WHERE item_id = ci.id AND is_main = 1 LIMIT 1) as main_photo,
+                CAST(julianday('now') - julianday(ci.created_date) AS INTEGER) <= 30 as is_new
             FROM cutter_items ci
             LEFT JOIN cutter_categories cc ON ci.category_id = cc.id
             LEFT JOIN cutter_types ct ON ci.type_id = ct.id
@@ -1685,16 +1382,35 @@ class Database:
                 'stock_status': item['stock_status'],
                 'category_id': item['category_id'],
                 'category_name': item['category_name'],
+                'category_description': item['category_description'] or '',
                 'type_id': item['type_id'],
                 'type_name': item['type_name'],
                 'main_photo': item['main_photo'],
                 'created_date': item['created_date'],
                 'updated_date': item['updated_date'],
-                'is_active': bool(item['is_active'])
+                'is_active': bool(item['is_active']),
+                'is_new': bool(item['is_new'])
             })
 
         return result
 
+    @_catalogue_read(admin={'public_categories_only': False})
+    def get_cutter_catalogue(self, public_categories_only=True):
+        """Get active cutter items with all their photos for the shop page
+
+        Uses two queries (items, then photos for all of them) regardless of
+        how many items are listed. Each item gets a 'photos' list ordered main
+        photo first, plus 'category_description' and 'is_new' (created within
+        the last 30 days).
+        """
+        items = self.get_all_cutter_items(active_only=True, public_categories_only=public_categories_only)
+        photos_by_item = self.get_photos_for_items([item['id'] for item in items])
+
+        for item in items:
+            item['photos'] = photos_by_item.get(item['id'], [])
+
+        return items
+
     def get_cutter_item(self, item_id):
         """Get a single cutter item with all photos"""
         conn = self.get_connection()
@@ -1721,7 +1437,7 @@ class Database:
 
         # Get all photos for this item
         cursor.execute('''
-            SELECT id, photo_path, is_main, display_order, uploaded_date
+            SELECT id, photo_path, is_main, display_order, uploaded_date, variants
             FROM cutter_item_photos
             WHERE item_id = ?
             ORDER BY is_main DESC, display_order ASC
@@ -1737,7 +1453,8 @@ class Database:
                 'photo_path': photo['photo_path'],
                 'is_main': bool(photo['is_main']),
                 'display_order': photo['display_order'],
-                'uploaded_date': photo['uploaded_date']
+                'uploaded_date': photo['uploaded_date'],
+                'variants': _photo_variants(photo['variants'])
             })
 
         return {
@@ -1759,6 +1476,7 @@ class Database:
             'photos': photo_list
         }
 
+    @_catalogue_write
     def update_cutter_item(self, item_id, name, description, price, dimensions,
                           material, stock_status, category_id, type_id):
         """Update a cutter item"""
@@ -1783,6 +1501,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def delete_cutter_item(self, item_id):
         """Soft delete a cutter item (set is_active to 0)"""
         conn = self.get_connection()
@@ -1803,6 +1522,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def copy_cutter_item(self, item_id):
         """Create a copy of an existing item with a new item number"""
         conn = self.get_connection()
@@ -1842,18 +1562,19 @@ class Database:
 
             # Copy photos (Note: Photos will reference the same files initially - admin can update)
             cursor.execute('''
-                SELECT photo_path, is_main, display_order
+                INSERT INTO cutter_item_photos (item_id, photo_path, is_main, display_order, variants)
+                SELECT ?, photo_path, is_main, display_order, variants
                 FROM cutter_item_photos
                 WHERE item_id = ?
-            ''', (item_id,))
+                ORDER BY id
+            ''', (new_item_id, item_id))
 
-            photos = cursor.fetchall()
-
-            for photo in photos:
-                cursor.execute('''
-                    INSERT INTO cutter_item_photos (item_id, photo_path, is_main, display_order)
-                    VALUES (?, ?, ?, ?)
-                ''', (new_item_id, photo['photo_path'], photo['is_main'], photo['display_order']))
+            # Photos whose variants were still being generated get their own job
+            cursor.execute('''
+                INSERT INTO image_variant_jobs (source_path, photo_table, photo_id)
+                SELECT photo_path, 'cutter_item_photos', id FROM cutter_item_photos
+                WHERE item_id = ? AND variants IS NULL
+            ''', (new_item_id,))
 
             conn.commit()
             conn.close()
@@ -1904,6 +1625,7 @@ class Database:
 
         return folder_path, category, item_type, item_number
 
+    @_catalogue_write
     def add_item_photo(self, item_id, photo_path, is_main=False, display_order=0):
         """Add a photo to an item"""
         conn = self.get_connection()
@@ -1922,9 +1644,10 @@ class Database:
                 INSERT INTO cutter_item_photos (item_id, photo_path, is_main, display_order)
                 VALUES (?, ?, ?, ?)
             ''', (item_id, photo_path, is_main, display_order))
+            photo_id = cursor.lastrowid
+            self._queue_image_variants(cursor, photo_path, 'cutter_item_photos', photo_id)
 
             conn.commit()
-            photo_id = cursor.lastrowid
             conn.close()
             return True, "Photo added successfully!", photo_id
 
@@ -1932,6 +1655,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}", None
 
+    @_catalogue_write
     def set_main_photo(self, item_id, photo_id):
         """Set a photo as the main photo for an item"""
         conn = self.get_connection()
@@ -1960,6 +1684,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def delete_item_photo(self, photo_id):
         """Delete a photo"""
         conn = self.get_connection()
@@ -1981,7 +1706,7 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT id, photo_path, is_main, display_order, uploaded_date
+            SELECT id, photo_path, is_main, display_order, uploaded_date, variants
             FROM cutter_item_photos
             WHERE item_id = ?
             ORDER BY is_main DESC, display_order ASC
@@ -1997,11 +1722,47 @@ class Database:
                 'photo_path': photo['photo_path'],
                 'is_main': bool(photo['is_main']),
                 'display_order': photo['display_order'],
-                'uploaded_date': photo['uploaded_date']
+                'uploaded_date': photo['uploaded_date'],
+                'variants': _photo_variants(photo['variants'])
             })
 
         return result
 
+    def get_photos_for_items(self, item_ids):
+        """Get photos for many items at once
+
+        Returns:
+            Dict of item_id -> list of photos (same shape and order as get_item_photos)
+        """
+        result = {}
+        if not item_ids:
+            return result
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        for chunk in _chunks(list(item_ids)):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT id, item_id, photo_path, is_main, display_order, uploaded_date, variants
+                FROM cutter_item_photos
+                WHERE item_id IN ({placeholders})
+                ORDER BY item_id, is_main DESC, display_order ASC
+            ''', chunk)
+
+            for photo in cursor.fetchall():
+                result.setdefault(photo['item_id'], []).append({
+                    'id': photo['id'],
+                    'photo_path': photo['photo_path'],
+                    'is_main': bool(photo['is_main']),
+                    'display_order': photo['display_order'],
+                    'uploaded_date': photo['uploaded_date'],
+                    'variants': _photo_variants(photo['variants'])
+                })
+
+        conn.close()
+        return result
+
     def get_quote_request(self, quote_id):
         """Get a single quote request by ID"""
         conn = self.get_connection()
@@ -2119,10 +1880,13 @@ class Database:
                     item.price,
                     item.item_number as product_code,
                     item.stock_status,
-                    (SELECT photo_path FROM cutter_item_photos
-                     WHERE item_id = item.id AND is_main = 1 LIMIT 1) as main_photo
+                    photo.photo_path as main_photo,
+                    photo.variants as main_photo_variants
                 FROM cart_items cart
                 JOIN cutter_items item ON cart.product_id = item.id
+                LEFT JOIN cutter_item_photos photo ON photo.id = (
+                    SELECT id FROM cutter_item_photos
+                    WHERE item_id = item.id AND is_main = 1 LIMIT 1)
                 WHERE {where_clause} AND cart.product_type = 'cutter_item' AND item.is_active = 1
                 ORDER BY cart.added_date DESC
             ''', params)
@@ -2169,18 +1933,24 @@ class Database:
                     'item_number': item['product_code'],  # For backward compatibility
                     'stock_status': item['stock_status'],
                     'main_photo': item['main_photo'],
+                    'main_photo_variants': _photo_variants(item['main_photo_variants']),
                     'added_date': item['added_date'],
                     'subtotal': item['price'] * item['quantity']
                 })
 
-            # Add candles/soaps items
+            # Add candles/soaps items (photos for all of them in one query)
+            photos_by_product = self.get_candles_soaps_photos_for_products(
+                {item['product_id'] for item in candles_items})
+
             for item in candles_items:
-                # Get main photo for candles/soaps
-                photos = self.get_candles_soaps_product_photos(item['product_id'])
+                # Main photo, falling back to the first photo
+                photos = photos_by_product.get(item['product_id'], [])
                 main_photo = None
+                main_photo_variants = None
                 if photos:
-                    main_photo_obj = next((photo for photo in photos if photo['is_main']), photos[0] if photos else None)
-                    main_photo = main_photo_obj['photo_path'] if main_photo_obj else None
+                    main_photo_obj = next((photo for photo in photos if photo['is_main']), photos[0])
+                    main_photo = main_photo_obj['photo_path']
+                    main_photo_variants = main_photo_obj['variants']
 
                 result.append({
                     'cart_id': item['cart_id'],
@@ -2195,6 +1965,7 @@ class Database:
                     'color': item['color'],
                     'category_name': item['category_name'],
                     'main_photo': main_photo,
+                    'main_photo_variants': main_photo_variants,
                     'added_date': item['added_date'],
                     'subtotal': item['price'] * item['quantity']
                 })
@@ -2293,109 +2064,164 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
-    def get_all_active_carts(self):
-        """Get all active carts with user info and cart details - for admin view (unified)"""
+    def get_all_active_carts(self, limit=None, offset=0, sort='last_added', descending=True):
+        """Get active carts with user info and cart details - for admin view (unified)
+
+        Args:
+            limit: Maximum number of carts to return (None = all)
+            offset: Number of carts to skip (for pagination)
+            sort: One of CART_REPORT_SORTS (default: most recent activity)
+            descending: Sort direction
+        """
+        order_column = sort if sort in CART_REPORT_SORTS else 'last_added'
+        direction = 'DESC' if descending else 'ASC'
+
         conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
-            # Get all unique carts (user or session based) from unified cart_items
-            cursor.execute('''
-                SELECT
-                    cart.user_id,
-                    cart.session_id,
-                    u.name as user_name,
-                    u.email as user_email,
-                    'registered' as cart_type
-                FROM cart_items cart
-                LEFT JOIN users u ON cart.user_id = u.id
-                WHERE cart.user_id IS NOT NULL
-                GROUP BY cart.user_id
+            cursor.execute(f'''
+                SELECT carts.*, u.name as user_name, u.email as user_email
+                FROM ({_CART_REPORT_QUERY}) carts
+                LEFT JOIN users u ON carts.user_id = u.id
+                ORDER BY carts.{order_column} {direction}, carts.user_id, carts.session_id
+                LIMIT ? OFFSET ?
+            ''', (-1 if limit is None else limit, offset))
+
+            result = []
+            for row in cursor.fetchall():
+                cart = dict(row)
+                if cart['user_id']:
+                    cart['cart_type'] = 'registered'
+                    # Handle deleted users (user_name and user_email might be None)
+                    if not cart['user_name']:
+                        cart['user_name'] = f"[Deleted User #{cart['user_id']}]"
+                    if not cart['user_email']:
+                        cart['user_email'] = 'No email (user deleted)'
+                else:
+                    cart['cart_type'] = 'guest'
+                    cart['user_name'] = 'Guest User'
+                    cart['user_email'] = None
+                result.append(cart)
 
-                UNION
+            conn.close()
+            return result
 
-                SELECT
-                    NULL as user_id,
-                    cart.session_id,
-                    'Guest User' as user_name,
-                    NULL as user_email,
-                    'guest' as cart_type
-                FROM cart_items cart
-                WHERE cart.user_id IS NULL AND cart.session_id IS NOT NULL
-                GROUP BY cart.session_id
-            ''')
+        except Exception as e:
+            print(f"Error loading active carts: {str(e)}")
+            conn.close()
+            return []
 
-            cart_owners = cursor.fetchall()
-            result = []
+    def get_active_carts_summary(self):
+        """Totals for the admin carts report
 
-            # For each cart owner, calculate detailed stats
-            for owner in cart_owners:
-                user_id = owner['user_id']
-                session_id = owner['session_id']
+        Returns:
+            Dict with total_carts, registered_carts, guest_carts and total_value
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-                if user_id:
-                    # Get stats for registered user cart
-                    cursor.execute('''
-                        SELECT
-                            COUNT(DISTINCT cart.id) as item_count,
-                            SUM(cart.quantity) as total_quantity,
-                            SUM(CASE
-                                WHEN cart.product_type = 'cutter_item' THEN cart.quantity * ci.price
-                                WHEN cart.product_type = 'candles_soap' THEN cart.quantity * cs.price
-                            END) as cart_total,
-                            MIN(cart.added_date) as first_added,
-                            MAX(cart.added_date) as last_added
-                        FROM cart_items cart
-                        LEFT JOIN cutter_items ci ON cart.product_id = ci.id AND cart.product_type = 'cutter_item'
-                        LEFT JOIN candles_soaps_products cs ON cart.product_id = cs.id AND cart.product_type = 'candles_soap'
-                        WHERE cart.user_id = ?
-                    ''', (user_id,))
-                else:
-                    # Get stats for guest cart
-                    cursor.execute('''
-                        SELECT
-                            COUNT(DISTINCT cart.id) as item_count,
-                            SUM(cart.quantity) as total_quantity,
-                            SUM(CASE
-                                WHEN cart.product_type = 'cutter_item' THEN cart.quantity * ci.price
-                                WHEN cart.product_type = 'candles_soap' THEN cart.quantity * cs.price
-                            END) as cart_total,
-                            MIN(cart.added_date) as first_added,
-                            MAX(cart.added_date) as last_added
-                        FROM cart_items cart
-                        LEFT JOIN cutter_items ci ON cart.product_id = ci.id AND cart.product_type = 'cutter_item'
-                        LEFT JOIN candles_soaps_products cs ON cart.product_id = cs.id AND cart.product_type = 'candles_soap'
-                        WHERE cart.session_id = ? AND cart.user_id IS NULL
-                    ''', (session_id,))
-
-                stats = cursor.fetchone()
-
-                # Handle deleted users (user_name and user_email might be None)
-                user_name = owner['user_name'] if owner['user_name'] else f'[Deleted User #{user_id}]'
-                user_email = owner['user_email'] if owner['user_email'] else 'No email (user deleted)'
+        cursor.execute(f'''
+            SELECT
+                COUNT(*) as total_carts,
+                COALESCE(SUM(user_id IS NOT NULL), 0) as registered_carts,
+                COALESCE(SUM(user_id IS NULL), 0) as guest_carts,
+                COALESCE(SUM(cart_total), 0) as total_value
+            FROM ({_CART_REPORT_QUERY})
+        ''')
+        summary = dict(cursor.fetchone())
 
-                result.append({
-                    'user_id': user_id,
-                    'session_id': session_id,
-                    'user_name': user_name,
-                    'user_email': user_email,
-                    'item_count': stats['item_count'] or 0,
-                    'total_quantity': stats['total_quantity'] or 0,
-                    'cart_total': stats['cart_total'] or 0,
-                    'first_added': stats['first_added'],
-                    'last_added': stats['last_added'],
-                    'cart_type': owner['cart_type']
-                })
+        conn.close()
+        return summary
+
+    def purge_expired_guest_carts(self, retention_days, batch_size=200, dry_run=False):
+        """Delete guest carts with nothing added for `retention_days` days
+
+        Carts are removed in batches of `batch_size`, each in its own short
+        transaction, so checkout and cart writes are never locked out for
+        long. Registered users' carts are never touched.
+
+        Returns:
+            Dict with carts_deleted and rows_deleted (what would be deleted,
+            with dry_run) and duration_ms
+        """
+        started = datetime.now()
+        cutoff = f'-{int(retention_days)} days'
+        carts_deleted = 0
+        rows_deleted = 0
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if dry_run:
+                cursor.execute('''
+                    SELECT COUNT(*) as carts, COALESCE(SUM(item_rows), 0) as item_rows
+                    FROM (
+                        SELECT COUNT(*) as item_rows
+                        FROM cart_items
+                        WHERE user_id IS NULL AND session_id IS NOT NULL
+                        GROUP BY session_id
+                        HAVING MAX(added_date) < datetime('now', ?)
+                    )
+                ''', (cutoff,))
+                row = cursor.fetchone()
+                carts_deleted, rows_deleted = row['carts'], row['item_rows']
+
+            while not dry_run:
+                # Take the write lock before picking the carts, so an item a
+                # guest adds in between can't be deleted along with the old cart
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute('''
+                    SELECT session_id
+                    FROM cart_items
+                    WHERE user_id IS NULL AND session_id IS NOT NULL
+                    GROUP BY session_id
+                    HAVING MAX(added_date) < datetime('now', ?)
+                    LIMIT ?
+                ''', (cutoff, batch_size))
+                session_ids = [row['session_id'] for row in cursor.fetchall()]
+                if not session_ids:
+                    conn.commit()
+                    break
+
+                placeholders = ','.join('?' * len(session_ids))
+                cursor.execute(f'''
+                    DELETE FROM cart_items
+                    WHERE user_id IS NULL AND session_id IN ({placeholders})
+                ''', session_ids)
+                rows_deleted += cursor.rowcount
+                carts_deleted += len(session_ids)
+                conn.commit()
+
+            duration_ms = int((datetime.now() - started).total_seconds() * 1000)
 
-            # Sort by last_added descending
-            result.sort(key=lambda x: x['last_added'] if x['last_added'] else '', reverse=True)
+            if not dry_run:
+                cursor.execute('''
+                    INSERT INTO cart_purge_runs (retention_days, carts_deleted, rows_deleted, duration_ms)
+                    VALUES (?, ?, ?, ?)
+                ''', (retention_days, carts_deleted, rows_deleted, duration_ms))
+                conn.commit()
 
             conn.close()
-            return result
+            return {'carts_deleted': carts_deleted, 'rows_deleted': rows_deleted,
+                    'duration_ms': duration_ms}
 
-        except Exception as e:
+        except Exception:
+            conn.rollback()
             conn.close()
-            return []
+            raise
+
+    def get_cart_purge_runs(self, limit=10):
+        """Most recent guest cart purges, newest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT * FROM cart_purge_runs ORDER BY id DESC LIMIT ?', (limit,))
+        runs = [dict(row) for row in cursor.fetchall()]
+
+        conn.close()
+        return runs
 
     def get_cart_details_for_admin(self, user_id=None, session_id=None):
         """Get detailed cart items for a specific user or session - for admin view (unified)"""
@@ -2468,9 +2294,9 @@ class Database:
             password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
 
             cursor.execute('''
-                INSERT INTO users (email, password_hash, name, phone)
-                VALUES (?, ?, ?, ?)
-            ''', (email.lower(), password_hash, name, phone))
+                INSERT INTO users (email, password_hash, name, phone, phone_e164)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (email.lower(), password_hash, name, phone, normalize_phone(phone)))
 
             conn.commit()
             user_id = cursor.lastrowid
@@ -2718,6 +2544,8 @@ class Database:
             if 'phone' in data:
                 update_fields.append('phone = ?')
                 values.append(data['phone'])
+                update_fields.append('phone_e164 = ?')
+                values.append(normalize_phone(data['phone']))
 
             if 'email' in data:
                 update_fields.append('email = ?')
@@ -2999,15 +2827,39 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    def _next_order_number(self, cursor):
+        """Take the next SSG-YYYYMM-NNN order number
+
+        Must run inside the checkout transaction (after BEGIN IMMEDIATE), so
+        the counter increment and the order insert commit or roll back together.
+        """
+        year_month = datetime.now().strftime('%Y%m')
+        cursor.execute('''
+            INSERT INTO order_sequences (period, last_value) VALUES (?, 1)
+            ON CONFLICT(period) DO UPDATE SET last_value = last_value + 1
+        ''', (year_month,))
+        cursor.execute('SELECT last_value FROM order_sequences WHERE period = ?', (year_month,))
+        return f"SSG-{year_month}-{cursor.fetchone()['last_value']:03d}"
+
+    @_catalogue_write
     def create_order(self, user_id, shipping_info, payment_method='Cash on Delivery'):
-        """Create a new order from user's cart (both cutters and candles/soaps)"""
+        """Create a new order from user's cart (both cutters and candles/soaps)
+
+        Runs as one immediate transaction: the cart, the order number, the
+        stock decrements and the order lines are all read and written under
+        the database write lock, so concurrent checkouts can't share an order
+        number or sell the same stock twice.
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
+            cursor.execute('BEGIN IMMEDIATE')
+
             # Get cutter cart items (from unified cart)
             cursor.execute('''
-                SELECT ci.product_id as item_id, ci.quantity, item.price, item.name, 'cutter' as product_type
+                SELECT ci.product_id as item_id, ci.quantity, item.price, item.name,
+                       item.item_number, 'cutter' as product_type
                 FROM cart_items ci
                 JOIN cutter_items item ON ci.product_id = item.id
                 WHERE ci.user_id = ? AND ci.product_type = 'cutter_item'
@@ -3028,15 +2880,10 @@ class Database:
             cart_items = list(cutter_items) + list(candle_soap_items)
 
             if not cart_items:
+                conn.rollback()
                 conn.close()
                 return False, "Cart is empty!", None
 
-            # Validate stock for candles/soaps products
-            for item in candle_soap_items:
-                if item['stock_quantity'] < item['quantity']:
-                    conn.close()
-                    return False, f"Insufficient stock for {item['name']}. Available: {item['stock_quantity']}", None
-
             # Calculate subtotal
             subtotal = sum(item['price'] * item['quantity'] for item in cart_items)
 
@@ -3058,26 +2905,20 @@ class Database:
             # Calculate total
             total_amount = subtotal + shipping_cost
 
-            # Generate sequential order number: SSG-YYYYMM-001
-            year_month = datetime.now().strftime('%Y%m')
-
-            # Get the highest order number for this month to avoid duplicates
-            cursor.execute('''
-                SELECT order_number FROM orders
-                WHERE order_number LIKE ?
-                ORDER BY order_number DESC
-                LIMIT 1
-            ''', (f'SSG-{year_month}-%',))
-
-            last_order = cursor.fetchone()
-            if last_order:
-                # Extract the sequence number from last order
-                last_sequence = int(last_order['order_number'].split('-')[-1])
-                order_sequence = last_sequence + 1
-            else:
-                order_sequence = 1
+            # Deduct stock for candles/soaps products, only if enough is left
+            for item in candle_soap_items:
+                cursor.execute('''
+                    UPDATE candles_soaps_products
+                    SET stock_quantity = stock_quantity - ?, updated_date = CURRENT_TIMESTAMP
+                    WHERE id = ? AND stock_quantity >= ?
+                ''', (item['quantity'], item['item_id'], item['quantity']))
+                if cursor.rowcount == 0:
+                    conn.rollback()
+                    conn.close()
+                    return False, f"Insufficient stock for {item['name']}. Available: {item['stock_quantity']}", None
 
-            order_number = f"SSG-{year_month}-{order_sequence:03d}"
+            # Generate sequential order number: SSG-YYYYMM-001
+            order_number = self._next_order_number(cursor)
 
             # Create order (use empty string for NULL values to handle old NOT NULL constraints)
             cursor.execute('''
@@ -3102,47 +2943,34 @@ class Database:
 
             order_id = cursor.lastrowid
 
-            # Create order items and check for quote references
-            quote_reference = None
-            for item in cart_items:
-                cursor.execute('''
-                    INSERT INTO order_items (order_id, product_id, quantity, price)
-                    VALUES (?, ?, ?, ?)
-                ''', (order_id, item['item_id'], item['quantity'], item['price']))
-
-                # Deduct stock for candles/soaps products
-                if item['product_type'] == 'candle_soap':
-                    # Get current stock
-                    current_stock = item['stock_quantity']
-                    new_stock = current_stock - item['quantity']
+            # Create order items
+            cursor.executemany('''
+                INSERT INTO order_items (order_id, product_id, product_type, product_name, quantity, price)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(order_id, item['item_id'],
+                   'candles_soap' if item['product_type'] == 'candle_soap' else 'cutter_item',
+                   item['name'], item['quantity'], item['price']) for item in cart_items])
 
-                    # Update stock
-                    cursor.execute('''
-                        UPDATE candles_soaps_products
-                        SET stock_quantity = ?, updated_date = CURRENT_TIMESTAMP
-                        WHERE id = ?
-                    ''', (new_stock, item['item_id']))
+            # Log stock changes (stock_quantity was read under the same lock)
+            cursor.executemany('''
+                INSERT INTO candles_soaps_stock_history (
+                    product_id, change_amount, reason, previous_quantity,
+                    new_quantity, order_id, created_by
+                ) VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(item['item_id'], -item['quantity'], 'Order placed', item['stock_quantity'],
+                   item['stock_quantity'] - item['quantity'], order_id, f'Order: {order_number}')
+                  for item in candle_soap_items])
 
-                    # Log stock change
-                    cursor.execute('''
-                        INSERT INTO candles_soaps_stock_history (
-                            product_id, change_amount, reason, previous_quantity,
-                            new_quantity, order_id, created_by
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?)
-                    ''', (item['item_id'], -item['quantity'], 'Order placed',
-                          current_stock, new_stock, order_id, f'Order: {order_number}'))
-
-                # Check if this item is from a quote (item_number starts with "QUOTE-")
-                if item['product_type'] == 'cutter':
-                    cursor.execute('SELECT item_number FROM cutter_items WHERE id = ?', (item['item_id'],))
-                    item_data = cursor.fetchone()
-                    if item_data and item_data['item_number'].startswith('QUOTE-'):
-                        # Parse quote reference: QUOTE-CUSTOM_DESIGN-123 or QUOTE-CAKE_TOPPER-456
-                        parts = item_data['item_number'].split('-')
-                        if len(parts) >= 3:
-                            quote_type = parts[1].lower()
-                            quote_id = int(parts[2])
-                            quote_reference = {'type': quote_type, 'id': quote_id}
+            # Check if an item is from a quote (item_number starts with "QUOTE-")
+            quote_reference = None
+            for item in cutter_items:
+                if item['item_number'] and item['item_number'].startswith('QUOTE-'):
+                    # Parse quote reference: QUOTE-CUSTOM_DESIGN-123 or QUOTE-CAKE_TOPPER-456
+                    parts = item['item_number'].split('-')
+                    if len(parts) >= 3:
+                        quote_type = parts[1].lower()
+                        quote_id = int(parts[2])
+                        quote_reference = {'type': quote_type, 'id': quote_id}
 
             # If order contains quote items, link them
             if quote_reference:
@@ -3174,6 +3002,7 @@ class Database:
             return True, "Order created successfully!", order_number
 
         except Exception as e:
+            conn.rollback()
             conn.close()
             return False, f"An error occurred: {str(e)}", None
 
@@ -3248,6 +3077,43 @@ class Database:
         conn.close()
         return count
 
+    def get_admin_counts(self):
+        """Get every admin notification badge count in one query
+
+        Cached for a few seconds, since each open admin tab polls for them.
+
+        Returns:
+            Dict with orders (active orders), quotes (pending or quoted
+            requests of any kind), carts (distinct carts), whatsapp
+            (unread messages) and outbox (emails and WhatsApp messages that
+            could not be delivered)
+        """
+        found, counts = self.admin_counts_cache.get('counts')
+        if found:
+            return dict(counts)
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT
+                (SELECT COUNT(*) FROM orders
+                 WHERE status NOT IN ('delivered', 'cancelled')) as orders,
+                (SELECT COUNT(*) FROM quote_requests WHERE status IN ('pending', 'quoted'))
+                + (SELECT COUNT(*) FROM cake_topper_requests WHERE status IN ('pending', 'quoted'))
+                + (SELECT COUNT(*) FROM print_service_requests WHERE status IN ('pending', 'quoted')) as quotes,
+                (SELECT COUNT(DISTINCT COALESCE(user_id, session_id)) FROM cart_items) as carts,
+                (SELECT COALESCE(SUM(unread_count), 0) FROM whatsapp_conversations
+                 WHERE unread_count > 0) as whatsapp,
+                (SELECT COUNT(*) FROM email_outbox WHERE status = 'failed')
+                + (SELECT COUNT(*) FROM whatsapp_outbox WHERE status = 'failed') as outbox
+        ''')
+        counts = dict(cursor.fetchone())
+
+        conn.close()
+        self.admin_counts_cache.set('counts', counts)
+        return dict(counts)
+
     def get_total_carts_count(self):
         """Get total number of active carts for admin notification badges"""
         conn = self.get_connection()
@@ -3265,22 +3131,53 @@ class Database:
 
     def get_order_items(self, order_id):
         """Get all items in an order"""
+        return self.get_order_items_for_orders([order_id]).get(order_id, [])
+
+    def get_order_items_for_orders(self, order_ids):
+        """Get the items of many orders at once (cutters and candles/soaps)
+
+        Names and prices are as they were when the order was placed, so lines
+        still show if the product was renamed, repriced or deleted since.
+
+        Returns:
+            Dict of order_id -> list of item dicts (name, price, quantity,
+            product_type, image_url, ...)
+        """
+        items_by_order = {}
+        if not order_ids:
+            return items_by_order
+
         conn = self.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('''
-            SELECT oi.*, item.name,
-                   (SELECT photo_path FROM cutter_item_photos
-                    WHERE item_id = item.id AND is_main = 1 LIMIT 1) as image_url
-            FROM order_items oi
-            JOIN cutter_items item ON oi.product_id = item.id
-            WHERE oi.order_id = ?
-        ''', (order_id,))
+        for chunk in _chunks(list(order_ids)):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT oi.*,
+                       COALESCE(oi.product_name, ci.name, cs.name) as name,
+                       CASE oi.product_type
+                           WHEN 'candles_soap' THEN (
+                               SELECT photo_path FROM candles_soaps_product_photos
+                               WHERE product_id = oi.product_id
+                               ORDER BY is_main DESC, display_order LIMIT 1)
+                           ELSE (
+                               SELECT photo_path FROM cutter_item_photos
+                               WHERE item_id = oi.product_id AND is_main = 1 LIMIT 1)
+                       END as image_url
+                FROM order_items oi
+                LEFT JOIN cutter_items ci
+                    ON oi.product_id = ci.id AND oi.product_type != 'candles_soap'
+                LEFT JOIN candles_soaps_products cs
+                    ON oi.product_id = cs.id AND oi.product_type = 'candles_soap'
+                WHERE oi.order_id IN ({placeholders})
+                ORDER BY oi.order_id, oi.id
+            ''', chunk)
 
-        items = cursor.fetchall()
-        conn.close()
+            for row in cursor.fetchall():
+                items_by_order.setdefault(row['order_id'], []).append(dict(row))
 
-        return [dict(item) for item in items]
+        conn.close()
+        return items_by_order
 
     def update_order_status(self, order_id, status):
         """Update order status and track payment dates"""
@@ -3379,6 +3276,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}"
 
+    @_catalogue_write
     def convert_quote_to_sale(self, quote_type, quote_id, item_name, item_price, item_description="Custom quote item", quantity=1):
         """
         Convert a quote to a sale by creating a temporary custom item and adding to customer's cart.
@@ -3437,9 +3335,10 @@ class Database:
                 password_hash = bcrypt.hashpw(temp_password.encode('utf-8'), bcrypt.gensalt())
 
                 cursor.execute('''
-                    INSERT INTO users (email, password_hash, name, phone, is_active, email_verified)
-                    VALUES (?, ?, ?, ?, 1, 0)
-                ''', (customer_email.lower(), password_hash, customer_name, customer_phone))
+                    INSERT INTO users (email, password_hash, name, phone, phone_e164, is_active, email_verified)
+                    VALUES (?, ?, ?, ?, ?, 1, 0)
+                ''', (customer_email.lower(), password_hash, customer_name, customer_phone,
+                      normalize_phone(customer_phone)))
 
                 user_id = cursor.lastrowid
                 user_created = True
@@ -3663,6 +3562,7 @@ class Database:
     # ===== CANDLES & SOAPS PRODUCT LINE METHODS =====
 
     # ----- Category Management -----
+    @_catalogue_write
     def add_candles_soaps_category(self, name, description=None, display_order=0):
         """Add a new candles & soaps category"""
         conn = self.get_connection()
@@ -3686,6 +3586,7 @@ class Database:
             conn.close()
             return False, f"An error occurred: {str(e)}", None
 
+    @_catalogue_read(admin={'active_only': False})
     def get_all_candles_soaps_categories(self, active_only=False):
         """Get all candles & soaps categories"""
         conn = self.get_connection()
@@ -3711,6 +3612,7 @@ class Database:
         conn.close()
         return dict(category) if category else None
 
+    @_catalogue_write
     def update_candles_soaps_category(self, category_id, name, description=None, display_order=0, is_active=1):
         """Update a candles & soaps category"""
         conn = self.get_connection()
@@ -3734,6 +3636,7 @@ class Database:
             conn.close()
             return False, f"An error occurred while updating category: {str(e)}"
 
+    @_catalogue_write
     def delete_candles_soaps_category(self, category_id):
         """Delete a candles & soaps category (only if no products use it)"""
         conn = self.get_connection()
@@ -3796,6 +3699,7 @@ class Database:
         conn.close()
         return product_code
 
+    @_catalogue_write
     def add_candles_soaps_product(self, product_data):
         """Add a new candles & soaps product"""
         conn = self.get_connection()
@@ -3841,6 +3745,7 @@ class Database:
             conn.close()
             return False, f"An error occurred while adding product: {str(e)}", None
 
+    @_catalogue_read(admin={'active_only': False})
     def get_all_candles_soaps_products(self, category_id=None, in_stock_only=False, active_only=True):
         """Get all candles & soaps products with optional filtering"""
         conn = self.get_connection()
@@ -3889,6 +3794,7 @@ class Database:
         conn.close()
         return dict(product) if product else None
 
+    @_catalogue_write
     def update_candles_soaps_product(self, product_id, product_data):
         """Update a candles & soaps product"""
         conn = self.get_connection()
@@ -3927,6 +3833,7 @@ class Database:
             conn.close()
             return False, f"An error occurred while updating product: {str(e)}"
 
+    @_catalogue_write
     def delete_candles_soaps_product(self, product_id):
         """Soft delete a candles & soaps product"""
         conn = self.get_connection()
@@ -3948,6 +3855,7 @@ class Database:
             return False, f"An error occurred while deleting product: {str(e)}"
 
     # ----- Stock Management -----
+    @_catalogue_write
     def update_candles_soaps_stock(self, product_id, change_amount, reason, order_id=None, created_by=None):
         """Update stock quantity and log the change"""
         conn = self.get_connection()
@@ -4035,6 +3943,7 @@ class Database:
         return products
 
     # ----- Product Photos -----
+    @_catalogue_write
     def add_candles_soaps_product_photo(self, product_id, photo_path, is_main=False, display_order=0):
         """Add a photo to a candles & soaps product"""
         conn = self.get_connection()
@@ -4053,9 +3962,10 @@ class Database:
                 INSERT INTO candles_soaps_product_photos (product_id, photo_path, is_main, display_order)
                 VALUES (?, ?, ?, ?)
             ''', (product_id, photo_path, 1 if is_main else 0, display_order))
+            photo_id = cursor.lastrowid
+            self._queue_image_variants(cursor, photo_path, 'candles_soaps_product_photos', photo_id)
 
             conn.commit()
-            photo_id = cursor.lastrowid
             return True, "Photo added successfully!", photo_id
 
         except Exception as e:
@@ -4077,8 +3987,42 @@ class Database:
 
         photos = [dict(row) for row in cursor.fetchall()]
         conn.close()
+
+        for photo in photos:
+            photo['variants'] = _photo_variants(photo['variants'])
         return photos
 
+    def get_candles_soaps_photos_for_products(self, product_ids):
+        """Get photos for many candles & soaps products at once
+
+        Returns:
+            Dict of product_id -> list of photos (same shape and order as
+            get_candles_soaps_product_photos)
+        """
+        result = {}
+        if not product_ids:
+            return result
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        for chunk in _chunks(list(product_ids)):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT * FROM candles_soaps_product_photos
+                WHERE product_id IN ({placeholders})
+                ORDER BY product_id, is_main DESC, display_order, uploaded_date
+            ''', chunk)
+
+            for row in cursor.fetchall():
+                photo = dict(row)
+                photo['variants'] = _photo_variants(photo['variants'])
+                result.setdefault(row['product_id'], []).append(photo)
+
+        conn.close()
+        return result
+
+    @_catalogue_write
     def set_candles_soaps_main_photo(self, product_id, photo_id):
         """Set a photo as the main photo for a product"""
         conn = self.get_connection()
@@ -4107,6 +4051,7 @@ class Database:
             conn.close()
             return False, f"An error occurred while updating main photo: {str(e)}"
 
+    @_catalogue_write
     def delete_candles_soaps_product_photo(self, photo_id):
         """Delete a candles & soaps product photo"""
         conn = self.get_connection()
@@ -4353,8 +4298,13 @@ class Database:
 
     def save_whatsapp_message(self, message_id, direction, from_phone, to_phone,
                               message_text, message_type='text', media_url=None,
-                              user_id=None, quote_id=None, quote_type=None):
-        """Save incoming or outgoing WhatsApp message"""
+                              user_id=None, quote_id=None, quote_type=None,
+                              status='received', outbox_id=None):
+        """Save incoming or outgoing WhatsApp message
+
+        Outgoing messages are saved as 'sent', or as 'queued' with the
+        whatsapp_outbox row they wait in (see update_outbound_whatsapp_message).
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
 
@@ -4365,10 +4315,32 @@ class Database:
             cursor.execute('''
                 INSERT INTO whatsapp_messages (
                     message_id, direction, from_phone, to_phone, message_text,
-                    message_type, media_url, user_id, quote_id, quote_type, conversation_id
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    message_type, media_url, user_id, quote_id, quote_type, conversation_id,
+                    status, outbox_id
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (message_id, direction, from_phone, to_phone, message_text,
-                  message_type, media_url, user_id, quote_id, quote_type, conversation_id))
+                  message_type, media_url, user_id, quote_id, quote_type, conversation_id,
+                  status, outbox_id))
+
+            # Keep the inbox summary in step, in the same transaction
+            cursor.execute('''
+                INSERT INTO whatsapp_conversations (
+                    conversation_id, last_message_time, message_count, unread_count,
+                    last_message_preview, last_direction
+                )
+                SELECT conversation_id, timestamp, 1,
+                       CASE WHEN direction = 'inbound' AND is_read = 0 THEN 1 ELSE 0 END,
+                       SUBSTR(message_text, 1, 100), direction
+                FROM whatsapp_messages WHERE id = ?
+                ON CONFLICT(conversation_id) DO UPDATE SET
+                    message_count = message_count + 1,
+                    unread_count = unread_count + excluded.unread_count,
+                    last_message_preview = CASE WHEN excluded.last_message_time >= last_message_time
+                        THEN excluded.last_message_preview ELSE last_message_preview END,
+                    last_direction = CASE WHEN excluded.last_message_time >= last_message_time
+                        THEN excluded.last_direction ELSE last_direction END,
+                    last_message_time = MAX(last_message_time, excluded.last_message_time)
+            ''', (cursor.lastrowid,))
 
             conn.commit()
             conn.close()
@@ -4386,13 +4358,9 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT
-                conversation_id,
-                MAX(timestamp) as last_message_time,
-                COUNT(*) as message_count,
-                SUM(CASE WHEN is_read = 0 AND direction = 'inbound' THEN 1 ELSE 0 END) as unread_count
-            FROM whatsapp_messages
-            GROUP BY conversation_id
+            SELECT conversation_id, last_message_time, message_count, unread_count,
+                   last_message_preview, last_direction
+            FROM whatsapp_conversations
             ORDER BY last_message_time DESC
             LIMIT ?
         ''', (limit,))
@@ -4427,7 +4395,10 @@ class Database:
         cursor.execute('''
             UPDATE whatsapp_messages
             SET is_read = 1
-            WHERE conversation_id = ? AND direction = 'inbound'
+            WHERE conversation_id = ? AND direction = 'inbound' AND is_read = 0
+        ''', (conversation_id,))
+        cursor.execute('''
+            UPDATE whatsapp_conversations SET unread_count = 0 WHERE conversation_id = ?
         ''', (conversation_id,))
 
         conn.commit()
@@ -4439,9 +4410,9 @@ class Database:
         cursor = conn.cursor()
 
         cursor.execute('''
-            SELECT COUNT(*) as count
-            FROM whatsapp_messages
-            WHERE is_read = 0 AND direction = 'inbound'
+            SELECT COALESCE(SUM(unread_count), 0) as count
+            FROM whatsapp_conversations
+            WHERE unread_count > 0
         ''')
 
         result = cursor.fetchone()
@@ -4449,13 +4420,51 @@ class Database:
 
         return result['count'] if result else 0
 
+    def _refresh_whatsapp_conversation(self, cursor, conversation_id):
+        """Recompute one conversation's inbox summary from its messages
+        (after deletes, where the summary can't be adjusted incrementally)"""
+        cursor.execute('''
+            SELECT
+                COUNT(*) as message_count,
+                SUM(CASE WHEN is_read = 0 AND direction = 'inbound' THEN 1 ELSE 0 END) as unread_count
+            FROM whatsapp_messages
+            WHERE conversation_id = ?
+        ''', (conversation_id,))
+        totals = cursor.fetchone()
+
+        if not totals['message_count']:
+            cursor.execute('DELETE FROM whatsapp_conversations WHERE conversation_id = ?',
+                           (conversation_id,))
+            return
+
+        cursor.execute('''
+            SELECT timestamp, SUBSTR(message_text, 1, 100) as preview, direction
+            FROM whatsapp_messages
+            WHERE conversation_id = ?
+            ORDER BY timestamp DESC, id DESC
+            LIMIT 1
+        ''', (conversation_id,))
+        latest = cursor.fetchone()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO whatsapp_conversations (
+                conversation_id, last_message_time, message_count, unread_count,
+                last_message_preview, last_direction
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        ''', (conversation_id, latest['timestamp'], totals['message_count'],
+              totals['unread_count'], latest['preview'], latest['direction']))
+
     def delete_whatsapp_message(self, message_id):
         """Delete a single WhatsApp message"""
         conn = self.get_connection()
         cursor = conn.cursor()
 
         try:
+            cursor.execute('SELECT conversation_id FROM whatsapp_messages WHERE id = ?', (message_id,))
+            message = cursor.fetchone()
             cursor.execute('DELETE FROM whatsapp_messages WHERE id = ?', (message_id,))
+            if message:
+                self._refresh_whatsapp_conversation(cursor, message['conversation_id'])
             conn.commit()
             conn.close()
             return True
@@ -4473,6 +4482,7 @@ class Database:
         try:
             cursor.execute('DELETE FROM whatsapp_messages WHERE conversation_id = ?', (conversation_id,))
             deleted_count = cursor.rowcount
+            cursor.execute('DELETE FROM whatsapp_conversations WHERE conversation_id = ?', (conversation_id,))
             conn.commit()
             conn.close()
             return True, deleted_count
@@ -4484,59 +4494,907 @@ class Database:
 
     def find_customer_by_phone(self, phone_number):
         """Try to find a customer by phone number in users or quote tables"""
+        return self.find_customers_by_phones([phone_number]).get(phone_number)
+
+    def find_customers_by_phones(self, phone_numbers):
+        """Match phone numbers (any format) to customers in one query
+
+        Registered users win over quote requests; among quote requests of one
+        kind the most recent is used.
+
+        Returns:
+            Dict of phone number -> {'type': 'user' | 'quote' | 'cake_topper' |
+            'print_service', 'data': {id, name, email, phone}} for the numbers
+            that matched
+        """
+        by_e164 = {}
+        for phone_number in phone_numbers:
+            e164 = normalize_phone(phone_number)
+            if e164:
+                by_e164.setdefault(e164, []).append(phone_number)
+
+        if not by_e164:
+            return {}
+
         conn = self.get_connection()
         cursor = conn.cursor()
 
-        # Generate alternative phone formats to try
-        # Input might be: "27825522848", "0825522848", "+27825522848", etc.
-        phone_variants = [phone_number]
+        # Best match per number: lowest priority, then the newest row
+        matches = {}
+        # Each number is bound four times, once per table
+        for chunk in _chunks(list(by_e164), size=200):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                SELECT 'user' as type, 0 as priority, id, name, email, phone, phone_e164,
+                       created_date as sort_date
+                FROM users WHERE phone_e164 IN ({placeholders})
+                UNION ALL
+                SELECT 'quote', 1, id, name, email, phone, phone_e164, request_date
+                FROM quote_requests WHERE phone_e164 IN ({placeholders})
+                UNION ALL
+                SELECT 'cake_topper', 2, id, name, email, phone, phone_e164, request_date
+                FROM cake_topper_requests WHERE phone_e164 IN ({placeholders})
+                UNION ALL
+                SELECT 'print_service', 3, id, name, email, phone, phone_e164, request_date
+                FROM print_service_requests WHERE phone_e164 IN ({placeholders})
+                ORDER BY priority, sort_date DESC, id DESC
+            ''', chunk * 4)
 
-        # Clean the number (remove +, spaces, dashes)
-        cleaned = phone_number.replace('+', '').replace(' ', '').replace('-', '').replace('(', '').replace(')', '')
+            for row in cursor.fetchall():
+                if row['phone_e164'] not in matches:
+                    matches[row['phone_e164']] = {
+                        'type': row['type'],
+                        'data': {'id': row['id'], 'name': row['name'],
+                                 'email': row['email'], 'phone': row['phone']}
+                    }
 
-        # If it starts with 27 (South Africa), also try with leading 0
-        if cleaned.startswith('27') and len(cleaned) == 11:
-            phone_variants.append('0' + cleaned[2:])  # 27825522848 -> 0825522848
-            phone_variants.append('+' + cleaned)       # 27825522848 -> +27825522848
+        conn.close()
 
-        # If it starts with 0, also try with country code
-        if cleaned.startswith('0') and len(cleaned) == 10:
-            phone_variants.append('27' + cleaned[1:])  # 0825522848 -> 27825522848
-            phone_variants.append('+27' + cleaned[1:]) # 0825522848 -> +27825522848
+        customers = {}
+        for e164, customer in matches.items():
+            for phone_number in by_e164[e164]:
+                customers[phone_number] = copy.deepcopy(customer)
+        return customers
 
-        # Try users table first with all variants
-        for variant in phone_variants:
-            cursor.execute('SELECT id, name, email, phone FROM users WHERE phone = ?', (variant,))
-            user = cursor.fetchone()
-            if user:
-                conn.close()
-                return {'type': 'user', 'data': dict(user)}
+    # ============================================================================
+    # EMAIL OUTBOX
+    # ============================================================================
+
+    def enqueue_email(self, subject, recipients, message, to_addrs=None):
+        """Add a rendered email to the outbox
+
+        Args:
+            subject: Subject line (for the admin/log views)
+            recipients: Display string of who it is for
+            message: Complete message as bytes (email.message.Message.as_bytes())
+            to_addrs: Optional list of envelope recipients overriding the headers
+
+        Returns:
+            Tuple (success, message, outbox_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-        # Try quote_requests with all variants
-        for variant in phone_variants:
+        try:
             cursor.execute('''
-                SELECT id, name, email, phone FROM quote_requests
-                WHERE phone = ?
-                ORDER BY request_date DESC
-                LIMIT 1
-            ''', (variant,))
-            quote = cursor.fetchone()
-            if quote:
-                conn.close()
-                return {'type': 'quote', 'data': dict(quote)}
+                INSERT INTO email_outbox (subject, recipients, to_addrs, message)
+                VALUES (?, ?, ?, ?)
+            ''', (subject, recipients, json.dumps(to_addrs) if to_addrs else None,
+                  sqlite3.Binary(message)))
+            outbox_id = cursor.lastrowid
+            conn.commit()
+            conn.close()
+            return True, "Email queued", outbox_id
+
+        except Exception as e:
+            conn.close()
+            return False, f"An error occurred: {str(e)}", None
+
+    def _claim_outbox_rows(self, table, limit, lease_seconds):
+        """Claim rows of an outbox table that are due for a delivery attempt
+
+        Claimed rows get their next attempt pushed back by `lease_seconds`, so
+        other workers skip them, and a worker that dies mid-send only delays
+        them until the lease runs out.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            # Take the write lock first so two workers never claim the same rows
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute(f'''
+                SELECT * FROM {table}
+                WHERE status = 'pending' AND next_attempt_at <= CURRENT_TIMESTAMP
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            ''', (limit,))
+            rows = [dict(row) for row in cursor.fetchall()]
+
+            for chunk in _chunks([row['id'] for row in rows]):
+                placeholders = ','.join('?' * len(chunk))
+                cursor.execute(f'''
+                    UPDATE {table}
+                    SET attempts = attempts + 1,
+                        next_attempt_at = datetime('now', ?)
+                    WHERE id IN ({placeholders})
+                ''', [f'+{int(lease_seconds)} seconds'] + chunk)
+
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            conn.rollback()
+            conn.close()
+            print(f"Error claiming {table} rows: {str(e)}")
+            return []
+
+        for row in rows:
+            row['attempts'] += 1
+        return rows
+
+    def _mark_outbox_row_failed(self, table, row_id, error, retry_in=None):
+        """Record a failed delivery attempt (retry_in=None gives up on the row)"""
+        conn = self.get_connection()
+        if retry_in is None:
+            conn.execute(f'''
+                UPDATE {table} SET status = 'failed', last_error = ? WHERE id = ?
+            ''', (error, row_id))
+        else:
+            conn.execute(f'''
+                UPDATE {table}
+                SET last_error = ?, next_attempt_at = datetime('now', ?)
+                WHERE id = ?
+            ''', (error, f'+{int(retry_in)} seconds', row_id))
+        conn.commit()
+        conn.close()
+
+    def _get_failed_outbox_rows(self, table, columns, limit):
+        """Rows of an outbox table the worker gave up on, newest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f'''
+            SELECT {columns} FROM {table}
+            WHERE status = 'failed'
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (limit,))
+        rows = [dict(row) for row in cursor.fetchall()]
+
+        conn.close()
+        return rows
+
+    def _set_failed_outbox_row(self, table, row_id, retry):
+        """Queue a failed outbox row again (retry=True) or dismiss it
+
+        Returns:
+            Tuple (success, message)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            if retry:
+                cursor.execute(f'''
+                    UPDATE {table}
+                    SET status = 'pending', attempts = 0,
+                        next_attempt_at = CURRENT_TIMESTAMP, last_error = NULL
+                    WHERE id = ? AND status = 'failed'
+                ''', (row_id,))
+            else:
+                cursor.execute(f'''
+                    UPDATE {table} SET status = 'dismissed' WHERE id = ? AND status = 'failed'
+                ''', (row_id,))
+            updated = cursor.rowcount
+            conn.commit()
+            conn.close()
+
+        except Exception as e:
+            conn.close()
+            return False, f"An error occurred: {str(e)}"
+
+        if not updated:
+            return False, "Message not found or not failed"
+        self.admin_counts_cache.clear()
+        return True, "Message queued again" if retry else "Message dismissed"
+
+    def claim_outbox_emails(self, limit=20, lease_seconds=300):
+        """Claim emails that are due for a delivery attempt
+
+        Returns:
+            List of outbox rows as dicts (to_addrs decoded to a list or None)
+        """
+        rows = self._claim_outbox_rows('email_outbox', limit, lease_seconds)
+        for row in rows:
+            row['to_addrs'] = json.loads(row['to_addrs']) if row['to_addrs'] else None
+        return rows
+
+    def mark_outbox_email_sent(self, outbox_id):
+        """Record a successful delivery"""
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE email_outbox
+            SET status = 'sent', sent_date = CURRENT_TIMESTAMP, last_error = NULL
+            WHERE id = ?
+        ''', (outbox_id,))
+        conn.commit()
+        conn.close()
+
+    def mark_outbox_email_failed(self, outbox_id, error, retry_in=None):
+        """Record a failed delivery attempt
+
+        Args:
+            retry_in: Seconds until the next attempt, or None to give up
+        """
+        self._mark_outbox_row_failed('email_outbox', outbox_id, error, retry_in)
+
+    def get_outbox_stats(self):
+        """Count outbox emails by status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT status, COUNT(*) as count FROM email_outbox GROUP BY status')
+        stats = {'pending': 0, 'sent': 0, 'failed': 0}
+        for row in cursor.fetchall():
+            stats[row['status']] = row['count']
+
+        conn.close()
+        return stats
+
+    def get_failed_outbox_emails(self, limit=100):
+        """Emails the outbox worker gave up on (for the admin Outbox page)"""
+        return self._get_failed_outbox_rows(
+            'email_outbox', 'id, subject, recipients, attempts, last_error, created_date', limit)
+
+    def retry_outbox_email(self, outbox_id):
+        """Queue a failed email for another round of delivery attempts"""
+        return self._set_failed_outbox_row('email_outbox', outbox_id, retry=True)
+
+    def dismiss_outbox_email(self, outbox_id):
+        """Stop showing a failed email on the admin Outbox page"""
+        return self._set_failed_outbox_row('email_outbox', outbox_id, retry=False)
+
+    # ============================================================================
+    # BULK EMAIL CAMPAIGNS
+    # ============================================================================
+
+    def create_email_campaign(self, subject, message, interest_filter, recipients):
+        """Create a bulk email campaign and its recipient list
+
+        Args:
+            recipients: List of tuples [(email, name, unsubscribe_token), ...]
+                        (duplicate addresses are only emailed once)
+
+        Returns:
+            Tuple (success, message, campaign_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                INSERT INTO email_campaigns (subject, message, interest_filter)
+                VALUES (?, ?, ?)
+            ''', (subject, message, interest_filter))
+            campaign_id = cursor.lastrowid
+
+            cursor.executemany('''
+                INSERT OR IGNORE INTO email_campaign_recipients
+                    (campaign_id, email, name, unsubscribe_token)
+                VALUES (?, ?, ?, ?)
+            ''', [(campaign_id, email.lower(), name, token) for email, name, token in recipients])
+
+            conn.commit()
+            conn.close()
+            return True, "Campaign created", campaign_id
+
+        except Exception as e:
+            conn.rollback()
+            conn.close()
+            return False, f"An error occurred: {str(e)}", None
+
+    def _campaign_progress_query(self, where=''):
+        return f'''
+            SELECT c.*,
+                COUNT(r.id) as total,
+                COALESCE(SUM(r.status = 'sent'), 0) as sent,
+                COALESCE(SUM(r.status = 'failed'), 0) as failed,
+                COALESCE(SUM(r.status IN ('pending', 'sending')), 0) as remaining
+            FROM email_campaigns c
+            LEFT JOIN email_campaign_recipients r ON r.campaign_id = c.id
+            {where}
+            GROUP BY c.id
+        '''
+
+    def get_email_campaign(self, campaign_id):
+        """Get a campaign with its delivery counts (total/sent/failed/remaining)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(self._campaign_progress_query('WHERE c.id = ?'), (campaign_id,))
+        campaign = cursor.fetchone()
+
+        conn.close()
+        return dict(campaign) if campaign else None
+
+    def get_email_campaigns(self, limit=10):
+        """Get the most recent campaigns with their delivery counts"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(self._campaign_progress_query() + ' ORDER BY c.id DESC LIMIT ?', (limit,))
+        campaigns = [dict(row) for row in cursor.fetchall()]
+
+        conn.close()
+        return campaigns
+
+    def claim_email_campaign(self, lease_seconds=120):
+        """Claim the next campaign to send
+
+        Picks a queued campaign, or a running one whose sender stopped renewing
+        its lease (the process died). Recipients that were mid-send when that
+        happened are marked failed rather than sent again, since the server
+        may already have accepted them.
+
+        Returns:
+            Campaign dict, or None when there is nothing to send
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
-        # Try cake_topper_requests with all variants
-        for variant in phone_variants:
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
             cursor.execute('''
-                SELECT id, name, email, phone FROM cake_topper_requests
-                WHERE phone = ?
-                ORDER BY request_date DESC
+                SELECT * FROM email_campaigns
+                WHERE status = 'queued'
+                   OR (status = 'running' AND lease_until < CURRENT_TIMESTAMP)
+                ORDER BY id
                 LIMIT 1
-            ''', (variant,))
-            cake_quote = cursor.fetchone()
-            if cake_quote:
+            ''')
+            campaign = cursor.fetchone()
+
+            if campaign is None:
+                conn.rollback()
                 conn.close()
-                return {'type': 'cake_topper', 'data': dict(cake_quote)}
+                return None
 
-        conn.close()
-        return None
+            cursor.execute('''
+                UPDATE email_campaign_recipients
+                SET status = 'failed', error = 'Interrupted while sending (not retried to avoid a duplicate)'
+                WHERE campaign_id = ? AND status = 'sending'
+            ''', (campaign['id'],))
+            cursor.execute('''
+                UPDATE email_campaigns
+                SET status = 'running',
+                    lease_until = datetime('now', ?),
+                    started_date = COALESCE(started_date, CURRENT_TIMESTAMP)
+                WHERE id = ?
+            ''', (f'+{int(lease_seconds)} seconds', campaign['id']))
+
+            conn.commit()
+            conn.close()
+            return dict(campaign)
+
+        except Exception as e:
+            conn.rollback()
+            conn.close()
+            print(f"Error claiming email campaign: {str(e)}")
+            return None
+
+    def claim_campaign_recipients(self, campaign_id, limit=20, lease_seconds=120):
+        """Mark the next batch of pending recipients as sending and renew the campaign lease
+
+        Returns:
+            List of recipient dicts
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT * FROM email_campaign_recipients
+            WHERE campaign_id = ? AND status = 'pending'
+            ORDER BY id
+            LIMIT ?
+        ''', (campaign_id, limit))
+        recipients = [dict(row) for row in cursor.fetchall()]
+
+        for chunk in _chunks([r['id'] for r in recipients]):
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f'''
+                UPDATE email_campaign_recipients SET status = 'sending'
+                WHERE id IN ({placeholders})
+            ''', chunk)
+
+        cursor.execute('''
+            UPDATE email_campaigns SET lease_until = datetime('now', ?) WHERE id = ?
+        ''', (f'+{int(lease_seconds)} seconds', campaign_id))
+
+        conn.commit()
+        conn.close()
+        return recipients
+
+    def mark_campaign_recipient(self, recipient_id, status, error=None):
+        """Record the delivery result for one campaign recipient
+
+        Args:
+            status: 'sent', 'failed', or 'pending' to try them again later
+        """
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE email_campaign_recipients
+            SET status = ?, error = ?,
+                sent_date = CASE WHEN ? = 'sent' THEN CURRENT_TIMESTAMP END
+            WHERE id = ?
+        ''', (status, error, status, recipient_id))
+        conn.commit()
+        conn.close()
+
+    def finish_email_campaign(self, campaign_id, status='completed'):
+        """Mark a campaign as finished"""
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE email_campaigns
+            SET status = ?, lease_until = NULL, completed_date = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (status, campaign_id))
+        conn.commit()
+        conn.close()
+
+    # ============================================================================
+    # WHATSAPP OUTBOX
+    # ============================================================================
+
+    def enqueue_whatsapp_message(self, payload, label=None):
+        """Add a WhatsApp Cloud API message payload to the outbox
+
+        Returns:
+            Tuple (success, message, outbox_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                INSERT INTO whatsapp_outbox (to_phone, label, payload)
+                VALUES (?, ?, ?)
+            ''', (payload.get('to'), label, json.dumps(payload)))
+            outbox_id = cursor.lastrowid
+            conn.commit()
+            conn.close()
+            return True, "Message queued", outbox_id
+
+        except Exception as e:
+            conn.close()
+            return False, f"An error occurred: {str(e)}", None
+
+    def claim_whatsapp_outbox(self, limit=20, lease_seconds=120):
+        """Claim WhatsApp messages that are due for a delivery attempt
+
+        Returns:
+            List of outbox rows as dicts (payload decoded)
+        """
+        rows = self._claim_outbox_rows('whatsapp_outbox', limit, lease_seconds)
+        for row in rows:
+            row['payload'] = json.loads(row['payload'])
+        return rows
+
+    def mark_whatsapp_outbox_sent(self, outbox_id, wa_message_id):
+        """Record a successful delivery and the API's message id"""
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE whatsapp_outbox
+            SET status = 'sent', wa_message_id = ?, sent_date = CURRENT_TIMESTAMP, last_error = NULL
+            WHERE id = ?
+        ''', (wa_message_id, outbox_id))
+        conn.commit()
+        conn.close()
+
+    def mark_whatsapp_outbox_failed(self, outbox_id, error, retry_in=None):
+        """Record a failed delivery attempt
+
+        Args:
+            retry_in: Seconds until the next attempt, or None to give up
+        """
+        self._mark_outbox_row_failed('whatsapp_outbox', outbox_id, error, retry_in)
+
+    def get_whatsapp_outbox_stats(self):
+        """Count outbox WhatsApp messages by status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT status, COUNT(*) as count FROM whatsapp_outbox GROUP BY status')
+        stats = {'pending': 0, 'sent': 0, 'failed': 0}
+        for row in cursor.fetchall():
+            stats[row['status']] = row['count']
+
+        conn.close()
+        return stats
+
+    def update_outbound_whatsapp_message(self, outbox_id, status, message_id=None):
+        """Record on the conversation message how its outbox row went
+
+        Args:
+            status: 'sent' (with the Cloud API message id), 'failed' or 'queued'
+        """
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE whatsapp_messages
+            SET status = ?, message_id = COALESCE(?, message_id)
+            WHERE outbox_id = ?
+        ''', (status, message_id, outbox_id))
+        conn.commit()
+        conn.close()
+
+    def get_failed_whatsapp_outbox(self, limit=100):
+        """WhatsApp messages the outbox worker gave up on (for the admin Outbox page)
+
+        Returns:
+            List of outbox rows as dicts, with a preview of the text (or the
+            template name) instead of the payload
+        """
+        rows = self._get_failed_outbox_rows(
+            'whatsapp_outbox', 'id, to_phone, label, payload, attempts, last_error, created_date', limit)
+        for row in rows:
+            payload = json.loads(row.pop('payload'))
+            if payload.get('type') == 'template':
+                row['preview'] = f"Template: {payload['template']['name']}"
+            else:
+                row['preview'] = payload.get('text', {}).get('body', '')
+        return rows
+
+    def retry_whatsapp_outbox(self, outbox_id):
+        """Queue a failed WhatsApp message for another round of delivery attempts"""
+        success, message = self._set_failed_outbox_row('whatsapp_outbox', outbox_id, retry=True)
+        if success:
+            self.update_outbound_whatsapp_message(outbox_id, 'queued')
+        return success, message
+
+    def dismiss_whatsapp_outbox(self, outbox_id):
+        """Stop showing a failed WhatsApp message on the admin Outbox page"""
+        return self._set_failed_outbox_row('whatsapp_outbox', outbox_id, retry=False)
+
+    # ============================================================================
+    # WHATSAPP WEBHOOK INBOX
+    # ============================================================================
+
+    def store_whatsapp_webhook(self, payload):
+        """Store a raw webhook delivery for the inbox processor
+
+        Args:
+            payload: Request body as received from Meta
+
+        Returns:
+            Tuple (success, message, inbox_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('INSERT INTO whatsapp_webhook_inbox (payload) VALUES (?)', (payload,))
+            inbox_id = cursor.lastrowid
+            conn.commit()
+            conn.close()
+            return True, "Webhook stored", inbox_id
+
+        except Exception as e:
+            conn.close()
+            return False, f"An error occurred: {str(e)}", None
+
+    def claim_whatsapp_webhooks(self, limit=20, lease_seconds=120):
+        """Claim stored webhook deliveries that are due for processing
+
+        Returns:
+            List of inbox rows as dicts (payload still the raw body)
+        """
+        return self._claim_outbox_rows('whatsapp_webhook_inbox', limit, lease_seconds)
+
+    def mark_whatsapp_webhook_processed(self, inbox_id):
+        """Record that every message in a webhook delivery was handled"""
+        conn = self.get_connection()
+        conn.execute('''
+            UPDATE whatsapp_webhook_inbox
+            SET status = 'processed', processed_date = CURRENT_TIMESTAMP, last_error = NULL
+            WHERE id = ?
+        ''', (inbox_id,))
+        conn.commit()
+        conn.close()
+
+    def mark_whatsapp_webhook_failed(self, inbox_id, error, retry_in=None):
+        """Record a failed processing attempt
+
+        Args:
+            retry_in: Seconds until the next attempt, or None to give up
+        """
+        self._mark_outbox_row_failed('whatsapp_webhook_inbox', inbox_id, error, retry_in)
+
+    def whatsapp_message_exists(self, message_id):
+        """Whether a WhatsApp message id has already been saved (webhook redeliveries)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT 1 FROM whatsapp_messages WHERE message_id = ?', (message_id,))
+        exists = cursor.fetchone() is not None
+
+        conn.close()
+        return exists
+
+    def get_whatsapp_webhook_stats(self):
+        """Count stored webhook deliveries by status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT status, COUNT(*) as count FROM whatsapp_webhook_inbox GROUP BY status')
+        stats = {'pending': 0, 'processed': 0, 'failed': 0}
+        for row in cursor.fetchall():
+            stats[row['status']] = row['count']
+
+        conn.close()
+        return stats
+
+    # ============================================================================
+    # IMAGE VARIANT JOBS
+    # ============================================================================
+
+    def _queue_image_variants(self, cursor, source_path, photo_table=None, photo_id=None):
+        """Queue a variants job inside the caller's transaction"""
+        cursor.execute('''
+            INSERT INTO image_variant_jobs (source_path, photo_table, photo_id)
+            VALUES (?, ?, ?)
+        ''', (source_path, photo_table, photo_id))
+        return cursor.lastrowid
+
+    def queue_image_variants(self, source_path, photo_table=None, photo_id=None):
+        """Queue resized variants for an uploaded photo (see src/image_variants.py)
+
+        Without a photo_table the upload is a customer quote photo, which is
+        rewritten in place instead.
+
+        Returns:
+            Tuple of (success, message, job_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            job_id = self._queue_image_variants(cursor, source_path, photo_table, photo_id)
+            conn.commit()
+            conn.close()
+            return True, "Photo queued for processing", job_id
+
+        except Exception as e:
+            conn.close()
+            return False, f"Error queueing photo: {str(e)}", None
+
+    def queue_gallery_variants(self, source_paths):
+        """Queue variants for gallery images (see src/gallery.py)
+
+        Images that already have a job waiting are skipped, so every app
+        process can report the same missing variants.
+
+        Returns:
+            Number of jobs queued
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            queued = 0
+            for source_path in source_paths:
+                cursor.execute('''
+                    INSERT INTO image_variant_jobs (source_path, photo_table)
+                    SELECT ?, 'gallery'
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM image_variant_jobs
+                        WHERE source_path = ? AND status = 'pending'
+                    )
+                ''', (source_path, source_path))
+                queued += cursor.rowcount
+            conn.commit()
+            conn.close()
+            return queued
+
+        except Exception as e:
+            conn.close()
+            print(f"Error queueing gallery variants: {str(e)}")
+            return 0
+
+    def claim_image_variant_jobs(self, limit=10, lease_seconds=600):
+        """Claim queued image jobs that are due for processing"""
+        return self._claim_outbox_rows('image_variant_jobs', limit, lease_seconds)
+
+    @_catalogue_write
+    def complete_image_variant_job(self, job_id, variants=None):
+        """Record a finished job and store the variants on its photo row"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT photo_table, photo_id FROM image_variant_jobs WHERE id = ?', (job_id,))
+        job = cursor.fetchone()
+
+        if job and job['photo_table'] in migrations.PRODUCT_PHOTO_TABLES and variants is not None:
+            cursor.execute(f'UPDATE {job["photo_table"]} SET variants = ? WHERE id = ?',
+                           (json.dumps(variants), job['photo_id']))
+
+        cursor.execute('''
+            UPDATE image_variant_jobs
+            SET status = 'processed', processed_date = CURRENT_TIMESTAMP, last_error = NULL
+            WHERE id = ?
+        ''', (job_id,))
+
+        conn.commit()
+        conn.close()
+
+    def mark_image_variant_job_failed(self, job_id, error, retry_in=None):
+        """Record a failed job (retry_in=None gives up on it)"""
+        self._mark_outbox_row_failed('image_variant_jobs', job_id, error, retry_in)
+
+    def get_image_variant_job_stats(self):
+        """Count image variant jobs by status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT status, COUNT(*) as count FROM image_variant_jobs GROUP BY status')
+        stats = {'pending': 0, 'processed': 0, 'failed': 0}
+        for row in cursor.fetchall():
+            stats[row['status']] = row['count']
+
+        conn.close()
+        return stats
+
+    # ============================================================================
+    # INVOICE JOBS
+    # ============================================================================
+
+    def queue_invoice(self, order_id):
+        """Queue (re)rendering an order's invoice PDF (see src/invoice_utils.py)
+
+        An order that already has a job waiting is not queued twice. A job
+        that a worker has claimed (it may be rendering the old details right
+        now) doesn't count, so a change made meanwhile gets its own job.
+
+        Returns:
+            Tuple of (success, message, job_id)
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('''
+                SELECT id FROM invoice_jobs
+                WHERE order_id = ? AND status = 'pending' AND attempts = 0
+            ''', (order_id,))
+            existing = cursor.fetchone()
+            if existing:
+                conn.close()
+                return True, "Invoice already queued", existing['id']
+
+            cursor.execute('INSERT INTO invoice_jobs (order_id) VALUES (?)', (order_id,))
+            job_id = cursor.lastrowid
+            conn.commit()
+            conn.close()
+            return True, "Invoice queued", job_id
+
+        except Exception as e:
+            conn.close()
+            return False, f"Error queueing invoice: {str(e)}", None
+
+    def has_pending_invoice_job(self, order_id):
+        """Whether an order's invoice is waiting to be rendered"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT 1 FROM invoice_jobs WHERE order_id = ? AND status = 'pending' LIMIT 1
+        ''', (order_id,))
+        pending = cursor.fetchone() is not None
+
+        conn.close()
+        return pending
+
+    def claim_invoice_jobs(self, limit=10, lease_seconds=300):
+        """Claim queued invoice jobs that are due for rendering"""
+        return self._claim_outbox_rows('invoice_jobs', limit, lease_seconds)
+
+    def complete_invoice_job(self, job_id, invoice_file):
+        """Record a finished job and point its order at the rendered PDF
+
+        A job that finishes after a newer job for the same order (which saw
+        newer details) leaves the order's invoice_file alone.
+
+        Returns:
+            The order's invoice_file afterwards
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT order_id FROM invoice_jobs WHERE id = ?', (job_id,))
+            order_id = cursor.fetchone()['order_id']
+
+            cursor.execute('''
+                UPDATE orders SET invoice_file = ?
+                WHERE id = ? AND NOT EXISTS (
+                    SELECT 1 FROM invoice_jobs
+                    WHERE order_id = ? AND id > ? AND status = 'processed'
+                )
+            ''', (invoice_file, order_id, order_id, job_id))
+            cursor.execute('''
+                UPDATE invoice_jobs
+                SET status = 'processed', processed_date = CURRENT_TIMESTAMP, last_error = NULL
+                WHERE id = ?
+            ''', (job_id,))
+
+            cursor.execute('SELECT invoice_file FROM orders WHERE id = ?', (order_id,))
+            current = cursor.fetchone()['invoice_file']
+
+            conn.commit()
+            conn.close()
+            return current
+
+        except Exception:
+            conn.rollback()
+            conn.close()
+            raise
+
+    def mark_invoice_job_failed(self, job_id, error, retry_in=None):
+        """Record a failed job (retry_in=None gives up on it)"""
+        self._mark_outbox_row_failed('invoice_jobs', job_id, error, retry_in)
+
+    def get_invoice_job_stats(self):
+        """Count invoice jobs by status"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT status, COUNT(*) as count FROM invoice_jobs GROUP BY status')
+        stats = {'pending': 0, 'processed': 0, 'failed': 0}
+        for row in cursor.fetchall():
+            stats[row['status']] = row['count']
+
+        conn.close()
+        return stats
+
+    def set_order_invoice_file(self, order_id, invoice_file):
+        """Point an order at its rendered invoice PDF"""
+        conn = self.get_connection()
+        conn.execute('UPDATE orders SET invoice_file = ? WHERE id = ?', (invoice_file, order_id))
+        conn.commit()
+        conn.close()
+
+    def get_invoiced_orders(self, order_ids=None, month=None):
+        """Orders that have an invoice number, with their customer's details
+
+        Args:
+            order_ids: Only these orders
+            month: Only invoices dated in this month ('YYYY-MM', South African time)
+
+        Returns:
+            List of order dicts with customer_name, customer_email and customer_phone
+        """
+        conditions = ['o.invoice_number IS NOT NULL']
+        params = []
+        if order_ids is not None:
+            if not order_ids:
+                return []
+            conditions.append(f"o.id IN ({','.join('?' * len(order_ids))})")
+            params.extend(order_ids)
+        if month:
+            conditions.append("COALESCE(o.invoice_generated_date, o.created_date) >= ?"
+                              " AND COALESCE(o.invoice_generated_date, o.created_date) < ?")
+            params.extend(_utc_month_bounds(month))
+
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute(f'''
+            SELECT o.*, u.name as customer_name, u.email as customer_email, u.phone as customer_phone
+            FROM orders o
+            LEFT JOIN users u ON o.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY o.id
+        ''', params)
+        orders = [dict(row) for row in cursor.fetchall()]
+
+        conn.close()
+        return orders
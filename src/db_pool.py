@@ -0,0 +1,211 @@
+"""
+SQLite connection pooling for the Database class.
+
+Every Database method follows the same pattern: get_connection(), do some
+work, conn.close().  Opening a fresh sqlite3 connection for each of those
+calls is wasteful, so the pool hands out a thin wrapper instead:
+
+- All calls made by one thread share a single connection while any of
+  them is open (nested calls such as add_cutter_item -> generate_item_number
+  reuse it too).
+- While a request scope is open (see Database.begin_request/end_request,
+  wired to Flask's app context in app.py) the connection stays bound to
+  the thread for the whole request, even between method calls.
+- Closing the wrapper returns the connection to an idle pool rather than
+  closing it, so the next request skips the connect and pragma setup.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+
+
+# SQLite reports some pragmas as integers; map the names used in Config to them
+_PRAGMA_NAMES = {
+    'synchronous': {'OFF': 0, 'NORMAL': 1, 'FULL': 2, 'EXTRA': 3},
+    'temp_store': {'DEFAULT': 0, 'FILE': 1, 'MEMORY': 2},
+}
+
+
+class PooledConnection:
+    """Connection handle returned by ConnectionPool.connection()
+
+    Behaves like a sqlite3.Connection except that close() releases the
+    connection back to the pool. Each handle can only be closed once.
+    A handle that is dropped without close() (a method that raised before
+    reaching it) is released when it is garbage collected, the way a plain
+    sqlite3 connection used to be closed, so its uncommitted work is rolled
+    back instead of holding the write lock.
+    """
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+        self._closed = False
+
+    def close(self):
+        """Release the connection back to the pool"""
+        if not self._closed:
+            self._closed = True
+            self._pool.release(self._conn)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def __getattr__(self, name):
+        if self._closed:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return self._conn.__exit__(exc_type, exc_value, traceback)
+
+
+class ConnectionPool:
+    """Thread-bound pool of configured sqlite3 connections"""
+
+    def __init__(self, db_path, pool_size=5, pragmas=None, timeout=5.0):
+        """
+        Args:
+            db_path: Path to the SQLite database file
+            pool_size: Maximum number of idle connections kept open for reuse
+            pragmas: Dict of PRAGMA name -> value applied once per new connection
+            timeout: Seconds sqlite3 waits on a locked database before raising
+        """
+        self.db_path = db_path
+        self.pool_size = max(1, int(pool_size))
+        self.pragmas = dict(pragmas or {})
+        self.timeout = timeout
+        self.trace = None
+
+        # Ensure directory exists (once, instead of on every connection)
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._reset()
+
+    def _reset(self):
+        """Forget all connections (used at startup and after a fork)"""
+        self._pid = os.getpid()
+        # LIFO so the most recently used (warmest) connection is reused first
+        self._idle = queue.LifoQueue(maxsize=self.pool_size)
+        self._local = threading.local()
+
+    def _connect(self):
+        """Open a new connection and apply the configured pragmas"""
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        if self.trace is not None:
+            conn.set_trace_callback(self.trace)
+        return conn
+
+    def _checkout(self):
+        """Take an idle connection from the pool, or open a new one"""
+        # SQLite connections must not be shared across a fork (gunicorn/Passenger
+        # may import the app before spawning workers), so start afresh in the child
+        if os.getpid() != self._pid:
+            self._reset()
+
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def _checkin(self, conn):
+        """Return a connection to the idle pool, closing it if the pool is full"""
+        try:
+            # Discard anything a failed method left uncommitted, as close() used to
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put_nowait(conn)
+        except (queue.Full, sqlite3.Error):
+            conn.close()
+
+    def connection(self):
+        """Get a connection handle for the current thread"""
+        local = self._local
+        if getattr(local, 'conn', None) is None:
+            local.conn = self._checkout()
+            local.depth = 0
+        local.depth += 1
+        return PooledConnection(self, local.conn)
+
+    def release(self, conn):
+        """Release one handle; unbind the connection once none are open"""
+        local = self._local
+        if getattr(local, 'conn', None) is not conn:
+            # Handle outlived its request scope; the connection is already back
+            return
+
+        local.depth -= 1
+        if local.depth > 0:
+            return
+
+        if getattr(local, 'scoped', False):
+            # Keep the connection bound for the rest of the request
+            if local.conn.in_transaction:
+                local.conn.rollback()
+        else:
+            self._checkin(local.conn)
+            local.conn = None
+
+    def begin_scope(self):
+        """Keep the current thread's connection bound until end_scope()"""
+        self._local.scoped = True
+
+    def end_scope(self):
+        """Return the current thread's connection to the pool"""
+        local = self._local
+        local.scoped = False
+        if getattr(local, 'conn', None) is not None:
+            self._checkin(local.conn)
+            local.conn = None
+            local.depth = 0
+
+    def check_pragmas(self):
+        """Compare the configured pragmas with what SQLite actually applied
+
+        Returns:
+            List of (name, requested, effective, applied) tuples
+        """
+        conn = self.connection()
+        try:
+            report = []
+            for name, requested in self.pragmas.items():
+                row = conn.execute(f'PRAGMA {name}').fetchone()
+                effective = row[0] if row else None
+                expected = _PRAGMA_NAMES.get(name, {}).get(str(requested).upper(), requested)
+                applied = str(effective).upper() == str(expected).upper()
+                report.append((name, requested, effective, applied))
+            return report
+        finally:
+            conn.close()
+
+    def set_trace(self, callback):
+        """Call `callback(sql)` for every statement run on this pool's connections
+
+        Used by scripts/benchmark.py to count queries per request. Idle
+        connections are closed so every connection from now on is traced;
+        pass None to stop tracing new connections.
+        """
+        self.trace = callback
+        self.close_all()
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
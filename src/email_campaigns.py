@@ -0,0 +1,118 @@
+"""
+Background sender for bulk email campaigns.
+
+The admin bulk email form only records a campaign and its recipient list
+(email_campaigns / email_campaign_recipients). CampaignRunner sends it from
+a background thread over a few parallel SMTP connections, throttled to a
+per-minute rate, and records each recipient's result as it goes.
+
+Because every recipient's status is stored, a campaign interrupted by a
+crash or restart carries on where it stopped: whichever process claims it
+next skips everyone already emailed.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.background import BackgroundWorker, RateLimiter
+from src.email_utils import open_smtp_connection, render_bulk_email_templates, build_bulk_email
+from src.smtp_pool import SMTPPool, connection_lost
+
+
+class CampaignRunner(BackgroundWorker):
+    """Send queued bulk email campaigns from a background thread"""
+
+    thread_name = 'email-campaigns'
+
+    def __init__(self, db, config, concurrency=2, rate_per_minute=60,
+                 poll_interval=30, lease_seconds=120):
+        """
+        Args:
+            db: Database instance
+            config: Flask app config (mail server settings)
+            concurrency: Parallel SMTP connections per campaign
+            rate_per_minute: Maximum emails sent per minute (0 = no limit)
+            poll_interval: Seconds between checks for new or abandoned campaigns
+            lease_seconds: How long a claimed campaign stays ours without
+                           progress before another process may take it over
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.config = config
+        self.concurrency = max(1, int(concurrency))
+        self.rate_per_minute = rate_per_minute
+        self.lease_seconds = lease_seconds
+
+    def run_campaign(self, campaign):
+        """Send every pending recipient of a claimed campaign
+
+        Returns:
+            False if the runner was stopped before the campaign finished
+        """
+        print(f"Sending email campaign {campaign['id']}: {campaign['subject']}")
+        templates = render_bulk_email_templates(self.config, campaign['message'],
+                                                campaign['interest_filter'])
+        limiter = RateLimiter(self.rate_per_minute)
+        smtp_pool = SMTPPool(lambda: open_smtp_connection(self.config), size=self.concurrency)
+
+        # Set when the mail server can't be reached; the campaign then waits
+        # for its lease to run out and is picked up again later
+        server_down = threading.Event()
+
+        def send_one(recipient):
+            if server_down.is_set():
+                self.db.mark_campaign_recipient(recipient['id'], 'pending')
+                return
+            limiter.wait()
+            try:
+                msg = build_bulk_email(self.config, campaign['subject'], templates,
+                                       recipient['email'], recipient['name'],
+                                       recipient['unsubscribe_token'])
+                smtp_pool.send([msg])
+                self.db.mark_campaign_recipient(recipient['id'], 'sent')
+            except Exception as e:
+                if connection_lost(e):
+                    server_down.set()
+                    self.db.mark_campaign_recipient(recipient['id'], 'pending', str(e))
+                else:
+                    self.db.mark_campaign_recipient(recipient['id'], 'failed', str(e))
+                print(f"Failed to send to {recipient['email']}: {str(e)}")
+
+        # Keep each batch well inside the lease, even at low send rates
+        batch_size = self.concurrency * 5
+        if self.rate_per_minute:
+            batch_size = max(1, min(batch_size, int(self.rate_per_minute * self.lease_seconds / 120)))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency,
+                                    thread_name_prefix='email-campaign') as executor:
+                while not self._stopping.is_set():
+                    recipients = self.db.claim_campaign_recipients(
+                        campaign['id'], limit=batch_size, lease_seconds=self.lease_seconds)
+                    if not recipients:
+                        self.db.finish_email_campaign(campaign['id'])
+                        print(f"Email campaign {campaign['id']} finished")
+                        return True
+                    list(executor.map(send_one, recipients))
+                    if server_down.is_set():
+                        print(f"Email campaign {campaign['id']} paused: mail server unavailable")
+                        return False
+        finally:
+            smtp_pool.close_all()
+
+        return False
+
+    def run_once(self):
+        """Send campaigns until none are waiting
+
+        Returns:
+            Number of campaigns worked on
+        """
+        count = 0
+        while not self._stopping.is_set():
+            campaign = self.db.claim_email_campaign(lease_seconds=self.lease_seconds)
+            if campaign is None:
+                break
+            self.run_campaign(campaign)
+            count += 1
+        return count
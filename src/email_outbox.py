@@ -0,0 +1,95 @@
+"""
+Outbox for outgoing email.
+
+Request handlers build their messages as before (src/email_utils.py), but
+instead of talking to the SMTP server inline, send_messages() stores the
+rendered message in the email_outbox table and returns. A worker drains the
+table in the background, retrying failed deliveries with exponential
+backoff, so a slow or unavailable mail server never holds up a response.
+
+The worker runs as a thread inside each app process (BACKGROUND_WORKER_THREADS),
+or on its own via scripts/email_worker.py.
+"""
+
+import email
+import smtplib
+
+from src.background import BackgroundWorker
+from src.email_utils import get_smtp_pool
+
+
+class EmailOutbox(BackgroundWorker):
+    """Queue email in the database and deliver it from a background thread"""
+
+    thread_name = 'email-outbox'
+
+    def __init__(self, db, config, batch_size=20, poll_interval=10,
+                 max_attempts=6, retry_delay=60):
+        """
+        Args:
+            db: Database instance
+            config: Flask app config (mail server settings)
+            batch_size: Emails claimed per round
+            poll_interval: Seconds between checks when the outbox is idle
+            max_attempts: Delivery attempts before an email is marked failed
+            retry_delay: Seconds before the first retry (doubles per attempt, max 1 hour)
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.config = config
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def enqueue(self, msg, to_addrs=None):
+        """Store a built message for delivery (called by email_utils.send_messages)"""
+        recipients = ', '.join(to_addrs) if to_addrs else msg['To']
+        success, message, outbox_id = self.db.enqueue_email(
+            msg['Subject'], recipients, msg.as_bytes(), to_addrs)
+        if not success:
+            raise RuntimeError(f"Could not queue email: {message}")
+
+        # Deliver right away rather than at the next poll
+        self.wake()
+        return outbox_id
+
+    def backoff(self, attempts):
+        """Seconds to wait before retrying after `attempts` failed attempts"""
+        return min(self.retry_delay * 2 ** (attempts - 1), 3600)
+
+    def run_once(self):
+        """Deliver one batch of due emails
+
+        Returns:
+            Number of emails claimed (0 when nothing was due)
+        """
+        rows = self.db.claim_outbox_emails(limit=self.batch_size)
+        smtp_pool = get_smtp_pool(self.config)
+
+        for row in rows:
+            try:
+                msg = email.message_from_bytes(row['message'])
+                smtp_pool.send([msg], to_addrs=row['to_addrs'])
+                self.db.mark_outbox_email_sent(row['id'])
+
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e)}"
+                print(f"Email {row['id']} to {row['recipients']} failed (attempt {row['attempts']}): {error}")
+
+                # Every recipient rejected: retrying will not help
+                if isinstance(e, smtplib.SMTPRecipientsRefused) or row['attempts'] >= self.max_attempts:
+                    self.db.mark_outbox_email_failed(row['id'], error)
+                else:
+                    self.db.mark_outbox_email_failed(row['id'], error,
+                                                     retry_in=self.backoff(row['attempts']))
+
+        return len(rows)
+
+    def drain(self):
+        """Deliver batches until nothing is due (used by scripts/email_worker.py --once)"""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            if not claimed:
+                return total
+            total += claimed
@@ -0,0 +1,288 @@
+"""
+Jinja templates for outgoing email.
+
+Email bodies live in templates/emails/ and extend templates/emails/layout.html.
+Each template is compiled once per process and kept (auto_reload is off, so
+a changed template needs an app restart), then rendered per message.
+
+Only the HTML is written by hand. The plain-text part comes from a second
+environment whose loader converts each HTML template source to text before
+it is compiled, leaving the {{ }} and {% %} tags in place. Rendering the text
+part is then an ordinary template render rather than an HTML parse of every
+message.
+
+For sends to many recipients, EmailBatch looks the templates up once and
+renders each recipient with the shared context already merged:
+
+    batch = EmailBatch('bulk.html', site_context(config), message=body)
+    for recipient in recipients:
+        html, text = batch.render(name=recipient['name'], unsubscribe_url=...)
+"""
+
+import os
+import re
+import threading
+from html.parser import HTMLParser
+
+from jinja2 import Environment, FileSystemLoader
+from markupsafe import Markup, escape
+
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                               'templates', 'emails')
+
+# Tags that start a new line / a new paragraph in the plain-text version.
+# A div that holds other blocks (a section rather than a single line) is
+# followed by a blank line.
+_LINE_TAGS = ('div', 'li', 'tr', 'center')
+_CONTAINER_TAGS = ('div', 'center')
+_PARAGRAPH_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'ul', 'ol', 'table', 'blockquote')
+_SKIPPED_TAGS = ('head', 'style', 'script', 'title')
+
+# Data that is nothing but Jinja statements ({% if %}, {% endif %}, ...)
+_STATEMENTS_ONLY = re.compile(r'^\s*(\{%(?:(?!%\}).)*%\}\s*)+$', re.DOTALL)
+_STATEMENT = re.compile(r'\{%-?\s*(\w+)(?:(?!%\}).)*%\}', re.DOTALL)
+_BLOCK_STATEMENTS = ('if', 'for', 'macro', 'call', 'block', 'filter', 'with')
+
+
+class _TextConverter(HTMLParser):
+    """Turn HTML (or an HTML template source) into readable plain text"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.pending_newlines = 0
+        self.trailing_newlines = 0  # Line breaks at the end of the text so far
+        self.statement_blocks = []  # Line breaks where each open {% if %}/{% for %}/... began
+        self.skipping = 0
+        self.lists = []  # One entry per open <ul>/<ol>: None or the next number
+        self.containers = []  # One flag per open div: whether it holds other blocks
+        self.links = []  # (href, index of the first part inside the link)
+
+    def _request_newlines(self, count):
+        if self.parts:
+            self.pending_newlines = max(self.pending_newlines, count)
+
+    def _flush_newlines(self):
+        missing = self.pending_newlines - self.trailing_newlines
+        if missing > 0:
+            if self.parts:
+                self.parts[-1] = self.parts[-1].rstrip(' ')
+            self.parts.append('\n' * missing)
+            self.trailing_newlines += missing
+        self.pending_newlines = 0
+
+    def _write(self, text):
+        self._flush_newlines()
+        if self.trailing_newlines:
+            text = text.lstrip(' ')
+        if text:
+            self.parts.append(text)
+            self.trailing_newlines = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'br':
+            if self.parts:
+                self.pending_newlines = min(2, self.pending_newlines + 1)
+        elif tag in _SKIPPED_TAGS:
+            self.skipping += 1
+        elif tag in _PARAGRAPH_TAGS:
+            self._request_newlines(2)
+        elif tag in _LINE_TAGS:
+            self._request_newlines(1)
+
+        if tag in _PARAGRAPH_TAGS or tag in _LINE_TAGS:
+            if self.containers:
+                self.containers[-1] = True
+            if tag in _CONTAINER_TAGS:
+                self.containers.append(False)
+
+        if tag == 'ul':
+            self.lists.append(None)
+        elif tag == 'ol':
+            self.lists.append(1)
+        elif tag == 'li':
+            number = self.lists[-1] if self.lists else None
+            if number is None:
+                self._write('- ')
+            else:
+                self._write(f'{number}. ')
+                self.lists[-1] += 1
+        elif tag == 'a':
+            self.links.append((dict(attrs).get('href') or '', len(self.parts)))
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS:
+            self.skipping = max(0, self.skipping - 1)
+        elif tag in _PARAGRAPH_TAGS:
+            self._request_newlines(2)
+        elif tag in _CONTAINER_TAGS and self.containers:
+            self._request_newlines(2 if self.containers.pop() else 1)
+        elif tag in _LINE_TAGS:
+            self._request_newlines(1)
+
+        if tag in ('ul', 'ol') and self.lists:
+            self.lists.pop()
+        elif tag == 'a' and self.links:
+            href, start = self.links.pop()
+            label = ''.join(self.parts[start:]).strip()
+            if href and not href.startswith(('mailto:', 'cid:')) and label != href:
+                self._write(f' ({href})')
+
+    def handle_data(self, data):
+        if self.skipping:
+            return
+        if _STATEMENTS_ONLY.match(data):
+            for match in _STATEMENT.finditer(data):
+                self._handle_statement(match.group(1), match.group(0))
+            return
+        text = re.sub(r'\s+', ' ', data)
+        if text.strip():
+            self._write(text)
+        elif self.parts and not self.trailing_newlines and not self.pending_newlines \
+                and not self.parts[-1].endswith(' '):
+            self.parts.append(' ')
+
+    def _handle_statement(self, keyword, statement):
+        """Keep template logic where it is, with line breaks on the right side of it
+
+        Line breaks owed before a block are written before it, those owed at
+        the end of a branch inside it, and each branch starts where the block
+        did. Afterwards only the breaks every branch ended with are assumed.
+        """
+        if keyword in _BLOCK_STATEMENTS:
+            self._flush_newlines()
+            self.statement_blocks.append(self.trailing_newlines)
+        elif keyword in ('elif', 'else') or keyword.startswith('end'):
+            self._flush_newlines()
+            if self.statement_blocks:
+                if keyword in ('elif', 'else'):
+                    self.trailing_newlines = self.statement_blocks[-1]
+                else:
+                    self.trailing_newlines = min(self.trailing_newlines, self.statement_blocks.pop())
+        self.parts.append(statement)
+
+    def text(self):
+        return ''.join(self.parts).strip() + '\n'
+
+
+def html_to_text(html):
+    """Plain-text version of an HTML email (or email template source)"""
+    converter = _TextConverter()
+    converter.feed(html)
+    converter.close()
+    return converter.text()
+
+
+def _tidy_text(text):
+    """Drop the blank lines left behind by template blocks that rendered nothing"""
+    lines = [line.rstrip() for line in text.split('\n')]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip() + '\n'
+
+
+class _PlainTextLoader(FileSystemLoader):
+    """Load each email template as its plain-text conversion"""
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return html_to_text(source), filename, uptodate
+
+
+def _money(value):
+    return f"R{float(value or 0):.2f}"
+
+
+def _nl2br(value):
+    return Markup('<br>').join(escape(value or '').split('\n'))
+
+
+_environments = None
+_environments_lock = threading.Lock()
+
+
+def _get_environments():
+    """The (html, text) Jinja environments, created on first use"""
+    global _environments
+    if _environments is None:
+        with _environments_lock:
+            if _environments is None:
+                html_env = Environment(loader=FileSystemLoader(TEMPLATE_FOLDER), autoescape=True,
+                                       auto_reload=False, trim_blocks=True, lstrip_blocks=True)
+                html_env.filters['money'] = _money
+                html_env.filters['nl2br'] = _nl2br
+
+                text_env = Environment(loader=_PlainTextLoader(TEMPLATE_FOLDER), autoescape=False,
+                                       auto_reload=False)
+                text_env.filters['money'] = _money
+                text_env.filters['nl2br'] = lambda value: value or ''
+
+                _environments = (html_env, text_env)
+    return _environments
+
+
+def site_context(config, **extra):
+    """Values every email template can use as site.*"""
+    site = {
+        'name': config.get('SITE_NAME', 'Snow Spoiled Gifts'),
+        'tagline': config.get('TAGLINE', 'Premium 3D Printing & Personalized Gifts'),
+        'url': config.get('SITE_URL', 'www.snowspoiledgifts.co.za'),
+        'base_url': config.get('BASE_URL', 'http://192.168.0.248:5000'),
+        'sender': config.get('MAIL_DEFAULT_SENDER', ''),
+        'contact_email': config.get('CONTACT_EMAIL') or config.get('MAIL_DEFAULT_SENDER', ''),
+        'contact_phone': config.get('CONTACT_PHONE', ''),
+        'whatsapp': config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285'),
+    }
+    site.update(extra)
+    return {'site': site}
+
+
+class EmailBatch:
+    """One email template rendered for many recipients
+
+    The HTML and text templates are compiled (or fetched from the cache) once,
+    and the context shared by every recipient is merged once.
+    """
+
+    def __init__(self, template_name, *contexts, **context):
+        """
+        Args:
+            template_name: File in templates/emails/
+            contexts: Dicts shared by every recipient (e.g. site_context(config))
+            context: More shared values
+        """
+        html_env, text_env = _get_environments()
+        self.template_name = template_name
+        self.html_template = html_env.get_template(template_name)
+        self.text_template = text_env.get_template(template_name)
+        self.context = {}
+        for shared in contexts:
+            self.context.update(shared)
+        self.context.update(context)
+
+    def render(self, **recipient):
+        """Render for one recipient
+
+        Returns:
+            Tuple (html: str, text: str)
+        """
+        context = {**self.context, **recipient} if recipient else self.context
+        return self.html_template.render(context), _tidy_text(self.text_template.render(context))
+
+
+def render_email(template_name, config, **context):
+    """Render one email
+
+    Returns:
+        Tuple (html: str, text: str)
+    """
+    return EmailBatch(template_name, site_context(config), context).render()
+
+
+def preload_email_templates():
+    """Compile every email template now instead of on first send"""
+    html_env, text_env = _get_environments()
+    names = [name for name in html_env.list_templates(extensions=['html'])
+             if not os.path.basename(name).startswith('_')]
+    for name in names:
+        html_env.get_template(name)
+        text_env.get_template(name)
+    return names
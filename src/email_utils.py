@@ -1,62 +1,191 @@
 import smtplib
 import os
-import base64
+import io
+import copy
+import threading
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
 from datetime import datetime
 from flask import url_for
+from src.smtp_pool import SMTPPool
+from src.image_variants import Image
+from src.email_templates import EmailBatch, render_email, site_context
 
 
-def get_logo_embedded():
-    """Get the SSG logo as base64 for embedding in emails"""
-    # Get the absolute path to the project root (parent of 'src' directory)
+# Readable names of the signup interests
+INTEREST_LABELS = {
+    '3d_printing': '3D Printing',
+    'sublimation': 'Sublimation',
+    'vinyl': 'Vinyl',
+    'giftboxes': 'Giftboxes',
+    'candles_soaps': 'Candles and Soaps',
+}
+
+
+# Outbox that send_messages() hands messages to instead of sending them
+# inline (set by the app via set_email_outbox; None = send immediately)
+_outbox = None
+
+
+def set_email_outbox(outbox):
+    """Route outgoing email through an outbox (see src/email_outbox.py)
+
+    Args:
+        outbox: Object with an enqueue(msg, to_addrs=None) method, or None
+                to go back to sending inline
+    """
+    global _outbox
+    _outbox = outbox
+
+
+def open_smtp_connection(config):
+    """Open an authenticated SMTP connection using the app's mail settings
+
+    Connections are pooled and reused, so every socket operation times out
+    rather than letting a half-open connection hang a request or worker.
+    """
+    timeout = config.get('MAIL_TIMEOUT', 30)
+    if config.get('MAIL_USE_SSL'):
+        # Use SMTP_SSL for port 465
+        server = smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=timeout)
+    else:
+        # Use SMTP with STARTTLS for port 587
+        server = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'], timeout=timeout)
+        if config.get('MAIL_USE_TLS', True):
+            server.starttls()
+
+    if config.get('MAIL_USERNAME'):
+        server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+
+    return server
+
+
+# One connection pool per mail account, created on first use
+_smtp_pools = {}
+_smtp_pools_lock = threading.Lock()
+
+
+def get_smtp_pool(config):
+    """Get the shared SMTP connection pool for the configured mail account"""
+    key = (config['MAIL_SERVER'], config['MAIL_PORT'], config.get('MAIL_USERNAME'),
+           bool(config.get('MAIL_USE_SSL')))
+    with _smtp_pools_lock:
+        pool = _smtp_pools.get(key)
+        if pool is None:
+            pool = SMTPPool(lambda: open_smtp_connection(config),
+                            size=config.get('MAIL_POOL_SIZE', 2))
+            _smtp_pools[key] = pool
+    return pool
+
+
+def send_messages(config, messages, to_addrs=None):
+    """Send (or queue) fully built email messages
+
+    Args:
+        config: Flask app config object
+        messages: List of email.message.Message objects
+        to_addrs: Optional envelope recipients (default: the To/Cc headers)
+
+    Returns:
+        'queued' when the messages went to the outbox (delivery failures then
+        show on the admin Outbox page), 'sent' when they were sent inline
+    """
+    if _outbox is not None:
+        for msg in messages:
+            _outbox.enqueue(msg, to_addrs=to_addrs)
+        return 'queued'
+
+    get_smtp_pool(config).send(messages, to_addrs=to_addrs)
+    return 'sent'
+
+
+# Inline images shared by every email, loaded once per process
+# (name -> MIMEImage, or None if the file is missing)
+_email_assets = {}
+_email_assets_lock = threading.Lock()
+
+# Content-ID the email header uses to reference the logo
+LOGO_CID = 'ssg-logo'
+
+EMAIL_ASSETS = {
+    # name: (path under static/, Content-ID, max width in pixels when Pillow is available)
+    'logo': (os.path.join('images', 'logo', 'SSG-Logo.png'), LOGO_CID, 160),
+}
+
+
+def _load_email_asset(name):
+    """Read an email image from static/, scaled down to the size emails show it at"""
+    relative_path, content_id, max_width = EMAIL_ASSETS[name]
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    path = os.path.join(project_root, 'static', relative_path)
+    if not os.path.exists(path):
+        print(f"Email image not found: {path}")
+        return None
 
-    # Try multiple possible paths
-    possible_paths = [
-        os.path.join(project_root, 'static', 'images', 'logo', 'SSG-Logo.png'),
-        os.path.join('static', 'images', 'logo', 'SSG-Logo.png'),
-        os.path.join(os.getcwd(), 'static', 'images', 'logo', 'SSG-Logo.png'),
-    ]
+    with open(path, 'rb') as f:
+        data = f.read()
 
-    for logo_path in possible_paths:
+    if Image is not None:
         try:
-            if os.path.exists(logo_path):
-                print(f"Loading logo from: {logo_path}")
-                with open(logo_path, 'rb') as f:
-                    logo_data = base64.b64encode(f.read()).decode()
-                    print(f"Logo loaded successfully, size: {len(logo_data)} characters")
-                    return f'data:image/png;base64,{logo_data}'
+            with Image.open(io.BytesIO(data)) as image:
+                if image.width > max_width:
+                    height = max(1, round(image.height * max_width / image.width))
+                    buffer = io.BytesIO()
+                    image.resize((max_width, height), Image.LANCZOS).save(buffer, 'PNG', optimize=True)
+                    data = buffer.getvalue()
         except Exception as e:
-            print(f"Could not load logo from {logo_path}: {e}")
-            continue
-
-    print(f"Logo not found in any expected location. Tried: {possible_paths}")
-    return None
-
-
-def add_email_logo_header(config):
-    """Generate HTML header with logo for emails"""
-    logo_base64 = get_logo_embedded()
-    site_name = config.get('SITE_NAME', 'Snow Spoiled Gifts')
-    tagline = config.get('TAGLINE', 'Premium 3D Printing & Personalized Gifts')
-
-    if logo_base64:
-        return f'''
-        <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);">
-            <img src="{logo_base64}" alt="{site_name} Logo" width="80" height="80" style="display: block; margin: 0 auto 10px auto; max-width: 80px; height: auto; border: none;">
-            <h1 style="color: white; margin: 0; font-size: 24px;">{site_name}</h1>
-            <p style="color: #dbeafe; margin: 5px 0 0 0;">{tagline}</p>
-        </div>
-        '''
-    else:
-        return f'''
-        <div style="text-align: center; padding: 20px; background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);">
-            <h1 style="color: white; margin: 0; font-size: 24px;">{site_name}</h1>
-            <p style="color: #dbeafe; margin: 5px 0 0 0;">{tagline}</p>
-        </div>
-        '''
+            print(f"Could not resize email image {path}: {str(e)}")
+
+    part = MIMEImage(data, _subtype='png')
+    part.add_header('Content-ID', f'<{content_id}>')
+    part.add_header('Content-Disposition', 'inline', filename=os.path.basename(path))
+    return part
+
+
+def _email_asset(name):
+    """The shared (never attached) part of an email asset"""
+    if name not in _email_assets:
+        with _email_assets_lock:
+            if name not in _email_assets:
+                _email_assets[name] = _load_email_asset(name)
+    return _email_assets[name]
+
+
+def get_email_asset(name):
+    """Inline image part for an email asset, or None if it could not be loaded
+
+    The file is read (and base64 encoded) the first time only; each call
+    returns a copy that can be attached to one message.
+    """
+    part = _email_asset(name)
+    return copy.deepcopy(part) if part is not None else None
+
+
+def build_html_email(text_body, html_body):
+    """Plain text + HTML body of an email
+
+    Returns a multipart/alternative part, wrapped in multipart/related with the
+    logo attached when the HTML references cid:LOGO_CID. Use it as the message
+    itself, or attach it to a multipart/mixed message that has attachments.
+    """
+    alternative = MIMEMultipart('alternative')
+    alternative.attach(MIMEText(text_body, 'plain'))
+    alternative.attach(MIMEText(html_body, 'html'))
+
+    logo = get_email_asset('logo') if f'cid:{LOGO_CID}' in html_body else None
+    if logo is None:
+        return alternative
+
+    related = MIMEMultipart('related')
+    related.attach(alternative)
+    related.attach(logo)
+    return related
+
+
+def _logo_context():
+    """Template values for the logo header (templates/emails/_logo_header.html)"""
+    return {'show_logo': _email_asset('logo') is not None, 'logo_cid': LOGO_CID}
 
 
 def send_quote_notification(config, quote_data):
@@ -76,8 +205,11 @@ def send_quote_notification(config, quote_data):
         return False, "Email not configured"
 
     try:
+        html_body, text_body = render_email('quote_notification.html', config,
+                                            quote=quote_data, now=datetime.now())
+
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = f"New Quote Request: {quote_data['service_type']} - {quote_data['name']}"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = config['NOTIFICATION_RECIPIENTS'][0]  # Primary recipient
@@ -86,173 +218,11 @@ def send_quote_notification(config, quote_data):
         if len(config['NOTIFICATION_RECIPIENTS']) > 1:
             msg['Cc'] = ', '.join(config['NOTIFICATION_RECIPIENTS'][1:])
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9fafb; padding: 20px; border: 1px solid #e5e7eb; }}
-                .field {{ margin-bottom: 15px; }}
-                .label {{ font-weight: bold; color: #2563eb; }}
-                .value {{ margin-top: 5px; padding: 10px; background: white; border-left: 3px solid #2563eb; }}
-                .footer {{ background: #f3f4f6; padding: 15px; text-align: center; font-size: 12px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; padding: 10px 20px; background: #2563eb; color: white !important; text-decoration: none; border-radius: 5px; margin-top: 15px; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2 style="margin: 0;">New Quote Request Received</h2>
-                    <p style="margin: 10px 0 0 0; opacity: 0.9;">Snow Spoiled Gifts - 3D Printing Services</p>
-                </div>
-
-                <div class="content">
-                    <div class="field">
-                        <div class="label">Service Type:</div>
-                        <div class="value">{quote_data['service_type']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Customer Name:</div>
-                        <div class="value">{quote_data['name']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Email:</div>
-                        <div class="value"><a href="mailto:{quote_data['email']}">{quote_data['email']}</a></div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Phone:</div>
-                        <div class="value">{quote_data['phone']} (Preferred: {quote_data['preferred_contact']})</div>
-                    </div>''' if quote_data.get('phone') else ''}
-
-                    <div class="field">
-                        <div class="label">Description:</div>
-                        <div class="value">{quote_data['description']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Intended Use:</div>
-                        <div class="value">{quote_data['intended_use']}</div>
-                    </div>''' if quote_data.get('intended_use') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Size:</div>
-                        <div class="value">{quote_data['size']}</div>
-                    </div>''' if quote_data.get('size') else ''}
-
-                    <div class="field">
-                        <div class="label">Quantity:</div>
-                        <div class="value">{quote_data['quantity']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Color:</div>
-                        <div class="value">{quote_data['color']}</div>
-                    </div>''' if quote_data.get('color') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Material:</div>
-                        <div class="value">{quote_data['material']}</div>
-                    </div>''' if quote_data.get('material') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Budget Range:</div>
-                        <div class="value">{quote_data['budget']}</div>
-                    </div>''' if quote_data.get('budget') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Additional Notes:</div>
-                        <div class="value">{quote_data['additional_notes']}</div>
-                    </div>''' if quote_data.get('additional_notes') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Reference Images:</div>
-                        <div class="value">{quote_data['reference_images']} file(s) uploaded</div>
-                    </div>''' if quote_data.get('reference_images') else ''}
-
-                    <div class="field">
-                        <div class="label">Request Date:</div>
-                        <div class="value">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Customer IP:</div>
-                        <div class="value">{quote_data.get('ip_address', 'N/A')}</div>
-                    </div>
-
-                    <div style="text-align: center; margin-top: 20px;">
-                        <a href="http://192.168.0.248:5000/admin/quotes" class="button">View in Admin Panel</a>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p>This is an automated notification from Snow Spoiled Gifts.</p>
-                    <p>Please respond to the customer within 24-48 hours.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-New Quote Request Received - Snow Spoiled Gifts
-
-Service Type: {quote_data['service_type']}
-Customer: {quote_data['name']}
-Email: {quote_data['email']}
-Phone: {quote_data.get('phone', 'N/A')} (Preferred: {quote_data.get('preferred_contact', 'Email')})
-
-Description:
-{quote_data['description']}
-
-{'Intended Use: ' + quote_data.get('intended_use', '') if quote_data.get('intended_use') else ''}
-{'Size: ' + quote_data.get('size', '') if quote_data.get('size') else ''}
-Quantity: {quote_data['quantity']}
-{'Color: ' + quote_data.get('color', '') if quote_data.get('color') else ''}
-{'Material: ' + quote_data.get('material', '') if quote_data.get('material') else ''}
-{'Budget: ' + quote_data.get('budget', '') if quote_data.get('budget') else ''}
-
-{'Additional Notes: ' + quote_data.get('additional_notes', '') if quote_data.get('additional_notes') else ''}
-
-Request Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-IP Address: {quote_data.get('ip_address', 'N/A')}
-
-View in Admin Panel: http://192.168.0.248:5000/admin/quotes
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
+        # Send email (queued for the outbox worker when it is running)
+        all_recipients = config['NOTIFICATION_RECIPIENTS']
+        status = send_messages(config, [msg], to_addrs=all_recipients)
 
-        return True, "Email notification sent successfully"
+        return True, f"Email notification {status}"
 
     except Exception as e:
         error_msg = f"Failed to send email notification: {str(e)}"
@@ -277,192 +247,18 @@ def send_customer_confirmation(config, quote_data):
         return False, "Email not configured"
 
     try:
+        html_body, text_body = render_email('quote_confirmation.html', config, quote=quote_data)
+
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = "Quote Request Received - Snow Spoiled Gifts"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = quote_data['email']
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 30px 20px; border-radius: 8px 8px 0 0; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
-                .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-                .message-box {{ background: #f0f9ff; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2563eb; }}
-                .field {{ margin-bottom: 15px; }}
-                .label {{ font-weight: bold; color: #2563eb; font-size: 14px; }}
-                .value {{ margin-top: 5px; padding: 10px; background: #f9fafb; border-left: 3px solid #2563eb; }}
-                .footer {{ background: #f3f4f6; padding: 20px; text-align: center; font-size: 13px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .footer p {{ margin: 5px 0; }}
-                .highlight {{ color: #2563eb; font-weight: bold; }}
-                .divider {{ height: 1px; background: #e5e7eb; margin: 20px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Thank You!</h1>
-                    <p>Your quote request has been received</p>
-                </div>
-
-                <div class="content">
-                    <p>Hi <strong>{quote_data['name']}</strong>,</p>
-
-                    <div class="message-box">
-                        <p style="margin: 0; font-size: 16px;">
-                            Thank you for your interest in <strong>Snow Spoiled Gifts</strong>!
-                            We've received your quote request for <strong>{quote_data['service_type']}</strong>
-                            and we're excited to help bring your project to life.
-                        </p>
-                    </div>
-
-                    <p>Our team will carefully review your request and get back to you within <span class="highlight">24-48 hours</span> with a detailed quote.</p>
-
-                    <div class="divider"></div>
-
-                    <h3 style="color: #2563eb; margin-bottom: 15px;">Your Request Summary:</h3>
-
-                    <div class="field">
-                        <div class="label">Service Type:</div>
-                        <div class="value">{quote_data['service_type']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Description:</div>
-                        <div class="value">{quote_data['description']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Intended Use:</div>
-                        <div class="value">{quote_data['intended_use']}</div>
-                    </div>''' if quote_data.get('intended_use') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Size:</div>
-                        <div class="value">{quote_data['size']}</div>
-                    </div>''' if quote_data.get('size') else ''}
-
-                    <div class="field">
-                        <div class="label">Quantity:</div>
-                        <div class="value">{quote_data['quantity']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Color Preference:</div>
-                        <div class="value">{quote_data['color']}</div>
-                    </div>''' if quote_data.get('color') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Material:</div>
-                        <div class="value">{quote_data['material']}</div>
-                    </div>''' if quote_data.get('material') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Budget Range:</div>
-                        <div class="value">{quote_data['budget']}</div>
-                    </div>''' if quote_data.get('budget') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Additional Notes:</div>
-                        <div class="value">{quote_data['additional_notes']}</div>
-                    </div>''' if quote_data.get('additional_notes') else ''}
-
-                    <div class="divider"></div>
-
-                    <p style="font-size: 14px; color: #6b7280;">
-                        <strong>What happens next?</strong><br>
-                        Our team will review your request and prepare a customized quote based on your specifications.
-                        We'll contact you at <strong>{quote_data['email']}</strong>{f" or <strong>{quote_data['phone']}</strong>" if quote_data.get('phone') else ""}
-                        with pricing details and any questions we may have.
-                    </p>
-
-                    <div class="message-box" style="margin-top: 20px;">
-                        <p style="margin: 0;">
-                            <strong>Questions in the meantime?</strong><br>
-                            Feel free to reply to this email or contact us directly. We're here to help!
-                        </p>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p><strong>Snow Spoiled Gifts</strong></p>
-                    <p>Premium 3D Printing Services</p>
-                    <p style="margin-top: 15px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['CONTACT_EMAIL']}
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">This is an automated confirmation email.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-Thank You for Your Quote Request!
-
-Hi {quote_data['name']},
-
-Thank you for your interest in Snow Spoiled Gifts! We've received your quote request for {quote_data['service_type']} and we're excited to help bring your project to life.
-
-Our team will carefully review your request and get back to you within 24-48 hours with a detailed quote.
-
-YOUR REQUEST SUMMARY:
--------------------
-Service Type: {quote_data['service_type']}
-Description: {quote_data['description']}
-{f"Intended Use: {quote_data['intended_use']}" if quote_data.get('intended_use') else ''}
-{f"Size: {quote_data['size']}" if quote_data.get('size') else ''}
-Quantity: {quote_data['quantity']}
-{f"Color: {quote_data['color']}" if quote_data.get('color') else ''}
-{f"Material: {quote_data['material']}" if quote_data.get('material') else ''}
-{f"Budget Range: {quote_data['budget']}" if quote_data.get('budget') else ''}
-{f"Additional Notes: {quote_data['additional_notes']}" if quote_data.get('additional_notes') else ''}
-
-WHAT HAPPENS NEXT?
------------------
-Our team will review your request and prepare a customized quote based on your specifications.
-We'll contact you at {quote_data['email']}{f" or {quote_data['phone']}" if quote_data.get('phone') else ""} with pricing details and any questions we may have.
-
-Questions in the meantime?
-Feel free to reply to this email or contact us directly. We're here to help!
-
----
-Snow Spoiled Gifts
-Premium 3D Printing Services
-
-This is an automated confirmation email.
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Customer confirmation email sent successfully"
+        return True, f"Customer confirmation email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send customer confirmation: {str(e)}"
@@ -487,168 +283,25 @@ def send_signup_confirmation(config, signup_data):
         return False, "Email not configured"
 
     try:
+        interests = [INTEREST_LABELS.get(interest, interest) for interest in signup_data.get('interests') or []]
+
+        # Build unsubscribe URL
+        unsubscribe_url = f"{config.get('BASE_URL', 'http://192.168.0.248:5000')}/unsubscribe?token={signup_data['unsubscribe_token']}"
+
+        html_body, text_body = render_email('signup_confirmation.html', config,
+                                            name=signup_data['name'], interests=interests,
+                                            unsubscribe_url=unsubscribe_url)
+
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = "Welcome to Snow Spoiled Gifts - You're All Set!"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = signup_data['email']
 
-        # Format interests list
-        interest_labels = {
-            '3d_printing': '3D Printing',
-            'sublimation': 'Sublimation',
-            'vinyl': 'Vinyl',
-            'giftboxes': 'Giftboxes',
-            'candles_soaps': 'Candles and Soaps'
-        }
-
-        interests_html = ""
-        interests_text = ""
-        if signup_data.get('interests'):
-            interests_list = [interest_labels.get(i, i) for i in signup_data['interests']]
-            interests_html = "<ul style='margin: 10px 0; padding-left: 20px;'>" + \
-                           "".join([f"<li style='margin: 5px 0;'>{interest}</li>" for interest in interests_list]) + \
-                           "</ul>"
-            interests_text = "\n".join([f"  - {interest}" for interest in interests_list])
-        else:
-            interests_html = "<p style='margin: 10px 0; color: #6b7280;'>All product categories</p>"
-            interests_text = "  - All product categories"
-
-        # Build unsubscribe URL
-        unsubscribe_url = f"{config.get('BASE_URL', 'http://192.168.0.248:5000')}/unsubscribe?token={signup_data['unsubscribe_token']}"
-
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 30px 20px; border-radius: 8px 8px 0 0; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
-                .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-                .message-box {{ background: #f0f9ff; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2563eb; }}
-                .interests-section {{ background: #f9fafb; padding: 15px; border-radius: 8px; margin: 20px 0; }}
-                .footer {{ background: #f3f4f6; padding: 20px; text-align: center; font-size: 13px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .footer p {{ margin: 5px 0; }}
-                .highlight {{ color: #2563eb; font-weight: bold; }}
-                .divider {{ height: 1px; background: #e5e7eb; margin: 20px 0; }}
-                .unsubscribe {{ margin-top: 15px; padding-top: 15px; border-top: 1px solid #e5e7eb; }}
-                .unsubscribe a {{ color: #6b7280; text-decoration: none; font-size: 12px; }}
-                .unsubscribe a:hover {{ text-decoration: underline; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Welcome! 🎉</h1>
-                    <p>You're now on our notification list</p>
-                </div>
-
-                <div class="content">
-                    <p>Hi <strong>{signup_data['name']}</strong>,</p>
-
-                    <div class="message-box">
-                        <p style="margin: 0; font-size: 16px;">
-                            Thank you for signing up to receive notifications from <strong>Snow Spoiled Gifts</strong>!
-                            We're excited to share our major news and updates with you.
-                        </p>
-                    </div>
-
-                    <p>You'll be among the first to know when we launch new products, special offers, and exciting updates.</p>
-
-                    <div class="divider"></div>
-
-                    <div class="interests-section">
-                        <h3 style="color: #2563eb; margin: 0 0 15px 0; font-size: 18px;">Your Interests:</h3>
-                        {interests_html}
-                        <p style="margin: 15px 0 0 0; font-size: 14px; color: #6b7280;">
-                            We'll keep you updated on products and news related to these categories.
-                        </p>
-                    </div>
-
-                    <div class="message-box" style="margin-top: 20px;">
-                        <p style="margin: 0; font-size: 14px;">
-                            <strong>Stay tuned!</strong><br>
-                            We'll be in touch soon with exciting updates. In the meantime, feel free to explore our website
-                            and see what we're all about.
-                        </p>
-                    </div>
-
-                    <div class="unsubscribe">
-                        <p style="margin: 0; font-size: 12px; color: #6b7280;">
-                            If you didn't sign up for this or wish to unsubscribe,
-                            <a href="{unsubscribe_url}">click here to unsubscribe</a>.
-                        </p>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p><strong>Snow Spoiled Gifts</strong></p>
-                    <p>Premium 3D Printing & Personalized Gifts</p>
-                    <p style="margin-top: 15px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['CONTACT_EMAIL']}
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">We respect your privacy. Your email will never be shared.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-Welcome to Snow Spoiled Gifts!
-
-Hi {signup_data['name']},
-
-Thank you for signing up to receive notifications from Snow Spoiled Gifts! We're excited to share our major news and updates with you.
-
-You'll be among the first to know when we launch new products, special offers, and exciting updates.
-
-YOUR INTERESTS:
---------------
-{interests_text}
-
-We'll keep you updated on products and news related to these categories.
-
-STAY TUNED!
-We'll be in touch soon with exciting updates. In the meantime, feel free to explore our website and see what we're all about.
-
----
-Snow Spoiled Gifts
-Premium 3D Printing & Personalized Gifts
-
-We respect your privacy. Your email will never be shared.
-
-If you didn't sign up for this or wish to unsubscribe, visit:
-{unsubscribe_url}
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Signup confirmation email sent successfully"
+        return True, f"Signup confirmation email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send signup confirmation: {str(e)}"
@@ -673,8 +326,11 @@ def send_cake_topper_notification(config, cake_topper_data):
         return False, "Email not configured"
 
     try:
+        html_body, text_body = render_email('cake_topper_notification.html', config,
+                                            details=cake_topper_data, now=datetime.now())
+
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = f"New Cake Topper Request: {cake_topper_data['occasion']} - {cake_topper_data['name']}"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = config['NOTIFICATION_RECIPIENTS'][0]  # Primary recipient
@@ -683,170 +339,11 @@ def send_cake_topper_notification(config, cake_topper_data):
         if len(config['NOTIFICATION_RECIPIENTS']) > 1:
             msg['Cc'] = ', '.join(config['NOTIFICATION_RECIPIENTS'][1:])
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #ec4899 0%, #db2777 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9fafb; padding: 20px; border: 1px solid #e5e7eb; }}
-                .field {{ margin-bottom: 15px; }}
-                .label {{ font-weight: bold; color: #ec4899; }}
-                .value {{ margin-top: 5px; padding: 10px; background: white; border-left: 3px solid #ec4899; }}
-                .footer {{ background: #f3f4f6; padding: 15px; text-align: center; font-size: 12px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; padding: 10px 20px; background: #ec4899; color: white !important; text-decoration: none; border-radius: 5px; margin-top: 15px; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2 style="margin: 0;">🎂 New Cake Topper Request</h2>
-                    <p style="margin: 10px 0 0 0; opacity: 0.9;">Snow Spoiled Gifts - 3D Printing Services</p>
-                </div>
-
-                <div class="content">
-                    <div class="field">
-                        <div class="label">Customer Name:</div>
-                        <div class="value">{cake_topper_data['name']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Email:</div>
-                        <div class="value"><a href="mailto:{cake_topper_data['email']}">{cake_topper_data['email']}</a></div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Phone:</div>
-                        <div class="value">{cake_topper_data['phone']}</div>
-                    </div>''' if cake_topper_data.get('phone') else ''}
-
-                    <div class="field">
-                        <div class="label">Occasion/Theme:</div>
-                        <div class="value">{cake_topper_data['occasion']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Event Date:</div>
-                        <div class="value">{cake_topper_data['event_date']}</div>
-                    </div>''' if cake_topper_data.get('event_date') else ''}
-
-                    <div class="field">
-                        <div class="label">Text to Include:</div>
-                        <div class="value">{cake_topper_data['text_to_include']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Design Details:</div>
-                        <div class="value">{cake_topper_data['design_details']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Size Preference:</div>
-                        <div class="value">{cake_topper_data['size_preference']}</div>
-                    </div>''' if cake_topper_data.get('size_preference') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Color Preferences:</div>
-                        <div class="value">{cake_topper_data['color_preferences']}</div>
-                    </div>''' if cake_topper_data.get('color_preferences') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Stand Type:</div>
-                        <div class="value">{cake_topper_data['stand_type']}</div>
-                    </div>''' if cake_topper_data.get('stand_type') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Reference Images:</div>
-                        <div class="value">{cake_topper_data['reference_images']} file(s) uploaded</div>
-                    </div>''' if cake_topper_data.get('reference_images') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Additional Notes:</div>
-                        <div class="value">{cake_topper_data['additional_notes']}</div>
-                    </div>''' if cake_topper_data.get('additional_notes') else ''}
-
-                    <div class="field">
-                        <div class="label">Request Date:</div>
-                        <div class="value">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Customer IP:</div>
-                        <div class="value">{cake_topper_data.get('ip_address', 'N/A')}</div>
-                    </div>
-
-                    <div style="text-align: center; margin-top: 20px;">
-                        <a href="http://192.168.0.248:5000/admin/quotes" class="button">View in Admin Panel</a>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p>This is an automated notification from Snow Spoiled Gifts.</p>
-                    <p>Please respond to the customer within 24-48 hours.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-New Cake Topper Request - Snow Spoiled Gifts
-
-Customer: {cake_topper_data['name']}
-Email: {cake_topper_data['email']}
-Phone: {cake_topper_data.get('phone', 'N/A')}
-
-Occasion: {cake_topper_data['occasion']}
-{f"Event Date: {cake_topper_data['event_date']}" if cake_topper_data.get('event_date') else ''}
-
-Text to Include:
-{cake_topper_data['text_to_include']}
-
-Design Details:
-{cake_topper_data['design_details']}
-
-{f"Size Preference: {cake_topper_data['size_preference']}" if cake_topper_data.get('size_preference') else ''}
-{f"Color Preferences: {cake_topper_data['color_preferences']}" if cake_topper_data.get('color_preferences') else ''}
-{f"Stand Type: {cake_topper_data['stand_type']}" if cake_topper_data.get('stand_type') else ''}
-
-{f"Additional Notes: {cake_topper_data['additional_notes']}" if cake_topper_data.get('additional_notes') else ''}
-
-Request Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-IP Address: {cake_topper_data.get('ip_address', 'N/A')}
-
-View in Admin Panel: http://192.168.0.248:5000/admin/quotes
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
+        # Send email (queued for the outbox worker when it is running)
+        all_recipients = config['NOTIFICATION_RECIPIENTS']
+        status = send_messages(config, [msg], to_addrs=all_recipients)
 
-        return True, "Email notification sent successfully"
+        return True, f"Email notification {status}"
 
     except Exception as e:
         error_msg = f"Failed to send email notification: {str(e)}"
@@ -871,8 +368,11 @@ def send_print_service_notification(config, print_service_data):
         return False, "Email not configured"
 
     try:
+        html_body, text_body = render_email('print_service_notification.html', config,
+                                            details=print_service_data, now=datetime.now())
+
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = f"New 3D Print Service Request - {print_service_data['name']}"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = config['NOTIFICATION_RECIPIENTS'][0]  # Primary recipient
@@ -881,165 +381,18 @@ def send_print_service_notification(config, print_service_data):
         if len(config['NOTIFICATION_RECIPIENTS']) > 1:
             msg['Cc'] = ', '.join(config['NOTIFICATION_RECIPIENTS'][1:])
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #10b981 0%, #059669 100%); color: white; padding: 20px; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9fafb; padding: 20px; border: 1px solid #e5e7eb; }}
-                .field {{ margin-bottom: 15px; }}
-                .label {{ font-weight: bold; color: #10b981; }}
-                .value {{ margin-top: 5px; padding: 10px; background: white; border-left: 3px solid #10b981; }}
-                .footer {{ background: #f3f4f6; padding: 15px; text-align: center; font-size: 12px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .button {{ display: inline-block; padding: 10px 20px; background: #10b981; color: white !important; text-decoration: none; border-radius: 5px; margin-top: 15px; font-weight: bold; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h2 style="margin: 0;">📦 New 3D Print Service Request</h2>
-                    <p style="margin: 10px 0 0 0; opacity: 0.9;">Snow Spoiled Gifts - Print Service</p>
-                </div>
-
-                <div class="content">
-                    <div class="field">
-                        <div class="label">Customer Name:</div>
-                        <div class="value">{print_service_data['name']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Email:</div>
-                        <div class="value"><a href="mailto:{print_service_data['email']}">{print_service_data['email']}</a></div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Uploaded Files:</div>
-                        <div class="value">{print_service_data['uploaded_files']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Material:</div>
-                        <div class="value">{print_service_data['material']}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Color:</div>
-                        <div class="value">{print_service_data['color']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Layer Height:</div>
-                        <div class="value">{print_service_data['layer_height']}</div>
-                    </div>''' if print_service_data.get('layer_height') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Infill Density:</div>
-                        <div class="value">{print_service_data['infill_density']}</div>
-                    </div>''' if print_service_data.get('infill_density') else ''}
-
-                    <div class="field">
-                        <div class="label">Quantity:</div>
-                        <div class="value">{print_service_data['quantity']}</div>
-                    </div>
-
-                    {f'''<div class="field">
-                        <div class="label">Supports:</div>
-                        <div class="value">{print_service_data['supports']}</div>
-                    </div>''' if print_service_data.get('supports') else ''}
-
-                    {f'''<div class="field">
-                        <div class="label">Special Instructions:</div>
-                        <div class="value">{print_service_data['special_instructions']}</div>
-                    </div>''' if print_service_data.get('special_instructions') else ''}
-
-                    <div class="field">
-                        <div class="label">Request Date:</div>
-                        <div class="value">{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</div>
-                    </div>
-
-                    <div class="field">
-                        <div class="label">Customer IP:</div>
-                        <div class="value">{print_service_data.get('ip_address', 'N/A')}</div>
-                    </div>
-
-                    <div style="text-align: center; margin-top: 20px;">
-                        <a href="http://192.168.0.248:5000/admin/quotes" class="button">View in Admin Panel</a>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p>This is an automated notification from Snow Spoiled Gifts.</p>
-                    <p>Files have been uploaded to: static/uploads/print_files/</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-New 3D Print Service Request - Snow Spoiled Gifts
-
-Customer: {print_service_data['name']}
-Email: {print_service_data['email']}
-
-Uploaded Files: {print_service_data['uploaded_files']}
-
-Print Configuration:
--------------------
-Material: {print_service_data['material']}
-Color: {print_service_data['color']}
-{f"Layer Height: {print_service_data['layer_height']}" if print_service_data.get('layer_height') else ''}
-{f"Infill Density: {print_service_data['infill_density']}" if print_service_data.get('infill_density') else ''}
-Quantity: {print_service_data['quantity']}
-{f"Supports: {print_service_data['supports']}" if print_service_data.get('supports') else ''}
-
-{f"Special Instructions: {print_service_data['special_instructions']}" if print_service_data.get('special_instructions') else ''}
-
-Request Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-IP Address: {print_service_data.get('ip_address', 'N/A')}
-
-Files location: static/uploads/print_files/
-
-View in Admin Panel: http://192.168.0.248:5000/admin/quotes
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        # Send email (queued for the outbox worker when it is running)
+        all_recipients = config['NOTIFICATION_RECIPIENTS']
+        status = send_messages(config, [msg], to_addrs=all_recipients)
 
-                # Send to all recipients
-                all_recipients = config['NOTIFICATION_RECIPIENTS']
-                server.send_message(msg, to_addrs=all_recipients)
-
-        return True, "Email notification sent successfully"
+        return True, f"Email notification {status}"
 
     except Exception as e:
         error_msg = f"Failed to send email notification: {str(e)}"
         print(error_msg)
         return False, error_msg
 
+
 def send_admin_reply_to_customer(config, to_email, to_name, subject, message_body, attachments=None):
     """
     Send a reply email from admin to customer.
@@ -1061,99 +414,23 @@ def send_admin_reply_to_customer(config, to_email, to_name, subject, message_bod
         return False, "Email not configured"
 
     try:
-        # Create message - use 'mixed' if we have attachments, otherwise 'alternative'
+        html_body, text_body = render_email('admin_reply.html', config, name=to_name, message=message_body)
+
+        # Create message - use 'mixed' if we have attachments, otherwise just the text/HTML body
         if attachments:
             msg = MIMEMultipart('mixed')
+            msg.attach(build_html_email(text_body, html_body))
         else:
-            msg = MIMEMultipart('alternative')
+            msg = build_html_email(text_body, html_body)
 
         msg['Subject'] = subject
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = to_email
         msg['Reply-To'] = config['MAIL_DEFAULT_SENDER']
 
-        # Convert line breaks to HTML
-        html_message_body = message_body.replace('\n', '<br>')
-
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%); color: white; padding: 30px 20px; border-radius: 8px 8px 0 0; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 24px; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 14px; }}
-                .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-                .message-box {{ background: #f9fafb; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2563eb; }}
-                .footer {{ background: #f3f4f6; padding: 20px; text-align: center; font-size: 13px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .footer p {{ margin: 5px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Snow Spoiled Gifts</h1>
-                    <p>Premium 3D Printing & Personalized Gifts</p>
-                </div>
-
-                <div class="content">
-                    <p>Hi <strong>{to_name}</strong>,</p>
-
-                    <div class="message-box">
-                        {html_message_body}
-                    </div>
-
-                    <p style="margin-top: 20px; font-size: 14px; color: #6b7280;">
-                        If you have any questions, feel free to reply to this email.
-                    </p>
-                </div>
-
-                <div class="footer">
-                    <p><strong>Snow Spoiled Gifts</strong></p>
-                    <p>Premium 3D Printing & Personalized Gifts</p>
-                    <p style="margin-top: 15px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['CONTACT_EMAIL']}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version as fallback
-        text_body = f"""
-Hi {to_name},
-
-{message_body}
-
-If you have any questions, feel free to reply to this email.
-
----
-Snow Spoiled Gifts
-Premium 3D Printing & Personalized Gifts
-Contact us: {config['MAIL_DEFAULT_SENDER']}
-        """
-
-        # Create alternative container for text/html parts if we have attachments
-        if attachments:
-            msg_alternative = MIMEMultipart('alternative')
-            msg_alternative.attach(MIMEText(text_body, 'plain'))
-            msg_alternative.attach(MIMEText(html_body, 'html'))
-            msg.attach(msg_alternative)
-        else:
-            # Attach both HTML and plain text versions directly
-            msg.attach(MIMEText(text_body, 'plain'))
-            msg.attach(MIMEText(html_body, 'html'))
-
         # Attach files if provided
         if attachments:
             from email.mime.application import MIMEApplication
-            from email.mime.image import MIMEImage
 
             for attachment in attachments:
                 filename = attachment['filename']
@@ -1172,20 +449,10 @@ Contact us: {config['MAIL_DEFAULT_SENDER']}
                 file_part.add_header('Content-Disposition', 'attachment', filename=filename)
                 msg.attach(file_part)
 
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            # Use SMTP_SSL for port 465
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            # Use SMTP with STARTTLS for port 587
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Email sent successfully"
+        return True, f"Email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send email: {str(e)}"
@@ -1198,9 +465,6 @@ def send_order_confirmation(config, order_data, customer_email, customer_name):
     Send order confirmation emails to both customer and admin.
     """
     try:
-        # Customer Email
-        customer_subject = f"Order Confirmation - {order_data['order_number']}"
-
         shipping_method_text = {
             'pickup': 'Pickup in George - FREE',
             'own_courier': 'Own Courier - FREE',
@@ -1211,217 +475,44 @@ def send_order_confirmation(config, order_data, customer_email, customer_name):
         payment_method = order_data.get('payment_method', 'cash_on_delivery')
         payment_method_text = 'EFT/Bank Transfer' if payment_method == 'eft' else 'Cash on Delivery'
 
-        # Banking details section (only for EFT)
-        banking_details_html = ""
-        banking_details_text = ""
-        if payment_method == 'eft':
-            banking_details_html = f"""
-                    <div class="details" style="background: #fff3cd; border-left: 4px solid #ffc107;">
-                        <h3 style="color: #856404;"><i class="fas fa-university"></i> Banking Details for EFT Payment</h3>
-                        <p style="color: #856404; margin-bottom: 15px;"><strong>Please use the following details to make your payment:</strong></p>
-                        <div class="detail-row">
-                            <span class="detail-label">Bank:</span>
-                            {config.get('BANK_NAME', 'FNB')}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Account Holder:</span>
-                            {config.get('BANK_ACCOUNT_HOLDER', 'Snow Spoiled Gifts')}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Account Number:</span>
-                            <strong>{config.get('BANK_ACCOUNT_NUMBER', '')}</strong>
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Branch Code:</span>
-                            {config.get('BANK_BRANCH_CODE', '250655')}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Account Type:</span>
-                            {config.get('BANK_ACCOUNT_TYPE', 'Cheque Account')}
-                        </div>
-                        <div class="detail-row" style="border-bottom: none;">
-                            <span class="detail-label">Reference:</span>
-                            <strong style="color: #dc3545;">{order_data['order_number']}</strong>
-                        </div>
-                        <p style="margin-top: 15px; padding: 10px; background: white; border-radius: 4px; color: #856404;">
-                            <strong>Important:</strong> Please use your order number <strong>{order_data['order_number']}</strong> as the payment reference.
-                            This helps us identify your payment quickly. Your order will be processed once payment is received.
-                        </p>
-                    </div>
-            """
-            banking_details_text = f"""
-BANKING DETAILS FOR EFT PAYMENT
-================================
-Please use the following details to make your payment:
-
-Bank: {config.get('BANK_NAME', 'FNB')}
-Account Holder: {config.get('BANK_ACCOUNT_HOLDER', 'Snow Spoiled Gifts')}
-Account Number: {config.get('BANK_ACCOUNT_NUMBER', '')}
-Branch Code: {config.get('BANK_BRANCH_CODE', '250655')}
-Account Type: {config.get('BANK_ACCOUNT_TYPE', 'Cheque Account')}
-Reference: {order_data['order_number']}
-
-IMPORTANT: Please use your order number {order_data['order_number']} as the payment reference.
-This helps us identify your payment quickly. Your order will be processed once payment is received.
-            """
-
-        customer_html = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #28a745 0%, #20883b 100%); color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .order-number {{ font-size: 24px; font-weight: bold; color: #28a745; margin: 20px 0; }}
-                .details {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0; }}
-                .detail-row {{ padding: 10px 0; border-bottom: 1px solid #eee; }}
-                .detail-label {{ font-weight: bold; display: inline-block; width: 150px; }}
-                .total {{ font-size: 20px; font-weight: bold; color: #28a745; text-align: right; padding-top: 20px; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>✓ Order Confirmed!</h1>
-                    <p>Thank you for your order</p>
-                </div>
-                <div class="content">
-                    <p>Hi {customer_name},</p>
-                    <p>Your order has been successfully placed!</p>
-
-                    <div class="order-number">Order Number: {order_data['order_number']}</div>
-
-                    <div class="details">
-                        <h3>Order Details</h3>
-                        <div class="detail-row">
-                            <span class="detail-label">Order Date:</span>
-                            {order_data.get('created_date', datetime.now().strftime('%Y-%m-%d %H:%M'))}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Payment Method:</span>
-                            {payment_method_text}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Shipping Method:</span>
-                            {shipping_method_text}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Subtotal:</span>
-                            R{order_data['subtotal']:.2f}
-                        </div>
-                        <div class="detail-row">
-                            <span class="detail-label">Shipping:</span>
-                            R{order_data.get('shipping_cost', 0):.2f}
-                        </div>
-                        <div class="total">
-                            Total: R{order_data['total_amount']:.2f}
-                        </div>
-                    </div>
-
-                    {banking_details_html}
-
-                    <h3>What's Next?</h3>
-                    <ul>
-                        <li>{'Make your EFT payment using the banking details above' if payment_method == 'eft' else 'We will review your order and contact you shortly'}</li>
-                        <li>{'We will process your order once payment is received' if payment_method == 'eft' else 'Payment will be collected on delivery'}</li>
-                        <li>Track your order status in "My Account" on our website</li>
-                    </ul>
-
-                    <p>If you have any questions, feel free to reply to this email.</p>
-
-                    <p>Thank you for shopping with Snow Spoiled Gifts!</p>
-                </div>
-                <div class="footer">
-                    <p><strong>Snow Spoiled Gifts</strong></p>
-                    <p style="margin-top: 10px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: info@snowspoiledgifts.co.za
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">This is an automated email, please do not reply directly to this message.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        customer_text = f"""
-ORDER CONFIRMED!
-
-Hi {customer_name},
-
-Your order has been successfully placed!
-
-Order Number: {order_data['order_number']}
-Order Date: {order_data.get('created_date', datetime.now().strftime('%Y-%m-%d %H:%M'))}
-Payment Method: {payment_method_text}
-Shipping Method: {shipping_method_text}
-
-Subtotal: R{order_data['subtotal']:.2f}
-Shipping: R{order_data.get('shipping_cost', 0):.2f}
-Total: R{order_data['total_amount']:.2f}
-
-{banking_details_text}
-What's Next?
-- {'Make your EFT payment using the banking details above' if payment_method == 'eft' else 'We will review your order and contact you shortly'}
-- {'We will process your order once payment is received' if payment_method == 'eft' else 'Payment will be collected on delivery'}
-- Track your order status in "My Account" on our website
-
-Thank you for shopping with Snow Spoiled Gifts!
-
----
-Snow Spoiled Gifts
-Email: info@snowspoiledgifts.co.za
-        """
+        # Banking details (shown for EFT only)
+        bank = {
+            'name': config.get('BANK_NAME', 'FNB'),
+            'account_holder': config.get('BANK_ACCOUNT_HOLDER', 'Snow Spoiled Gifts'),
+            'account_number': config.get('BANK_ACCOUNT_NUMBER', ''),
+            'branch_code': config.get('BANK_BRANCH_CODE', '250655'),
+            'account_type': config.get('BANK_ACCOUNT_TYPE', 'Cheque Account'),
+        }
+
+        context = {
+            'order': order_data,
+            'order_date': order_data.get('created_date', datetime.now().strftime('%Y-%m-%d %H:%M')),
+            'customer_name': customer_name,
+            'customer_email': customer_email,
+            'payment_method': payment_method,
+            'payment_method_text': payment_method_text,
+            'shipping_method_text': shipping_method_text,
+            'bank': bank,
+        }
 
         # Send to customer
-        msg_customer = MIMEMultipart('alternative')
-        msg_customer['Subject'] = customer_subject
+        customer_html, customer_text = render_email('order_confirmation.html', config, **context)
+        msg_customer = build_html_email(customer_text, customer_html)
+        msg_customer['Subject'] = f"Order Confirmation - {order_data['order_number']}"
         msg_customer['From'] = config['MAIL_DEFAULT_SENDER']
         msg_customer['To'] = customer_email
 
-        part1 = MIMEText(customer_text, 'plain')
-        part2 = MIMEText(customer_html, 'html')
-        msg_customer.attach(part1)
-        msg_customer.attach(part2)
-
         # Admin notification email
-        admin_subject = f"New Order Received - {order_data['order_number']}"
-        admin_body = f"""
-New order received!
-
-Order Number: {order_data['order_number']}
-Customer: {customer_name} ({customer_email})
-Order Date: {order_data.get('created_date', datetime.now().strftime('%Y-%m-%d %H:%M'))}
-
-Shipping Method: {shipping_method_text}
-Total Amount: R{order_data['total_amount']:.2f}
-
-Please log in to the admin panel to view full order details.
-        """
-
-        msg_admin = MIMEMultipart('alternative')
-        msg_admin['Subject'] = admin_subject
+        admin_html, admin_text = render_email('order_admin_notification.html', config, **context)
+        msg_admin = build_html_email(admin_text, admin_html)
+        msg_admin['Subject'] = f"New Order Received - {order_data['order_number']}"
         msg_admin['From'] = config['MAIL_DEFAULT_SENDER']
         msg_admin['To'] = config['ADMIN_EMAIL']
-        msg_admin.attach(MIMEText(admin_body, 'plain'))
-
-        # Send emails
-        if config.get('MAIL_USE_SSL'):
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg_customer)
-                server.send_message(msg_admin)
-        else:
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg_customer)
-                server.send_message(msg_admin)
 
-        return True, "Order confirmation emails sent successfully"
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg_customer, msg_admin])
+
+        return True, f"Order confirmation emails {status}"
 
     except Exception as e:
         error_msg = f"Failed to send order confirmation: {str(e)}"
@@ -1524,199 +615,21 @@ def send_order_status_update(config, customer_email, order_number, new_status, c
 
         status_data = status_info.get(new_status, status_info['pending'])
 
-        # Build context-aware "What's Next" section for shipped status
-        whats_next_html = ''
-        whats_next_text = ''
-
-        if new_status == 'shipped':
-            if shipping_method == 'pickup':
-                whats_next_html = '''
-                    <h3>Pickup Details</h3>
-                    <div class="message-box" style="background: #f0fdf4; border-left-color: #10b981;">
-                        <p><strong>📍 Pickup Location:</strong><br>
-                        George, Western Cape<br>
-                        (We'll send you the exact address separately)</p>
-                        <p><strong>🕒 Pickup Hours:</strong><br>
-                        Monday - Friday: 9:00 AM - 5:00 PM<br>
-                        Saturday: 9:00 AM - 1:00 PM</p>
-                        <p><strong>📋 What to Bring:</strong><br>
-                        • This email or your order number<br>
-                        • Valid ID</p>
-                    </div>
-                '''
-                whats_next_text = '''
-Pickup Details:
-📍 Location: George, Western Cape (exact address sent separately)
-🕒 Hours: Monday-Friday 9AM-5PM, Saturday 9AM-1PM
-📋 What to Bring: This email or order number, Valid ID
-                '''
-            elif shipping_method == 'own_courier':
-                whats_next_html = '''
-                    <h3>Collection Details</h3>
-                    <div class="message-box" style="background: #eff6ff; border-left-color: #0ea5e9;">
-                        <p><strong>📍 Collection Address:</strong><br>
-                        George, Western Cape<br>
-                        (We'll send you the exact address separately)</p>
-                        <p><strong>🕒 Collection Hours:</strong><br>
-                        Monday - Friday: 9:00 AM - 5:00 PM</p>
-                        <p><strong>📦 Important:</strong><br>
-                        Please arrange collection at your earliest convenience. Your order is packed and ready!</p>
-                    </div>
-                '''
-                whats_next_text = '''
-Collection Details:
-📍 Address: George, Western Cape (exact address sent separately)
-🕒 Hours: Monday-Friday 9AM-5PM
-📦 Please arrange collection at your earliest convenience
-                '''
-            else:  # pudo or standard shipping
-                whats_next_html = '''
-                    <h3>Delivery Information</h3>
-                    <div class="message-box" style="background: #eff6ff; border-left-color: #0ea5e9;">
-                        <p>Your order is on its way! You can track your order status anytime in "My Account" on our website.</p>
-                        <p>If you selected PUDO delivery, you'll receive a notification when your parcel arrives at your selected locker or kiosk.</p>
-                    </div>
-                '''
-                whats_next_text = '''
-Delivery Information:
-Your order is on its way! Track it anytime in "My Account" on our website.
-PUDO customers will receive a notification when the parcel arrives.
-                '''
-        elif new_status == 'processing':
-            if shipping_method == 'pickup':
-                whats_next_html = '<li>We\'ll notify you when your order is ready for pickup.</li>'
-                whats_next_text = '- We\'ll notify you when your order is ready for pickup.'
-            elif shipping_method == 'own_courier':
-                whats_next_html = '<li>We\'ll notify you when your order is ready for courier collection.</li>'
-                whats_next_text = '- We\'ll notify you when your order is ready for courier collection.'
-            else:
-                whats_next_html = '<li>We\'ll notify you when your order has been shipped.</li>'
-                whats_next_text = '- We\'ll notify you when your order has been shipped.'
+        html_body, text_body = render_email('order_status_update.html', config,
+                                            status=status_data, new_status=new_status,
+                                            shipping_method=shipping_method,
+                                            customer_name=customer_name, order_number=order_number)
 
         # Create message
-        msg = MIMEMultipart('alternative')
+        msg = build_html_email(text_body, html_body)
         msg['Subject'] = f"{status_data['title']} - Order {order_number}"
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = customer_email
 
-        # Build the "What's Next" section for non-shipped statuses
-        if not whats_next_html:
-            whats_next_items = []
-            if new_status == 'confirmed':
-                whats_next_items.append('<li>We will contact you with payment details shortly.</li>')
-            if new_status == 'delivered':
-                whats_next_items.append('<li>If you have any questions or concerns, please contact us.</li>')
-            if new_status == 'processing':
-                # Already set above based on shipping method
-                pass
-            whats_next_items.append('<li>Track your order status anytime in "My Account" on our website.</li>')
-            whats_next_html = f"<h3>What's Next?</h3><ul>{''.join(whats_next_items)}</ul>"
-
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, {status_data['color']} 0%, {status_data['color']}dd 100%);
-                          color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .status-badge {{ background: {status_data['color']}; color: white; padding: 10px 20px;
-                               border-radius: 20px; display: inline-block; margin: 20px 0; font-weight: bold; }}
-                .order-number {{ font-size: 20px; font-weight: bold; color: {status_data['color']}; margin: 20px 0; }}
-                .message-box {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0;
-                              border-left: 4px solid {status_data['color']}; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>{status_data['icon']} {status_data['title']}</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {customer_name},</p>
-
-                    <div class="order-number">Order: {order_number}</div>
-
-                    <div class="status-badge">{new_status.replace('_', ' ').upper()}</div>
-
-                    <div class="message-box">
-                        <p>{status_data['message']}</p>
-                    </div>
-
-                    {whats_next_html}
-
-                    <p>Thank you for choosing Snow Spoiled Gifts!</p>
-                </div>
-                <div class="footer">
-                    <p><strong>Snow Spoiled Gifts</strong></p>
-                    <p style="margin-top: 10px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: info@snowspoiledgifts.co.za
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">This is an automated notification.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Build text version "What's Next"
-        if not whats_next_text:
-            text_items = []
-            if new_status == 'confirmed':
-                text_items.append('- We will contact you with payment details shortly.')
-            if new_status == 'delivered':
-                text_items.append('- If you have any questions or concerns, please contact us.')
-            if new_status == 'processing':
-                # Already set above
-                pass
-            text_items.append('- Track your order status anytime in "My Account" on our website.')
-            whats_next_text = "What's Next?\n" + '\n'.join(text_items)
-
-        # Create plain text version as fallback
-        text_body = f"""
-{status_data['title'].upper()}
-
-Hi {customer_name},
-
-Order: {order_number}
-Status: {new_status.replace('_', ' ').upper()}
-
-{status_data['message']}
-
-{whats_next_text}
-
-Thank you for choosing Snow Spoiled Gifts!
-
----
-Snow Spoiled Gifts
-Email: info@snowspoiledgifts.co.za
-        """
-
-        # Attach both HTML and plain text versions
-        part1 = MIMEText(text_body, 'plain')
-        part2 = MIMEText(html_body, 'html')
-        msg.attach(part1)
-        msg.attach(part2)
-
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Status update email sent successfully"
+        return True, f"Status update email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send status update email: {str(e)}"
@@ -1746,140 +659,25 @@ def send_quote_converted_notification(config, customer_email, customer_name, ite
         return False, "Email not configured"
 
     try:
-        msg = MIMEMultipart('alternative')
-
         if user_created and temp_password:
-            msg['Subject'] = f"Your Quote is Ready + Account Created - {config['SITE_NAME']}"
+            subject = f"Your Quote is Ready + Account Created - {config['SITE_NAME']}"
         else:
-            msg['Subject'] = f"Your Quote is Ready for Checkout - {config['SITE_NAME']}"
+            subject = f"Your Quote is Ready for Checkout - {config['SITE_NAME']}"
 
+        html_body, text_body = render_email('quote_converted.html', config, **_logo_context(),
+                                            customer_name=customer_name, customer_email=customer_email,
+                                            item_name=item_name, item_price=item_price,
+                                            user_created=user_created, temp_password=temp_password)
+
+        msg = build_html_email(text_body, html_body)
+        msg['Subject'] = subject
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = customer_email
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #10b981 0%, #059669 100%);
-                          color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .item-box {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0;
-                           border-left: 4px solid #10b981; }}
-                .price-tag {{ font-size: 24px; font-weight: bold; color: #10b981; }}
-                .credentials-box {{ background: #fef3c7; border: 2px solid #f59e0b; padding: 20px;
-                                   border-radius: 8px; margin: 20px 0; }}
-                .button {{ background: #10b981; color: white; padding: 15px 30px; text-decoration: none;
-                         border-radius: 5px; display: inline-block; margin: 20px 0; font-weight: bold; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                {add_email_logo_header(config)}
-                <div class="header" style="margin-top: 0; border-radius: 0;">
-                    <h1>🎉 Your Quote is Ready!</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {customer_name},</p>
-
-                    <p>Great news! We've reviewed your quote request and added it to your cart:</p>
-
-                    <div class="item-box">
-                        <h3>{item_name}</h3>
-                        <div class="price-tag">R{item_price:.2f}</div>
-                    </div>
-
-                    {f'''
-                    <div class="credentials-box">
-                        <h3>⚠️ New Account Created</h3>
-                        <p>We've created an account for you to complete your order:</p>
-                        <p><strong>Email:</strong> {customer_email}<br>
-                        <strong>Temporary Password:</strong> {temp_password}</p>
-                        <p style="font-size: 12px; color: #666;">
-                            <em>Please change your password after logging in from "My Account".</em>
-                        </p>
-                    </div>
-                    ''' if user_created and temp_password else ''}
-
-                    <p><strong>Next Steps:</strong></p>
-                    <ol>
-                        <li>{'Log in with your credentials above' if user_created else 'Log in to your account'}</li>
-                        <li>Review the item in your cart</li>
-                        <li>Choose your shipping method</li>
-                        <li>Complete checkout</li>
-                    </ol>
-
-                    <center>
-                        <a href="{config['SITE_URL']}/cart" class="button">View My Cart</a>
-                    </center>
-
-                    <p>If you have any questions about your quote or need adjustments, please reply to this email.</p>
-
-                    <p>Thank you for choosing {config['SITE_NAME']}!</p>
-                </div>
-                <div class="footer">
-                    <p><strong>{config['SITE_NAME']}</strong></p>
-                    <p style="margin-top: 10px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['MAIL_DEFAULT_SENDER']}
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">This is an automated notification.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version
-        text_body = f"""
-Your Quote is Ready!
-
-Hi {customer_name},
-
-Great news! We've reviewed your quote request and added it to your cart:
-
-Item: {item_name}
-Price: R{item_price:.2f}
-
-{"NEW ACCOUNT CREATED" if user_created else ""}
-{"Email: " + customer_email if user_created else ""}
-{"Temporary Password: " + temp_password if user_created and temp_password else ""}
-{"Please change your password after logging in." if user_created else ""}
-
-Next Steps:
-1. {"Log in with your credentials above" if user_created else "Log in to your account"}
-2. Review the item in your cart
-3. Choose your shipping method
-4. Complete checkout
-
-Visit: {config['SITE_URL']}/cart
-
-If you have any questions, please reply to this email.
-
-Thank you for choosing {config['SITE_NAME']}!
-        """
-
-        msg.attach(MIMEText(text_body, 'plain'))
-        msg.attach(MIMEText(html_body, 'html'))
-
-        # Send email
-        if config.get('MAIL_USE_SSL'):
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Quote conversion email sent successfully"
+        return True, f"Quote conversion email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send quote conversion email: {str(e)}"
@@ -1912,97 +710,12 @@ def send_invoice_email(config, customer_email, customer_name, order_number, invo
         msg['From'] = config['MAIL_DEFAULT_SENDER']
         msg['To'] = customer_email
 
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-                          color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .invoice-box {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0;
-                              border-left: 4px solid #2563eb; }}
-                .button {{ background: #2563eb; color: white; padding: 15px 30px; text-decoration: none;
-                         border-radius: 5px; display: inline-block; margin: 20px 0; font-weight: bold; }}
-                .footer {{ text-align: center; margin-top: 30px; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                {add_email_logo_header(config)}
-                <div class="header" style="margin-top: 0; border-radius: 0;">
-                    <h1>📄 Your Invoice</h1>
-                </div>
-                <div class="content">
-                    <p>Hi {customer_name},</p>
-
-                    <p>Thank you for your order! Please find your invoice attached to this email.</p>
-
-                    <div class="invoice-box">
-                        <h3>Invoice Details</h3>
-                        <p><strong>Invoice Number:</strong> {invoice_number}<br>
-                        <strong>Order Number:</strong> {order_number}<br>
-                        <strong>Date:</strong> {datetime.now().strftime('%d %B %Y')}</p>
-                    </div>
-
-                    <p><strong>Payment Instructions:</strong></p>
-                    <ul>
-                        <li>Please review the attached invoice for the total amount due</li>
-                        <li>Payment methods and details are included in the invoice</li>
-                        <li>Once payment is received, we will update your order status</li>
-                    </ul>
-
-                    <p>If you have any questions about this invoice, please don't hesitate to contact us.</p>
-
-                    <p>Thank you for your business!</p>
-                </div>
-                <div class="footer">
-                    <p><strong>{config['SITE_NAME']}</strong></p>
-                    <p style="margin-top: 10px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['MAIL_DEFAULT_SENDER']}
-                    </p>
-                    <p style="margin-top: 10px; font-size: 11px; color: #9ca3af;">This is an automated notification.</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version
-        text_body = f"""
-Your Invoice - {invoice_number}
-
-Hi {customer_name},
-
-Thank you for your order! Please find your invoice attached to this email.
-
-Invoice Details:
-- Invoice Number: {invoice_number}
-- Order Number: {order_number}
-- Date: {datetime.now().strftime('%d %B %Y')}
-
-Payment Instructions:
-- Please review the attached invoice for the total amount due
-- Payment methods and details are included in the invoice
-- Once payment is received, we will update your order status
-
-If you have any questions about this invoice, please contact us.
-
-Thank you for your business!
-
-{config['SITE_NAME']}
-{config['MAIL_DEFAULT_SENDER']}
-        """
+        html_body, text_body = render_email('invoice.html', config, **_logo_context(),
+                                            customer_name=customer_name, order_number=order_number,
+                                            invoice_number=invoice_number, now=datetime.now())
 
-        # Attach text and HTML parts
-        msg.attach(MIMEText(text_body, 'plain'))
-        msg.attach(MIMEText(html_body, 'html'))
+        # Attach text and HTML parts (with the logo)
+        msg.attach(build_html_email(text_body, html_body))
 
         # Attach PDF invoice
         if os.path.exists(invoice_path):
@@ -2014,18 +727,10 @@ Thank you for your business!
         else:
             return False, "Invoice PDF file not found"
 
-        # Send email
-        if config.get('MAIL_USE_SSL'):
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        return True, "Invoice email sent successfully"
+        return True, f"Invoice email {status}"
 
     except Exception as e:
         error_msg = f"Failed to send invoice email: {str(e)}"
@@ -2033,6 +738,52 @@ Thank you for your business!
         return False, error_msg
 
 
+def render_bulk_email_templates(config, message_body, interest_filter=None, include_logo=True):
+    """
+    Prepare the bulk email template once per campaign.
+
+    Recipients are rendered from it by build_bulk_email().
+
+    Returns:
+        EmailBatch for templates/emails/bulk.html
+    """
+    if interest_filter in (None, 'all'):
+        interest_text = 'all product categories'
+    else:
+        interest_text = INTEREST_LABELS.get(interest_filter, 'our products and services')
+
+    return EmailBatch('bulk.html', site_context(config), message=message_body,
+                      interest_text=interest_text, logo_cid=LOGO_CID,
+                      include_logo=include_logo and _email_asset('logo') is not None)
+
+
+def build_bulk_email(config, subject, templates, email, name, unsubscribe_token):
+    """
+    Build one personalized bulk email message.
+
+    Args:
+        config: Flask app config object
+        subject: Email subject line
+        templates: EmailBatch returned by render_bulk_email_templates()
+        email, name, unsubscribe_token: The recipient
+
+    Returns:
+        MIME message
+    """
+    # Build unsubscribe URL
+    unsubscribe_url = f"{config.get('BASE_URL', 'http://192.168.0.248:5000')}/unsubscribe?token={unsubscribe_token}"
+
+    html_body, text_body = templates.render(name=name, unsubscribe_url=unsubscribe_url)
+
+    # Create message (text and HTML versions, plus the logo if the header uses it)
+    msg = build_html_email(text_body, html_body)
+    msg['Subject'] = subject
+    msg['From'] = config['MAIL_DEFAULT_SENDER']
+    msg['To'] = email
+
+    return msg
+
+
 def send_bulk_email(config, recipients, subject, message_body, interest_filter=None, include_logo=True):
     """
     Send bulk email to multiple recipients (BCC for privacy).
@@ -2059,136 +810,19 @@ def send_bulk_email(config, recipients, subject, message_body, interest_filter=N
     failed_count = 0
     errors = []
 
-    # Map interest filter to readable text
-    interest_labels = {
-        '3d_printing': '3D Printing',
-        'sublimation': 'Sublimation',
-        'vinyl': 'Vinyl',
-        'giftboxes': 'Giftboxes',
-        'candles_soaps': 'Candles and Soaps',
-        None: 'all product categories',
-        'all': 'all product categories'
-    }
-    interest_text = interest_labels.get(interest_filter, 'our products and services')
-
     try:
-        # Convert line breaks to HTML
-        html_message_body = message_body.replace('\n', '<br>')
-
-        # Create HTML email template (no logo for now)
-        html_template = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-                          color: white; padding: 30px 20px; border-radius: 8px 8px 0 0; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .header p {{ margin: 10px 0 0 0; opacity: 0.9; font-size: 16px; }}
-                .content {{ background: #ffffff; padding: 30px; border: 1px solid #e5e7eb; }}
-                .message-box {{ background: #f9fafb; padding: 20px; border-radius: 8px; margin: 20px 0; border-left: 4px solid #2563eb; }}
-                .footer {{ background: #f3f4f6; padding: 20px; text-align: center; font-size: 13px; color: #6b7280; border-radius: 0 0 8px 8px; }}
-                .footer p {{ margin: 5px 0; }}
-                .unsubscribe {{ margin-top: 15px; padding-top: 15px; border-top: 1px solid #e5e7eb; font-size: 11px; color: #9ca3af; }}
-                .unsubscribe a {{ color: #6b7280; text-decoration: none; }}
-                .unsubscribe a:hover {{ text-decoration: underline; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>🎁 {config.get('SITE_NAME', 'Snow Spoiled Gifts')}</h1>
-                    <p>{config.get('TAGLINE', 'Premium 3D Printing & Personalized Gifts')}</p>
-                </div>
-                <div class="content">
-                    <p>Hi <strong>RECIPIENT_NAME</strong>,</p>
-
-                    <div class="message-box">
-                        {html_message_body}
-                    </div>
-
-                    <p style="margin-top: 20px; font-size: 14px; color: #6b7280;">
-                        🎁 Thank you for being a valued subscriber!
-                    </p>
-
-                    <div class="unsubscribe">
-                        <p style="margin: 0 0 8px 0;">
-                            You are receiving this email because you subscribed to receive updates on <strong>{interest_text}</strong> from {config.get('SITE_NAME', 'Snow Spoiled Gifts')}.
-                        </p>
-                        <p style="margin: 0;">
-                            If you wish to unsubscribe from these notifications,
-                            <a href="UNSUBSCRIBE_URL">click here to unsubscribe</a>.
-                        </p>
-                    </div>
-                </div>
-
-                <div class="footer">
-                    <p><strong>{config.get('SITE_NAME', 'Snow Spoiled Gifts')}</strong></p>
-                    <p>Premium 3D Printing & Personalized Gifts</p>
-                    <p style="margin-top: 15px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['MAIL_DEFAULT_SENDER']}
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Plain text template
-        text_template = f"""
-Hi RECIPIENT_NAME,
-
-{message_body}
-
-Thank you for being a valued subscriber!
-
----
-
-You are receiving this email because you subscribed to receive updates on {interest_text} from {config.get('SITE_NAME', 'Snow Spoiled Gifts')}.
-
-If you wish to unsubscribe, visit: UNSUBSCRIBE_URL
-
----
-{config.get('SITE_NAME', 'Snow Spoiled Gifts')}
-Premium 3D Printing & Personalized Gifts
-Contact us: {config['MAIL_DEFAULT_SENDER']}
-        """
-
-        # Connect to SMTP server once for all emails
-        if config.get('MAIL_USE_SSL'):
-            server = smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT'])
-        else:
-            server = smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT'])
-            server.starttls()
+        templates = render_bulk_email_templates(config, message_body, interest_filter, include_logo)
 
-        server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
+        # Reuse pooled SMTP connections for all emails
+        smtp_pool = get_smtp_pool(config)
 
         # Send individual emails (personalized)
         for email, name, unsubscribe_token in recipients:
             try:
-                # Build unsubscribe URL
-                unsubscribe_url = f"{config.get('BASE_URL', 'http://192.168.0.248:5000')}/unsubscribe?token={unsubscribe_token}"
-
-                # Personalize message
-                personalized_html = html_template.replace('RECIPIENT_NAME', name).replace('UNSUBSCRIBE_URL', unsubscribe_url)
-                personalized_text = text_template.replace('RECIPIENT_NAME', name).replace('UNSUBSCRIBE_URL', unsubscribe_url)
-
-                # Create message
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = config['MAIL_DEFAULT_SENDER']
-                msg['To'] = email
-
-                # Attach text and HTML versions
-                msg.attach(MIMEText(personalized_text, 'plain'))
-                msg.attach(MIMEText(personalized_html, 'html'))
+                msg = build_bulk_email(config, subject, templates, email, name, unsubscribe_token)
 
                 # Send
-                server.send_message(msg)
+                smtp_pool.send([msg])
                 success_count += 1
 
             except Exception as e:
@@ -2196,8 +830,6 @@ Contact us: {config['MAIL_DEFAULT_SENDER']}
                 errors.append(f"{email}: {str(e)}")
                 print(f"Failed to send to {email}: {str(e)}")
 
-        server.quit()
-
         if failed_count > 0:
             error_summary = "\n".join(errors[:5])  # Show first 5 errors
             return success_count, failed_count, f"Sent {success_count}, failed {failed_count}. Errors: {error_summary}"
@@ -2255,194 +887,15 @@ def send_quote_to_customer(config, quote_data):
         msg_alternative = MIMEMultipart('alternative')
         msg.attach(msg_alternative)
 
-        # Admin message section (if provided)
-        admin_message_html = ""
-        admin_message_text = ""
-        if admin_message and admin_message.strip():
-            admin_message_html = f"""
-                    <div style="background: #f3f4f6; padding: 20px; border-radius: 8px;
-                                margin: 20px 0; border-left: 4px solid #2563eb;">
-                        <h3 style="color: #2563eb; margin-top: 0;">
-                            <i class="fas fa-comment"></i> Message from Our Team
-                        </h3>
-                        <p style="color: #333; white-space: pre-wrap; margin-bottom: 0;">
-                            {admin_message}
-                        </p>
-                    </div>
-            """
-            admin_message_text = f"""
-MESSAGE FROM OUR TEAM
-====================
-{admin_message}
-
-"""
-
-        # Attached image section (if provided)
-        image_html = ""
-        image_text = ""
-        image_cid = None
-        if attached_image:
-            image_cid = "attached_image"
-            image_html = f"""
-                    <div style="margin: 20px 0; text-align: center;">
-                        <h3 style="color: #2563eb;">Reference Image</h3>
-                        <img src="cid:{image_cid}" alt="Reference"
-                             style="max-width: 100%; height: auto; border: 2px solid #e5e7eb;
-                                    border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1);">
-                    </div>
-            """
-            image_text = "\n[Reference image attached]\n"
-
-        # Create HTML email body
-        html_body = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #2563eb 0%, #1d4ed8 100%);
-                          color: white; padding: 30px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .header h1 {{ margin: 0; font-size: 28px; }}
-                .content {{ background: #f9f9f9; padding: 30px; border-radius: 0 0 8px 8px; }}
-                .pricing-table {{ background: white; border-radius: 8px; overflow: hidden;
-                                margin: 20px 0; box-shadow: 0 2px 8px rgba(0,0,0,0.1); }}
-                .pricing-row {{ display: table; width: 100%; border-bottom: 1px solid #e5e7eb; }}
-                .pricing-row:last-child {{ border-bottom: none; }}
-                .pricing-label {{ display: table-cell; padding: 15px 20px; font-weight: 600;
-                                 color: #4b5563; width: 50%; }}
-                .pricing-value {{ display: table-cell; padding: 15px 20px; text-align: right;
-                                 color: #111827; }}
-                .total-row {{ background: #f0f9ff; }}
-                .total-row .pricing-label {{ color: #1e40af; font-size: 18px; }}
-                .total-row .pricing-value {{ color: #1e40af; font-size: 24px; font-weight: bold; }}
-                .button {{ display: inline-block; background: #2563eb; color: white !important;
-                         padding: 15px 30px; text-decoration: none; border-radius: 5px;
-                         margin: 20px 0; font-weight: bold; }}
-                .button:hover {{ background: #1d4ed8; }}
-                .footer {{ text-align: center; margin-top: 30px; padding-top: 20px;
-                          border-top: 1px solid #e5e7eb; color: #666; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                {add_email_logo_header(config)}
-                <div class="header" style="margin-top: 0; border-radius: 0;">
-                    <h1>Your Quote is Ready!</h1>
-                    <p style="margin: 10px 0 0 0; opacity: 0.9;">
-                        We've prepared a custom quote for you
-                    </p>
-                </div>
-                <div class="content">
-                    <p>Hi {customer_name},</p>
-
-                    <p>Thank you for your interest in our services! We're pleased to provide you
-                    with the following quote:</p>
-
-                    <div class="pricing-table">
-                        <div class="pricing-row">
-                            <div class="pricing-label">Item</div>
-                            <div class="pricing-value">{quote_type}</div>
-                        </div>
-                        <div class="pricing-row">
-                            <div class="pricing-label">Price per Item</div>
-                            <div class="pricing-value">R{price_per_item:.2f}</div>
-                        </div>
-                        <div class="pricing-row">
-                            <div class="pricing-label">Quantity</div>
-                            <div class="pricing-value">{quantity}</div>
-                        </div>
-                        <div class="pricing-row total-row">
-                            <div class="pricing-label">Total Quote</div>
-                            <div class="pricing-value">R{total_price:.2f}</div>
-                        </div>
-                    </div>
-
-                    {admin_message_html}
-
-                    {image_html}
-
-                    <h3 style="color: #2563eb;">Next Steps</h3>
-                    <ol style="color: #4b5563;">
-                        <li>Review the quote details above</li>
-                        <li>If you have questions, reply to this email</li>
-                        <li>Ready to proceed? Log in to view your quote and place your order</li>
-                    </ol>
-
-                    <center>
-                        <a href="https://{config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}/orders-quotes"
-                           class="button">
-                            View Your Quote
-                        </a>
-                    </center>
-
-                    <p style="margin-top: 30px;">This quote is valid for 30 days from the date of this email.
-                    Prices are subject to material availability and may change after this period.</p>
-
-                    <p>We look forward to working with you!</p>
-
-                    <p>Best regards,<br>
-                    The {config.get('SITE_NAME', 'Snow Spoiled Gifts')} Team</p>
-                </div>
-                <div class="footer">
-                    <p><strong>{config.get('SITE_NAME', 'Snow Spoiled Gifts')}</strong></p>
-                    <p style="margin-top: 10px;">
-                        <strong>Contact Us:</strong><br>
-                        WhatsApp: {config.get('WHATSAPP_CONTACT_NUMBER', '+27 82 675 4285')}<br>
-                        Email: {config['MAIL_DEFAULT_SENDER']}<br>
-                        Phone: {config.get('CONTACT_PHONE', '')}<br>
-                        <a href="https://{config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}"
-                           style="color: #2563eb;">
-                            {config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}
-                        </a>
-                    </p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-
-        # Create plain text version
-        text_body = f"""
-YOUR QUOTE IS READY!
-
-Hi {customer_name},
-
-Thank you for your interest in our services! We're pleased to provide you with the following quote:
-
-QUOTE DETAILS
-=============
-Item: {quote_type}
-Price per Item: R{price_per_item:.2f}
-Quantity: {quantity}
----------------------------------
-TOTAL QUOTE: R{total_price:.2f}
-=============
-
-{admin_message_text}
-{image_text}
-NEXT STEPS
-----------
-1. Review the quote details above
-2. If you have questions, reply to this email
-3. Ready to proceed? Log in to view your quote and place your order
-
-Visit: https://{config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}/orders-quotes
-
-This quote is valid for 30 days from the date of this email.
-Prices are subject to material availability and may change after this period.
-
-We look forward to working with you!
-
-Best regards,
-The {config.get('SITE_NAME', 'Snow Spoiled Gifts')} Team
-
----
-{config.get('SITE_NAME', 'Snow Spoiled Gifts')}
-Email: {config['MAIL_DEFAULT_SENDER']}
-Phone: {config.get('CONTACT_PHONE', '')}
-Web: {config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}
-        """
+        # Attached image (shown inline, see below)
+        image_cid = "attached_image" if attached_image else None
+
+        html_body, text_body = render_email('quote_to_customer.html', config, **_logo_context(),
+                                            customer_name=customer_name, quote_type=quote_type,
+                                            price_per_item=price_per_item, quantity=quantity,
+                                            total_price=total_price,
+                                            admin_message=(admin_message or '').strip(),
+                                            image_cid=image_cid)
 
         # Attach text and HTML parts
         msg_alternative.attach(MIMEText(text_body, 'plain'))
@@ -2484,18 +937,15 @@ Web: {config.get('SITE_URL', 'www.snowspoiledgifts.co.za')}
             except Exception as e:
                 print(f"Warning: Could not attach image {attached_image}: {str(e)}")
 
-        # Send email using SSL or TLS
-        if config.get('MAIL_USE_SSL'):
-            with smtplib.SMTP_SSL(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
-        else:
-            with smtplib.SMTP(config['MAIL_SERVER'], config['MAIL_PORT']) as server:
-                server.starttls()
-                server.login(config['MAIL_USERNAME'], config['MAIL_PASSWORD'])
-                server.send_message(msg)
+        # Logo used by the header
+        logo = get_email_asset('logo')
+        if logo is not None:
+            msg.attach(logo)
+
+        # Send email (queued for the outbox worker when it is running)
+        status = send_messages(config, [msg])
 
-        success_msg = f"Quote email sent successfully to {customer_email}"
+        success_msg = f"Quote email {status} for {customer_email}"
         print(success_msg)
         return True, success_msg
 
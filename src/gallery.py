@@ -0,0 +1,170 @@
+"""
+Cached manifest of the 3D printing gallery folders.
+
+The /3d-printing carousels show photos from static/images/gallery/3DPrinting/
+<folder>. Rather than listing the folders on every request, GalleryManifest
+keeps one entry per image (URL, srcset, dimensions) in memory and only
+rescans a folder when its modification time, or that of its variants/
+folder, has changed; the check itself runs at most every `check_interval`
+seconds.
+
+Carousel-sized variants are made by the image variant worker (see
+src/image_variants.py): a scan that finds images without up-to-date variants
+hands them to `queue_variants`, and picks the variants up on a later scan
+once they exist. Until then the original is served.
+
+The carousel order is shuffled with a seed that changes every
+`shuffle_interval` seconds, so every request in that window gets the same
+page.
+"""
+
+import os
+import random
+import threading
+import time
+
+from src.image_variants import Image, VARIANT_FORMATS, VARIANT_SIZES, photo_srcset, photo_url, variant_path
+
+SUPPORTED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+# EXIF orientations that turn the picture on its side
+_SIDEWAYS_ORIENTATIONS = (5, 6, 7, 8)
+
+# Shown when a gallery folder has no images
+PLACEHOLDER_IMAGE = {
+    'url': '/static/images/logo/SSG-Logo.png',
+    'srcset': '',
+    'webp_srcset': '',
+    'width': None,
+    'height': None,
+}
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _dimensions(path):
+    """Displayed (width, height) of an image, or (None, None) without Pillow"""
+    if Image is None:
+        return None, None
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            if image.getexif().get(0x0112) in _SIDEWAYS_ORIENTATIONS:
+                width, height = height, width
+            return width, height
+    except Exception:
+        return None, None
+
+
+class GalleryManifest:
+    """Per-process cache of gallery folder contents"""
+
+    def __init__(self, root, queue_variants=None, shuffle_interval=3600, check_interval=60):
+        """
+        Args:
+            root: Folder holding one sub-folder per gallery
+            queue_variants: Called with a list of image paths that need variants
+                (None = serve originals only)
+            shuffle_interval: Seconds the carousel order stays the same
+            check_interval: Minimum seconds between checks for changed folders
+        """
+        self.root = root
+        self.queue_variants = queue_variants
+        self.shuffle_interval = max(1, int(shuffle_interval))
+        self.check_interval = check_interval
+        self._folders = {}  # folder -> (signature, entries, checked_at)
+        self._lock = threading.Lock()
+
+    def _signature(self, path):
+        """Changes when an image is added or removed, or new variants are written"""
+        return (_mtime(path), _mtime(os.path.join(path, 'variants')))
+
+    def _scan(self, folder, path):
+        """Build the entries of one gallery folder"""
+        try:
+            filenames = sorted(filename for filename in os.listdir(path)
+                               if filename.lower().endswith(SUPPORTED_EXTENSIONS))
+        except OSError:
+            filenames = []
+
+        entries = []
+        missing = []
+        for filename in filenames:
+            source = os.path.join(path, filename)
+            source_mtime = _mtime(source)
+
+            # Only use variants written after the image last changed
+            variants = {}
+            for size in VARIANT_SIZES:
+                paths = {fmt: variant_path(source, size, fmt) for fmt in VARIANT_FORMATS}
+                if all((_mtime(variant) or 0) >= (source_mtime or 0) for variant in paths.values()):
+                    variants[size] = {fmt: variant.replace(os.sep, '/') for fmt, variant in paths.items()}
+            if len(variants) < len(VARIANT_SIZES):
+                variants = {}
+                missing.append(source)
+
+            for size in variants:
+                variants[size]['width'], variants[size]['height'] = _dimensions(
+                    variant_path(source, size, 'jpeg'))
+            if variants and variants['full']['width']:
+                width, height = variants['full']['width'], variants['full']['height']
+            else:
+                variants = {}
+                width, height = _dimensions(source)
+
+            photo = {'photo_path': source, 'variants': variants}
+            entries.append({
+                'url': photo_url(photo, 'card'),
+                'srcset': photo_srcset(photo),
+                'webp_srcset': photo_srcset(photo, 'webp'),
+                'width': width,
+                'height': height,
+            })
+
+        if missing and self.queue_variants is not None:
+            try:
+                self.queue_variants(missing)
+            except Exception as e:
+                print(f"Could not queue gallery variants for {folder}: {str(e)}")
+
+        return entries
+
+    def images(self, folder):
+        """All images of a gallery folder, in name order"""
+        now = time.monotonic()
+        cached = self._folders.get(folder)
+        if cached and now - cached[2] < self.check_interval:
+            return cached[1]
+
+        with self._lock:
+            cached = self._folders.get(folder)
+            if cached and now - cached[2] < self.check_interval:
+                return cached[1]
+
+            path = os.path.join(self.root, folder)
+            signature = self._signature(path)
+            if cached and cached[0] == signature:
+                entries = cached[1]
+            else:
+                entries = self._scan(folder, path)
+            self._folders[folder] = (signature, entries, now)
+            return entries
+
+    def carousel(self, folder, max_images=15):
+        """Up to max_images images of a folder, shuffled the same way for
+        everyone until the shuffle interval rolls over
+
+        Falls back to the site logo when the folder has no images.
+        """
+        entries = list(self.images(folder))
+        if not entries:
+            return [PLACEHOLDER_IMAGE]
+
+        window = int(time.time() // self.shuffle_interval)
+        random.Random(f"{folder}:{window}").shuffle(entries)
+        return entries[:max_images]
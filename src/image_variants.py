@@ -0,0 +1,232 @@
+"""
+Resized WebP and JPEG variants of uploaded photos.
+
+Photos are saved exactly as uploaded, often 4000px phone pictures with EXIF
+(including GPS) attached. Adding a product photo queues a job in
+image_variant_jobs; ImageVariantWorker picks the jobs up from a background
+thread and writes a thumb/card/full copy of each photo in WebP and JPEG to a
+variants/ folder next to the original, with the orientation applied and the
+EXIF dropped. The paths are recorded as JSON in the photo row's variants
+column, and the shop templates build srcset attributes from them.
+
+Gallery images (see src/gallery.py) are queued the same way; their variants
+are found on disk by the gallery manifest. Customer quote photos have no
+photo row: their job rewrites the upload in place, capped at the full size
+and without metadata.
+
+Pillow is optional. Without it no worker runs, jobs stay pending and the
+pages keep serving the originals.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+from src.background import BackgroundWorker
+
+
+# Variant name -> maximum width in pixels (never upscaled)
+VARIANT_SIZES = {'thumb': 320, 'card': 640, 'full': 1600}
+
+VARIANT_FORMATS = {'webp': ('WEBP', '.webp'), 'jpeg': ('JPEG', '.jpg')}
+
+
+def available():
+    """Whether Pillow is installed"""
+    return Image is not None
+
+
+def variant_path(source_path, size, fmt):
+    """Where the `size` variant of a photo is stored, e.g.
+    static/uploads/x/photo.png -> static/uploads/x/variants/photo-card.webp"""
+    folder, filename = os.path.split(source_path)
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(folder, 'variants', f"{stem}-{size}{VARIANT_FORMATS[fmt][1]}")
+
+
+def _flatten(image):
+    """Convert to RGB, putting transparent areas on white (JPEG has no alpha)"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def _resize(image, max_width):
+    """Scale down to `max_width`, keeping the aspect ratio"""
+    if image.width <= max_width:
+        return image
+    height = max(1, round(image.height * max_width / image.width))
+    return image.resize((max_width, height), Image.LANCZOS)
+
+
+def generate_variants(source_path, sizes=VARIANT_SIZES, quality=80):
+    """Write every size of a photo in WebP and JPEG
+
+    Images are saved without their EXIF, after applying its orientation;
+    only the colour profile is kept.
+
+    Returns:
+        Dict of size -> {'width', 'height', 'webp', 'jpeg'} (paths use /)
+    """
+    with Image.open(source_path) as original:
+        icc_profile = original.info.get('icc_profile')
+        image = _flatten(ImageOps.exif_transpose(original))
+
+    os.makedirs(os.path.join(os.path.dirname(source_path), 'variants'), exist_ok=True)
+
+    variants = {}
+    for size, max_width in sizes.items():
+        resized = _resize(image, max_width)
+        variant = {'width': resized.width, 'height': resized.height}
+        for fmt, (pil_format, _) in VARIANT_FORMATS.items():
+            path = variant_path(source_path, size, fmt)
+            if pil_format == 'JPEG':
+                resized.save(path, pil_format, quality=quality, optimize=True, progressive=True,
+                             icc_profile=icc_profile)
+            else:
+                resized.save(path, pil_format, quality=quality, method=4, icc_profile=icc_profile)
+            variant[fmt] = path.replace(os.sep, '/')
+        variants[size] = variant
+
+    return variants
+
+
+def strip_in_place(path, max_width=VARIANT_SIZES['full'], quality=85):
+    """Rewrite an upload without its metadata, scaled down to `max_width`
+
+    Animated GIF/WebP/PNG images are left alone. Phone photos that open as
+    multi-picture JPEGs (MPO) keep only their main picture.
+    """
+    with Image.open(path) as original:
+        pil_format = original.format
+        if pil_format == 'MPO':
+            original.seek(0)
+            pil_format = 'JPEG'
+        elif getattr(original, 'is_animated', False):
+            return False
+        image = ImageOps.exif_transpose(original)
+        image = _resize(image, max_width)
+        if pil_format == 'JPEG':
+            image = _flatten(image)
+        image.load()
+
+    options = {'quality': quality} if pil_format in ('JPEG', 'WEBP') else {}
+    image.save(path, pil_format, **options)
+    return True
+
+
+def photo_url(photo, size='card', fmt='jpeg'):
+    """URL of one variant of a photo dict, or of the original if it has none"""
+    variants = photo.get('variants') or {}
+    path = variants.get(size, {}).get(fmt) or photo['photo_path']
+    return '/' + path.replace(os.sep, '/')
+
+
+def photo_srcset(photo, fmt='jpeg'):
+    """srcset attribute value for a photo dict ('' if it has no variants)"""
+    variants = photo.get('variants') or {}
+    candidates = {}
+    for size in VARIANT_SIZES:
+        variant = variants.get(size)
+        if variant and variant.get(fmt):
+            # Small originals give several sizes of the same width; list each once
+            candidates.setdefault(variant['width'], f"/{variant[fmt]} {variant['width']}w")
+    return ', '.join(candidates[width] for width in sorted(candidates))
+
+
+class ImageVariantWorker(BackgroundWorker):
+    """Generate queued photo variants from a background thread
+
+    Each batch is resized on a small thread pool: Pillow releases the GIL
+    while decoding, resizing and encoding, so the work runs in parallel
+    without leaving the app process.
+    """
+
+    thread_name = 'image-variants'
+
+    def __init__(self, db, pool_size=2, quality=80, batch_size=10, poll_interval=60,
+                 max_attempts=3, retry_delay=300):
+        """
+        Args:
+            db: Database instance
+            pool_size: Photos resized at the same time
+            quality: WebP/JPEG quality (1-95)
+            batch_size: Jobs claimed per round
+            poll_interval: Seconds between checks when the queue is idle
+            max_attempts: Attempts before a job is marked failed
+            retry_delay: Seconds before the first retry (doubles per attempt)
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.pool_size = max(1, int(pool_size))
+        self.quality = quality
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self._executor = None
+        self._executor_pid = None
+
+    def _get_executor(self):
+        """The resize pool for this process (threads don't survive a fork)"""
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                thread_name_prefix=self.thread_name)
+            self._executor_pid = os.getpid()
+        return self._executor
+
+    def process_job(self, job):
+        """Create the variants for one job (runs on the resize pool)
+
+        Returns:
+            Variants dict, or None for a quote photo rewritten in place
+        """
+        if not os.path.exists(job['source_path']):
+            raise FileNotFoundError(f"{job['source_path']} does not exist")
+
+        if job['photo_table']:
+            return generate_variants(job['source_path'], quality=self.quality)
+
+        strip_in_place(job['source_path'])
+        return None
+
+    def run_once(self):
+        """Process one batch of queued jobs
+
+        Returns:
+            Number of jobs claimed (0 when nothing was due)
+        """
+        jobs = self.db.claim_image_variant_jobs(limit=self.batch_size)
+        if not jobs:
+            return 0
+
+        futures = [(job, self._get_executor().submit(self.process_job, job)) for job in jobs]
+        for job, future in futures:
+            try:
+                variants = future.result()
+            except Exception as e:
+                print(f"❌ Image variants for {job['source_path']} failed (attempt {job['attempts']}): {str(e)}")
+                retry_in = None
+                if job['attempts'] < self.max_attempts and not isinstance(e, FileNotFoundError):
+                    retry_in = self.retry_delay * 2 ** (job['attempts'] - 1)
+                self.db.mark_image_variant_job_failed(job['id'], str(e), retry_in=retry_in)
+                continue
+
+            self.db.complete_image_variant_job(job['id'], variants)
+
+        return len(jobs)
+
+    def drain(self):
+        """Process batches until nothing is due (used by scripts/image_worker.py --once)"""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            if not claimed:
+                return total
+            total += claimed
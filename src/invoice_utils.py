@@ -1,309 +1,550 @@
 """
-Invoice generation utilities using ReportLab for PDF creation.
+Invoice PDFs, rendered with ReportLab.
+
+Rendering an invoice takes long enough to notice, so admin pages don't do it
+while the admin waits: they queue a job in invoice_jobs and InvoiceWorker
+renders it from a background thread. scripts/invoice_worker.py does the same
+outside the app, and scripts/regenerate_invoices.py re-renders a month of
+invoices on a process pool.
+
+Everything printed on an invoice is collected by invoice_content() first.
+The PDF is named after a hash of that content
+(static/invoices/INV-<order number>-<hash>.pdf), and the order's invoice_file
+column points at the current one, so an invoice whose order, customer and
+items haven't changed is found on disk instead of being built again. The
+paragraph and table styles are built once per process.
 """
 
+import hashlib
+import json
 import os
+import re
+import threading
 from datetime import datetime
+from xml.sax.saxutils import escape
+
+import pytz
+
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
+from reportlab.lib.enums import TA_CENTER
+
+from src.background import BackgroundWorker
+
+INVOICES_DIR = os.path.join('static', 'invoices')
+LOGO_PATH = os.path.join('static', 'images', 'logo', 'SSG-Logo.png')
+
+# Part of every invoice's hash: bump it when the layout below changes so
+# existing invoices are rendered again
+LAYOUT_VERSION = 1
+
+# Invoices are dated in the shop's time; SQLite stores timestamps in UTC
+SHOP_TIMEZONE = pytz.timezone('Africa/Johannesburg')
+
+PUDO_LABELS = {
+    'locker_to_locker': 'PUDO L2L',
+    'locker_to_kiosk': 'PUDO L2K',
+    'locker_to_door': 'PUDO L2D',
+    'kiosk_to_door': 'PUDO K2D'
+}
+
+# Order status -> payment status shown on the invoice
+PAYMENT_STATUS_LABELS = {
+    'pending': 'Pending',
+    'confirmed': 'Awaiting Payment',
+    'awaiting_payment': 'Awaiting Payment',
+    'paid': 'Paid',
+    'processing': 'Paid',
+    'shipped': 'Paid',
+    'delivered': 'Paid',
+    'cancelled': 'Cancelled'
+}
+
+_styles = None
+_styles_lock = threading.Lock()
+
+
+def _get_styles():
+    """Paragraph and table styles, built on first use and shared by every invoice"""
+    global _styles
+    if _styles is None:
+        with _styles_lock:
+            if _styles is None:
+                sample = getSampleStyleSheet()
+                _styles = {
+                    'title': ParagraphStyle(
+                        'CustomTitle',
+                        parent=sample['Heading1'],
+                        fontSize=24,
+                        textColor=colors.HexColor('#2563eb'),
+                        spaceAfter=6,
+                        alignment=TA_CENTER
+                    ),
+                    'heading': ParagraphStyle(
+                        'CustomHeading',
+                        parent=sample['Heading2'],
+                        fontSize=12,
+                        textColor=colors.HexColor('#1f2937'),
+                        spaceAfter=12,
+                        spaceBefore=12
+                    ),
+                    'normal': ParagraphStyle(
+                        'CustomNormal',
+                        parent=sample['Normal'],
+                        fontSize=10,
+                        textColor=colors.HexColor('#374151')
+                    ),
+                    'header_logo': TableStyle([
+                        ('ALIGN', (0, 0), (0, 0), 'CENTER'),
+                        ('ALIGN', (1, 0), (1, -1), 'CENTER'),
+                        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+                        ('SPAN', (0, 0), (0, 2)),  # Span logo across rows
+                    ]),
+                    'header': TableStyle([
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                    ]),
+                    'invoice_title': TableStyle([
+                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dbeafe')),
+                        ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#2563eb')),
+                    ]),
+                    'bill_to': TableStyle([
+                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+                    ]),
+                    'items': TableStyle([
+                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
+                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
+                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                        ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
+                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                        ('FONTSIZE', (0, 0), (-1, 0), 11),
+                        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+                        ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
+                    ]),
+                    'totals': TableStyle([
+                        ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
+                        ('LINEABOVE', (2, -1), (-1, -1), 1.5, colors.HexColor('#2563eb')),
+                        ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#dbeafe')),
+                    ]),
+                    'payment': TableStyle([
+                        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+                        ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#f3f4f6')),
+                        ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
+                        ('LEFTPADDING', (0, 0), (-1, -1), 10),
+                        ('RIGHTPADDING', (0, 0), (-1, -1), 10),
+                        ('TOPPADDING', (0, 0), (-1, -1), 8),
+                        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+                    ]),
+                }
+    return _styles
+
+
+def invoice_config(config):
+    """The settings an invoice uses, as a plain dict (safe to send to another process)"""
+    return {'SITE_NAME': config['SITE_NAME'], 'TAGLINE': config['TAGLINE']}
+
+
+def invoice_date(order):
+    """The date printed on an invoice: when its number was issued, in South African time"""
+    for field in ('invoice_generated_date', 'created_date'):
+        value = order.get(field)
+        if value and not isinstance(value, datetime):
+            try:
+                value = datetime.strptime(str(value)[:19], '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                continue
+        if value:
+            if value.tzinfo is None:
+                value = pytz.UTC.localize(value)
+            return value.astimezone(SHOP_TIMEZONE)
+    return datetime.now(SHOP_TIMEZONE)
+
+
+def invoice_content(order, customer, order_items, config):
+    """Everything printed on an order's invoice, as JSON-friendly values"""
+    ship_to = None
+    if order.get('shipping_method') != 'pickup' and order.get('shipping_address'):
+        ship_to = [order['shipping_address']]
+        if order.get('shipping_city'):
+            ship_to.append(f"{order['shipping_city']}, {order.get('shipping_state') or ''}")
+        if order.get('shipping_postal_code'):
+            ship_to.append(order['shipping_postal_code'])
+
+    shipping_label = None
+    if (order.get('shipping_cost') or 0) > 0:
+        shipping_label = 'Shipping'
+        if order.get('shipping_method') == 'pudo':
+            shipping_label = PUDO_LABELS.get(order.get('pudo_option'), 'Shipping')
+
+    return {
+        'layout': LAYOUT_VERSION,
+        'site_name': config['SITE_NAME'],
+        'tagline': config['TAGLINE'],
+        'logo': os.path.exists(LOGO_PATH),
+        'invoice_number': order.get('invoice_number') or f"INV-{order['order_number']}",
+        'order_number': order['order_number'],
+        'date': invoice_date(order).strftime('%d %B %Y'),
+        'customer': {
+            'name': customer['name'],
+            'email': customer['email'],
+            'phone': customer.get('phone'),
+        },
+        'ship_to': ship_to,
+        'items': [{'name': item['name'], 'quantity': item['quantity'], 'price': item['price']}
+                  for item in order_items],
+        'subtotal': order['subtotal'],
+        'shipping_label': shipping_label,
+        'shipping_cost': order.get('shipping_cost') or 0,
+        'total': order['total_amount'],
+        'payment_method': order.get('payment_method', 'EFT / Bank Transfer'),
+        'payment_status': PAYMENT_STATUS_LABELS.get(order.get('status', 'pending'), 'Pending'),
+        'payment_reference': order.get('payment_reference'),
+    }
+
+
+def content_hash(content):
+    """Hash of an invoice's content, used in its file name"""
+    encoded = json.dumps(content, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def invoice_file_path(invoice_number, digest):
+    """Where the invoice with this content hash is stored"""
+    return os.path.join(INVOICES_DIR, f"{invoice_number}-{digest}.pdf")
+
+
+def _build_pdf(content, output_path):
+    """Lay out an invoice and write it to output_path"""
+    styles = _get_styles()
+    title_style = styles['title']
+    heading_style = styles['heading']
+    normal_style = styles['normal']
+
+    # invariant: the same content gives the same bytes (no timestamp or random ID)
+    doc = SimpleDocTemplate(
+        output_path,
+        pagesize=A4,
+        rightMargin=20*mm,
+        leftMargin=20*mm,
+        topMargin=20*mm,
+        bottomMargin=20*mm,
+        invariant=True
+    )
+
+    # Container for PDF elements
+    elements = []
+    site_name = escape(content['site_name'])
+
+    # Company Header with Logo
+    if content['logo']:
+        logo = Image(LOGO_PATH, width=25*mm, height=25*mm)
+
+        header_data = [
+            [logo, Paragraph(f"<b>{site_name}</b>", title_style)],
+            ['', Paragraph("Snow Spoiled Gifts", normal_style)],
+            ['', Paragraph("Email: info@snowspoiledgifts.co.za", normal_style)],
+        ]
+
+        header_table = Table(header_data, colWidths=[30*mm, 140*mm])
+        header_table.setStyle(styles['header_logo'])
+    else:
+        # Fallback without logo
+        header_data = [
+            [Paragraph(f"<b>{site_name}</b>", title_style)],
+            [Paragraph("Snow Spoiled Gifts", normal_style)],
+            [Paragraph("Email: info@snowspoiledgifts.co.za", normal_style)],
+        ]
+
+        header_table = Table(header_data, colWidths=[170*mm])
+        header_table.setStyle(styles['header'])
+
+    elements.append(header_table)
+    elements.append(Spacer(1, 10*mm))
+
+    # Invoice title and number
+    invoice_title_data = [
+        [Paragraph("<b>INVOICE</b>", title_style)],
+        [Paragraph(f"Invoice #: {escape(content['invoice_number'])}", heading_style)],
+        [Paragraph(f"Order #: {escape(content['order_number'])}", normal_style)],
+        [Paragraph(f"Date: {content['date']}", normal_style)],
+    ]
+
+    invoice_title_table = Table(invoice_title_data, colWidths=[170*mm])
+    invoice_title_table.setStyle(styles['invoice_title'])
+
+    elements.append(invoice_title_table)
+    elements.append(Spacer(1, 10*mm))
+
+    # Customer information
+    customer = content['customer']
+    bill_to_data = [
+        [Paragraph("<b>Bill To:</b>", heading_style), ""],
+        [Paragraph(f"<b>{escape(customer['name'])}</b>", normal_style), ""],
+        [Paragraph(escape(customer['email']), normal_style), ""],
+    ]
+
+    if customer['phone']:
+        bill_to_data.append([Paragraph(escape(customer['phone']), normal_style), ""])
+
+    # Add shipping address if not pickup
+    if content['ship_to']:
+        bill_to_data.append([Paragraph("<b>Ship To:</b>", heading_style), ""])
+        for line in content['ship_to']:
+            bill_to_data.append([Paragraph(escape(line), normal_style), ""])
+
+    bill_to_table = Table(bill_to_data, colWidths=[85*mm, 85*mm])
+    bill_to_table.setStyle(styles['bill_to'])
+
+    elements.append(bill_to_table)
+    elements.append(Spacer(1, 10*mm))
+
+    # Order items table
+    items_data = [
+        [
+            Paragraph("<b>Item</b>", heading_style),
+            Paragraph("<b>Qty</b>", heading_style),
+            Paragraph("<b>Price</b>", heading_style),
+            Paragraph("<b>Total</b>", heading_style)
+        ]
+    ]
+
+    for item in content['items']:
+        items_data.append([
+            Paragraph(escape(item['name']), normal_style),
+            Paragraph(str(item['quantity']), normal_style),
+            Paragraph(f"R{item['price']:.2f}", normal_style),
+            Paragraph(f"R{(item['price'] * item['quantity']):.2f}", normal_style)
+        ])
+
+    items_table = Table(items_data, colWidths=[90*mm, 25*mm, 30*mm, 25*mm])
+    items_table.setStyle(styles['items'])
+
+    elements.append(items_table)
+    elements.append(Spacer(1, 5*mm))
+
+    # Totals section
+    totals_data = [
+        ["", "", Paragraph("<b>Subtotal:</b>", normal_style), Paragraph(f"R{content['subtotal']:.2f}", normal_style)],
+    ]
+
+    if content['shipping_label']:
+        totals_data.append([
+            "", "",
+            Paragraph(f"<b>{content['shipping_label']}:</b>", normal_style),
+            Paragraph(f"R{content['shipping_cost']:.2f}", normal_style)
+        ])
+
+    totals_data.append([
+        "", "",
+        Paragraph("<b>TOTAL:</b>", heading_style),
+        Paragraph(f"<b>R{content['total']:.2f}</b>", heading_style)
+    ])
+
+    totals_table = Table(totals_data, colWidths=[90*mm, 25*mm, 30*mm, 25*mm])
+    totals_table.setStyle(styles['totals'])
+
+    elements.append(totals_table)
+    elements.append(Spacer(1, 10*mm))
+
+    # Payment information
+    payment_info = [
+        [Paragraph("<b>Payment Information:</b>", heading_style)],
+        [Paragraph(f"Payment Method: {escape(str(content['payment_method']))}", normal_style)],
+        [Paragraph(f"Payment Status: {content['payment_status']}", normal_style)],
+    ]
+
+    if content['payment_reference']:
+        payment_info.append([Paragraph(f"Reference: {escape(content['payment_reference'])}", normal_style)])
+
+    payment_table = Table(payment_info, colWidths=[170*mm])
+    payment_table.setStyle(styles['payment'])
+
+    elements.append(payment_table)
+    elements.append(Spacer(1, 15*mm))
+
+    # Footer
+    footer_text = f"""
+    <para align=center>
+    <b>Thank you for your business!</b><br/>
+    For any questions about this invoice, please contact us at info@snowspoiledgifts.co.za<br/>
+    <br/>
+    <i>{site_name} - {escape(content['tagline'])}</i>
+    </para>
+    """
+
+    elements.append(Paragraph(footer_text, normal_style))
+
+    # Build PDF
+    doc.build(elements)
 
 
-def generate_invoice_pdf(order, customer, order_items, config, output_path=None):
+def remove_stale_invoices(invoice_number, keep):
+    """Delete every version of an invoice except `keep` (the order's current file)"""
+    pattern = re.compile(re.escape(invoice_number) + r'(-[0-9a-f]{16})?\.pdf$')
+    try:
+        filenames = os.listdir(INVOICES_DIR)
+    except OSError:
+        return
+    for filename in filenames:
+        path = os.path.join(INVOICES_DIR, filename)
+        if pattern.match(filename) and os.path.abspath(path) != os.path.abspath(keep):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def generate_invoice_pdf(order, customer, order_items, config, output_path=None, force=False):
     """
     Generate a professional PDF invoice for an order.
 
+    Without an output_path the PDF is stored under a hash of its content;
+    if that file already exists it is returned without rendering anything.
+
     Args:
         order: Order dictionary with order details
         customer: Customer dictionary with customer details
         order_items: List of order items
         config: Flask app config
         output_path: Optional custom path for the PDF
+        force: Render again even if an up-to-date PDF exists
 
     Returns:
         Tuple (success: bool, file_path: str or error_message: str)
     """
     try:
-        # Create invoices directory if it doesn't exist
-        invoices_dir = os.path.join('static', 'invoices')
-        os.makedirs(invoices_dir, exist_ok=True)
-
-        # Generate invoice number if not exists
-        if not order.get('invoice_number'):
-            invoice_number = f"INV-{order['order_number']}"
-        else:
-            invoice_number = order['invoice_number']
-
-        # Set output path
-        if not output_path:
-            output_path = os.path.join(invoices_dir, f"{invoice_number}.pdf")
-
-        # Create PDF document
-        doc = SimpleDocTemplate(
-            output_path,
-            pagesize=A4,
-            rightMargin=20*mm,
-            leftMargin=20*mm,
-            topMargin=20*mm,
-            bottomMargin=20*mm
-        )
-
-        # Container for PDF elements
-        elements = []
-        styles = getSampleStyleSheet()
-
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2563eb'),
-            spaceAfter=6,
-            alignment=TA_CENTER
-        )
-
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=12,
-            textColor=colors.HexColor('#1f2937'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-
-        normal_style = ParagraphStyle(
-            'CustomNormal',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.HexColor('#374151')
-        )
-
-        # Company Header with Logo
-        logo_path = os.path.join('static', 'images', 'logo', 'SSG-Logo.png')
-
-        if os.path.exists(logo_path):
-            # Create header with logo
-            logo = Image(logo_path, width=25*mm, height=25*mm)
-
-            header_data = [
-                [logo, Paragraph(f"<b>{config['SITE_NAME']}</b>", title_style)],
-                ['', Paragraph("Snow Spoiled Gifts", normal_style)],
-                ['', Paragraph("Email: info@snowspoiledgifts.co.za", normal_style)],
-            ]
-
-            header_table = Table(header_data, colWidths=[30*mm, 140*mm])
-            header_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (0, 0), 'CENTER'),
-                ('ALIGN', (1, 0), (1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                ('SPAN', (0, 0), (0, 2)),  # Span logo across rows
-            ]))
-        else:
-            # Fallback without logo
-            header_data = [
-                [Paragraph(f"<b>{config['SITE_NAME']}</b>", title_style)],
-                [Paragraph("Snow Spoiled Gifts", normal_style)],
-                [Paragraph("Email: info@snowspoiledgifts.co.za", normal_style)],
-            ]
-
-            header_table = Table(header_data, colWidths=[170*mm])
-            header_table.setStyle(TableStyle([
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ]))
-
-        elements.append(header_table)
-        elements.append(Spacer(1, 10*mm))
-
-        # Invoice title and number
-        invoice_title_data = [
-            [Paragraph("<b>INVOICE</b>", title_style)],
-            [Paragraph(f"Invoice #: {invoice_number}", heading_style)],
-            [Paragraph(f"Order #: {order['order_number']}", normal_style)],
-            [Paragraph(f"Date: {datetime.now().strftime('%d %B %Y')}", normal_style)],
-        ]
+        content = invoice_content(order, customer, order_items, config)
+
+        if output_path:
+            _build_pdf(content, output_path)
+            return True, output_path
+
+        path = invoice_file_path(content['invoice_number'], content_hash(content))
+        if os.path.exists(path) and not force:
+            return True, path
+
+        # Write next to the final name and move it into place, so a download
+        # never sees a half-written file
+        os.makedirs(INVOICES_DIR, exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            _build_pdf(content, temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        return True, path
 
-        invoice_title_table = Table(invoice_title_data, colWidths=[170*mm])
-        invoice_title_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#dbeafe')),
-            ('BOX', (0, 0), (-1, -1), 1, colors.HexColor('#2563eb')),
-        ]))
-
-        elements.append(invoice_title_table)
-        elements.append(Spacer(1, 10*mm))
-
-        # Customer information
-        bill_to_data = [
-            [Paragraph("<b>Bill To:</b>", heading_style), ""],
-            [Paragraph(f"<b>{customer['name']}</b>", normal_style), ""],
-            [Paragraph(customer['email'], normal_style), ""],
-        ]
+    except Exception as e:
+        error_msg = f"Failed to generate invoice PDF: {str(e)}"
+        print(error_msg)
+        return False, error_msg
 
-        if customer.get('phone'):
-            bill_to_data.append([Paragraph(customer['phone'], normal_style), ""])
-
-        # Add shipping address if not pickup
-        if order.get('shipping_method') != 'pickup' and order.get('shipping_address'):
-            bill_to_data.append([Paragraph("<b>Ship To:</b>", heading_style), ""])
-            bill_to_data.append([Paragraph(order['shipping_address'], normal_style), ""])
-            if order.get('shipping_city'):
-                address_line = f"{order['shipping_city']}, {order.get('shipping_state', '')}"
-                bill_to_data.append([Paragraph(address_line, normal_style), ""])
-            if order.get('shipping_postal_code'):
-                bill_to_data.append([Paragraph(order['shipping_postal_code'], normal_style), ""])
-
-        bill_to_table = Table(bill_to_data, colWidths=[85*mm, 85*mm])
-        bill_to_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ]))
-
-        elements.append(bill_to_table)
-        elements.append(Spacer(1, 10*mm))
-
-        # Order items table
-        items_data = [
-            [
-                Paragraph("<b>Item</b>", heading_style),
-                Paragraph("<b>Qty</b>", heading_style),
-                Paragraph("<b>Price</b>", heading_style),
-                Paragraph("<b>Total</b>", heading_style)
-            ]
-        ]
 
-        for item in order_items:
-            items_data.append([
-                Paragraph(item['name'], normal_style),
-                Paragraph(str(item['quantity']), normal_style),
-                Paragraph(f"R{item['price']:.2f}", normal_style),
-                Paragraph(f"R{(item['price'] * item['quantity']):.2f}", normal_style)
-            ])
-
-        items_table = Table(items_data, colWidths=[90*mm, 25*mm, 30*mm, 25*mm])
-        items_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f3f4f6')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.HexColor('#1f2937')),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('ALIGN', (1, 0), (-1, -1), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f9fafb')]),
-        ]))
-
-        elements.append(items_table)
-        elements.append(Spacer(1, 5*mm))
-
-        # Totals section
-        totals_data = [
-            ["", "", Paragraph("<b>Subtotal:</b>", normal_style), Paragraph(f"R{order['subtotal']:.2f}", normal_style)],
-        ]
+def invoice_is_current(order, customer, order_items, config):
+    """Whether the order's invoice_file matches its current content"""
+    content = invoice_content(order, customer, order_items, config)
+    path = invoice_file_path(content['invoice_number'], content_hash(content))
+    return order.get('invoice_file') == path and os.path.exists(path)
 
-        if order.get('shipping_cost', 0) > 0:
-            shipping_label = "Shipping"
-            if order.get('shipping_method') == 'pudo':
-                pudo_map = {
-                    'locker_to_locker': 'PUDO L2L',
-                    'locker_to_kiosk': 'PUDO L2K',
-                    'locker_to_door': 'PUDO L2D',
-                    'kiosk_to_door': 'PUDO K2D'
-                }
-                shipping_label = pudo_map.get(order.get('pudo_option'), 'Shipping')
 
-            totals_data.append([
-                "", "",
-                Paragraph(f"<b>{shipping_label}:</b>", normal_style),
-                Paragraph(f"R{order['shipping_cost']:.2f}", normal_style)
-            ])
+def order_customer(order):
+    """Customer dict for an order from Database.get_invoiced_orders()"""
+    return {
+        'name': order.get('customer_name') or '',
+        'email': order.get('customer_email') or '',
+        'phone': order.get('customer_phone'),
+    }
 
-        totals_data.append([
-            "", "",
-            Paragraph("<b>TOTAL:</b>", heading_style),
-            Paragraph(f"<b>R{order['total_amount']:.2f}</b>", heading_style)
-        ])
 
-        totals_table = Table(totals_data, colWidths=[90*mm, 25*mm, 30*mm, 25*mm])
-        totals_table.setStyle(TableStyle([
-            ('ALIGN', (2, 0), (-1, -1), 'RIGHT'),
-            ('LINEABOVE', (2, -1), (-1, -1), 1.5, colors.HexColor('#2563eb')),
-            ('BACKGROUND', (2, -1), (-1, -1), colors.HexColor('#dbeafe')),
-        ]))
-
-        elements.append(totals_table)
-        elements.append(Spacer(1, 10*mm))
-
-        # Payment information
-        payment_method = order.get('payment_method', 'EFT / Bank Transfer')
-        payment_status = order.get('status', 'pending')
-
-        # Map order status to payment status display
-        payment_status_display = {
-            'pending': 'Pending',
-            'confirmed': 'Awaiting Payment',
-            'awaiting_payment': 'Awaiting Payment',
-            'paid': 'Paid',
-            'processing': 'Paid',
-            'shipped': 'Paid',
-            'delivered': 'Paid',
-            'cancelled': 'Cancelled'
-        }.get(payment_status, 'Pending')
-
-        payment_info = [
-            [Paragraph("<b>Payment Information:</b>", heading_style)],
-            [Paragraph(f"Payment Method: {payment_method}", normal_style)],
-            [Paragraph(f"Payment Status: {payment_status_display}", normal_style)],
-        ]
+def render_order_invoice(order, order_items, config, force=False):
+    """Render one order from Database.get_invoiced_orders() (used by the process pool)
 
-        if order.get('payment_reference'):
-            payment_info.append([Paragraph(f"Reference: {order['payment_reference']}", normal_style)])
-
-        payment_table = Table(payment_info, colWidths=[170*mm])
-        payment_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BACKGROUND', (0, 0), (0, 0), colors.HexColor('#f3f4f6')),
-            ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#d1d5db')),
-            ('LEFTPADDING', (0, 0), (-1, -1), 10),
-            ('RIGHTPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-
-        elements.append(payment_table)
-        elements.append(Spacer(1, 15*mm))
-
-        # Footer
-        footer_text = f"""
-        <para align=center>
-        <b>Thank you for your business!</b><br/>
-        For any questions about this invoice, please contact us at info@snowspoiledgifts.co.za<br/>
-        <br/>
-        <i>{config['SITE_NAME']} - {config['TAGLINE']}</i>
-        </para>
-        """
+    Returns:
+        Tuple (order_id, success, file_path or error_message)
+    """
+    success, result = generate_invoice_pdf(order, order_customer(order), order_items, config, force=force)
+    return order['id'], success, result
 
-        elements.append(Paragraph(footer_text, normal_style))
 
-        # Build PDF
-        doc.build(elements)
+def get_invoice_path(invoice_number):
+    """Get the file path of an invoice PDF rendered before files were named by content"""
+    return os.path.join(INVOICES_DIR, f"{invoice_number}.pdf")
 
-        return True, output_path
 
-    except Exception as e:
-        error_msg = f"Failed to generate invoice PDF: {str(e)}"
-        print(error_msg)
-        return False, error_msg
+def invoice_exists(invoice_number):
+    """Check if an invoice PDF rendered before files were named by content exists"""
+    return os.path.exists(get_invoice_path(invoice_number))
 
 
-def get_invoice_path(invoice_number):
-    """Get the file path for an invoice PDF"""
-    return os.path.join('static', 'invoices', f"{invoice_number}.pdf")
+class InvoiceWorker(BackgroundWorker):
+    """Render queued invoices from a background thread"""
 
+    thread_name = 'invoices'
 
-def invoice_exists(invoice_number):
-    """Check if an invoice PDF already exists"""
-    return os.path.exists(get_invoice_path(invoice_number))
+    def __init__(self, db, config, batch_size=10, poll_interval=60, max_attempts=3, retry_delay=60):
+        """
+        Args:
+            db: Database instance
+            config: Flask app config
+            batch_size: Jobs claimed per round
+            poll_interval: Seconds between checks when the queue is idle
+            max_attempts: Attempts before a job is marked failed
+            retry_delay: Seconds before the first retry (doubles per attempt)
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.config = invoice_config(config)
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def run_once(self):
+        """Render one batch of queued invoices
+
+        Returns:
+            Number of jobs claimed (0 when nothing was due)
+        """
+        jobs = self.db.claim_invoice_jobs(limit=self.batch_size)
+        if not jobs:
+            return 0
+
+        order_ids = list({job['order_id'] for job in jobs})
+        orders = {order['id']: order for order in self.db.get_invoiced_orders(order_ids=order_ids)}
+        items_by_order = self.db.get_order_items_for_orders(order_ids)
+
+        for job in jobs:
+            order = orders.get(job['order_id'])
+            if order is None:
+                self.db.mark_invoice_job_failed(job['id'], 'Order not found or has no invoice number')
+                continue
+
+            _, success, result = render_order_invoice(order, items_by_order.get(order['id'], []), self.config)
+            if not success:
+                print(f"❌ Invoice {order['invoice_number']} failed (attempt {job['attempts']}): {result}")
+                retry_in = None
+                if job['attempts'] < self.max_attempts:
+                    retry_in = self.retry_delay * 2 ** (job['attempts'] - 1)
+                self.db.mark_invoice_job_failed(job['id'], result, retry_in=retry_in)
+                continue
+
+            current = self.db.complete_invoice_job(job['id'], result)
+            if current:
+                remove_stale_invoices(order['invoice_number'], keep=current)
+
+        return len(jobs)
+
+    def drain(self):
+        """Process batches until nothing is due (used by scripts/invoice_worker.py --once)"""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            if not claimed:
+                return total
+            total += claimed
@@ -0,0 +1,1004 @@
+"""
+Versioned database schema migrations.
+
+Schema changes are ordered steps in MIGRATIONS. Each step runs exactly once
+per database, and the highest applied version is recorded in the
+schema_version table. Apply pending steps during deployment with:
+
+    python scripts/run_migrations.py
+
+Workers then only need get_schema_version() at boot (a single indexed
+query) instead of re-running every CREATE TABLE / PRAGMA table_info probe.
+
+Steps must stay safe to run against databases that were upgraded by hand
+with the old one-off scripts, so they check for existing tables/columns
+before changing anything. To change the schema, append a new step with
+the next version number - never edit a step that has already shipped.
+"""
+
+import secrets
+import sqlite3
+
+from src.phone_utils import normalize_phone
+
+
+def _table_exists(cursor, table_name):
+    """Check if a table exists in the database"""
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
+    return cursor.fetchone() is not None
+
+
+def _columns(cursor, table_name):
+    """Get list of column names for a table"""
+    cursor.execute(f"PRAGMA table_info({table_name})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+def _add_column(cursor, table_name, column_name, definition):
+    """Add a column to a table if it doesn't exist yet"""
+    if column_name not in _columns(cursor, table_name):
+        cursor.execute(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}")
+
+
+# ============================================================================
+# MIGRATION STEPS
+# ============================================================================
+
+def _baseline_schema(cursor):
+    """Tables, indexes and columns that Database.init_db used to create on every start"""
+    # Create signups table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS signups (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT UNIQUE NOT NULL,
+            interests TEXT,
+            signup_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            unsubscribe_token TEXT UNIQUE,
+            is_active INTEGER DEFAULT 1
+        )
+    ''')
+
+    # Create quote requests table for 3D printing services (Custom Design)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quote_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            service_type TEXT NOT NULL,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            preferred_contact TEXT,
+            description TEXT NOT NULL,
+            intended_use TEXT,
+            size TEXT,
+            quantity INTEGER DEFAULT 1,
+            color TEXT,
+            material TEXT,
+            budget TEXT,
+            additional_notes TEXT,
+            reference_images TEXT,
+            request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+
+    # Create cake topper requests table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cake_topper_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            event_date TEXT,
+            occasion TEXT NOT NULL,
+            size_preference TEXT,
+            text_to_include TEXT NOT NULL,
+            design_details TEXT NOT NULL,
+            color_preferences TEXT,
+            stand_type TEXT,
+            reference_images TEXT,
+            additional_notes TEXT,
+            request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+
+    # Create 3D print service requests table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS print_service_requests (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            email TEXT NOT NULL,
+            phone TEXT,
+            uploaded_files TEXT NOT NULL,
+            material TEXT NOT NULL,
+            color TEXT NOT NULL,
+            layer_height TEXT,
+            infill_density TEXT,
+            quantity INTEGER DEFAULT 1,
+            supports TEXT,
+            special_instructions TEXT,
+            request_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ip_address TEXT,
+            status TEXT DEFAULT 'pending'
+        )
+    ''')
+
+    # Create cutter_categories table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cutter_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT,
+            is_public INTEGER DEFAULT 1,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Add is_public column if it doesn't exist (for existing databases)
+    _add_column(cursor, 'cutter_categories', 'is_public', 'INTEGER DEFAULT 1')
+
+    # Create cutter_types table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cutter_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Create cutter_items table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cutter_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_number TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            price REAL NOT NULL,
+            dimensions TEXT,
+            material TEXT,
+            stock_status TEXT DEFAULT 'in_stock',
+            category_id INTEGER,
+            type_id INTEGER,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1,
+            FOREIGN KEY (category_id) REFERENCES cutter_categories(id),
+            FOREIGN KEY (type_id) REFERENCES cutter_types(id)
+        )
+    ''')
+
+    # Create cutter_item_photos table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cutter_item_photos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER NOT NULL,
+            photo_path TEXT NOT NULL,
+            is_main INTEGER DEFAULT 0,
+            display_order INTEGER DEFAULT 0,
+            uploaded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (item_id) REFERENCES cutter_items(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # Create cart_items table (unified for cutter_items and candles_soaps)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cart_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            session_id TEXT,
+            user_id INTEGER,
+            product_type TEXT DEFAULT 'cutter_item',
+            product_id INTEGER NOT NULL,
+            quantity INTEGER DEFAULT 1,
+            added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Add product_type and product_id columns for the unified cart (for existing databases)
+    _add_column(cursor, 'cart_items', 'product_type', "TEXT DEFAULT 'cutter_item'")
+    columns = _columns(cursor, 'cart_items')
+    if 'product_id' not in columns and 'item_id' in columns:
+        # Old schema used item_id; copy it across (cleaned up in a later migration)
+        cursor.execute('ALTER TABLE cart_items ADD COLUMN product_id INTEGER')
+        cursor.execute('UPDATE cart_items SET product_id = item_id WHERE product_id IS NULL')
+
+    # Create index for faster queries
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cutter_items_category
+        ON cutter_items(category_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cutter_items_type
+        ON cutter_items(type_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cutter_item_photos_item
+        ON cutter_item_photos(item_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_session
+        ON cart_items(session_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_user
+        ON cart_items(user_id)
+    ''')
+
+    # Create users table for authentication
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT UNIQUE NOT NULL,
+            password_hash TEXT NOT NULL,
+            name TEXT NOT NULL,
+            phone TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active INTEGER DEFAULT 1,
+            email_verified INTEGER DEFAULT 0,
+            shipping_address TEXT,
+            shipping_city TEXT,
+            shipping_state TEXT,
+            shipping_postal_code TEXT,
+            shipping_country TEXT DEFAULT 'South Africa'
+        )
+    ''')
+
+    # Create index for faster email lookups
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_users_email
+        ON users(email)
+    ''')
+
+    # Create orders table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            order_number TEXT UNIQUE NOT NULL,
+            status TEXT DEFAULT 'pending',
+            subtotal REAL NOT NULL,
+            shipping_method TEXT DEFAULT 'pickup',
+            pudo_option TEXT,
+            locker_location TEXT,
+            shipping_cost REAL DEFAULT 0,
+            total_amount REAL NOT NULL,
+            shipping_address TEXT,
+            shipping_city TEXT,
+            shipping_state TEXT,
+            shipping_postal_code TEXT,
+            shipping_country TEXT,
+            payment_method TEXT,
+            payment_status TEXT DEFAULT 'pending',
+            payment_reference TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    # Create order_items table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            product_id INTEGER NOT NULL,
+            quantity INTEGER NOT NULL,
+            price REAL NOT NULL,
+            FOREIGN KEY (order_id) REFERENCES orders(id),
+            FOREIGN KEY (product_id) REFERENCES products(id)
+        )
+    ''')
+
+    # Create indexes for orders
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_user
+        ON orders(user_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_orders_number
+        ON orders(order_number)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_order_items_order
+        ON order_items(order_id)
+    ''')
+
+    # ===== CANDLES & SOAPS PRODUCT LINE =====
+    # Create candles_soaps_categories table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candles_soaps_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE NOT NULL,
+            description TEXT,
+            display_order INTEGER DEFAULT 0,
+            is_active INTEGER DEFAULT 1,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Create candles_soaps_products table with stock tracking
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candles_soaps_products (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_code TEXT UNIQUE NOT NULL,
+            name TEXT NOT NULL,
+            description TEXT,
+            category_id INTEGER NOT NULL,
+            price REAL NOT NULL,
+            stock_quantity INTEGER DEFAULT 0,
+            low_stock_threshold INTEGER DEFAULT 5,
+            weight_grams REAL,
+            dimensions TEXT,
+            scent TEXT,
+            color TEXT,
+            burn_time_hours INTEGER,
+            ingredients TEXT,
+            is_active INTEGER DEFAULT 1,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (category_id) REFERENCES candles_soaps_categories(id)
+        )
+    ''')
+
+    # Create candles_soaps_product_photos table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candles_soaps_product_photos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            photo_path TEXT NOT NULL,
+            is_main INTEGER DEFAULT 0,
+            display_order INTEGER DEFAULT 0,
+            uploaded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES candles_soaps_products(id) ON DELETE CASCADE
+        )
+    ''')
+
+    # NOTE: candles_soaps_cart_items table REMOVED - now using unified cart_items table
+    # The unified cart_items table handles both cutter items and candles/soaps via product_type field
+
+    # Create candles_soaps_stock_history table for tracking stock changes
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS candles_soaps_stock_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            product_id INTEGER NOT NULL,
+            change_amount INTEGER NOT NULL,
+            reason TEXT,
+            previous_quantity INTEGER,
+            new_quantity INTEGER,
+            order_id INTEGER,
+            created_by TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (product_id) REFERENCES candles_soaps_products(id),
+            FOREIGN KEY (order_id) REFERENCES orders(id)
+        )
+    ''')
+
+    # ===== WHATSAPP MESSAGING SYSTEM =====
+    # Create whatsapp_messages table for incoming/outgoing messages
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS whatsapp_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            message_id TEXT UNIQUE,
+            direction TEXT NOT NULL,
+            from_phone TEXT NOT NULL,
+            to_phone TEXT NOT NULL,
+            message_text TEXT,
+            message_type TEXT DEFAULT 'text',
+            media_url TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'received',
+            is_read INTEGER DEFAULT 0,
+            user_id INTEGER,
+            quote_id INTEGER,
+            quote_type TEXT,
+            conversation_id TEXT,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''')
+
+    # Create indexes for candles & soaps
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_candles_soaps_products_category
+        ON candles_soaps_products(category_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_candles_soaps_products_active
+        ON candles_soaps_products(is_active)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_candles_soaps_product_photos_product
+        ON candles_soaps_product_photos(product_id)
+    ''')
+
+    # NOTE: candles_soaps_cart_items indexes removed - table no longer exists
+    # Cart indexes are now on unified cart_items table
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_candles_soaps_stock_history_product
+        ON candles_soaps_stock_history(product_id)
+    ''')
+
+    # Create indexes for WhatsApp messages
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_from_phone
+        ON whatsapp_messages(from_phone)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_conversation
+        ON whatsapp_messages(conversation_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_unread
+        ON whatsapp_messages(is_read)
+    ''')
+
+    # Shipping, pricing and invoice fields added to orders after launch
+    _add_column(cursor, 'orders', 'shipping_method', "TEXT DEFAULT 'pickup'")
+    _add_column(cursor, 'orders', 'pudo_option', 'TEXT')
+    _add_column(cursor, 'orders', 'locker_location', 'TEXT')
+    _add_column(cursor, 'orders', 'shipping_cost', 'REAL DEFAULT 0')
+    if 'subtotal' not in _columns(cursor, 'orders'):
+        cursor.execute("ALTER TABLE orders ADD COLUMN subtotal REAL DEFAULT 0")
+        # Update existing orders to have subtotal = total_amount
+        cursor.execute("UPDATE orders SET subtotal = total_amount WHERE subtotal = 0 OR subtotal IS NULL")
+    _add_column(cursor, 'orders', 'invoice_number', 'TEXT')
+    _add_column(cursor, 'orders', 'invoice_generated_date', 'TIMESTAMP')
+    _add_column(cursor, 'orders', 'invoice_sent_date', 'TIMESTAMP')
+    _add_column(cursor, 'orders', 'quote_type', 'TEXT')
+    _add_column(cursor, 'orders', 'quote_id', 'INTEGER')
+    _add_column(cursor, 'orders', 'payment_received_date', 'TIMESTAMP')
+
+    # Shipping details and admin flag on users
+    _add_column(cursor, 'users', 'shipping_address', 'TEXT')
+    _add_column(cursor, 'users', 'shipping_city', 'TEXT')
+    _add_column(cursor, 'users', 'shipping_state', 'TEXT')
+    _add_column(cursor, 'users', 'shipping_postal_code', 'TEXT')
+    _add_column(cursor, 'users', 'shipping_country', "TEXT DEFAULT 'South Africa'")
+    _add_column(cursor, 'users', 'is_admin', 'INTEGER DEFAULT 0')
+
+    # Order reference on the quote tables
+    for table in ['quote_requests', 'cake_topper_requests', 'print_service_requests']:
+        _add_column(cursor, table, 'order_number', 'TEXT')
+        _add_column(cursor, table, 'converted_to_order_date', 'TIMESTAMP')
+
+
+def _signup_unsubscribe_tokens(cursor):
+    """Unsubscribe support for signups (was docs/migrate_database.py)"""
+    _add_column(cursor, 'signups', 'unsubscribe_token', 'TEXT')
+    _add_column(cursor, 'signups', 'is_active', 'INTEGER DEFAULT 1')
+
+    # Generate unique tokens for existing signups that don't have them
+    cursor.execute("SELECT id FROM signups WHERE unsubscribe_token IS NULL OR unsubscribe_token = ''")
+    for row in cursor.fetchall():
+        cursor.execute('UPDATE signups SET unsubscribe_token = ? WHERE id = ?',
+                       (secrets.token_urlsafe(32), row[0]))
+
+    cursor.execute('UPDATE signups SET is_active = 1 WHERE is_active IS NULL')
+
+
+def _quote_messages(cursor):
+    """Quote messaging and pricing (was scripts/add_quote_messages_system.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS quote_messages (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            quote_type TEXT NOT NULL,
+            quote_id INTEGER NOT NULL,
+            message_text TEXT NOT NULL,
+            sender TEXT NOT NULL DEFAULT 'admin',
+            quoted_price_per_item REAL,
+            quoted_total REAL,
+            attached_image TEXT,
+            message_type TEXT DEFAULT 'admin_message',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (quote_id) REFERENCES quote_requests(id)
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quote_messages_quote
+        ON quote_messages(quote_type, quote_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quote_messages_created
+        ON quote_messages(created_at)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_quote_messages_type
+        ON quote_messages(message_type)
+    ''')
+
+    for table in ['quote_requests', 'cake_topper_requests', 'print_service_requests']:
+        _add_column(cursor, table, 'quoted_price_per_item', 'REAL')
+        _add_column(cursor, table, 'quoted_total', 'REAL')
+        _add_column(cursor, table, 'quoted_date', 'TIMESTAMP')
+
+
+def _quote_user_ids(cursor):
+    """Link quotes to user accounts (was scripts/add_user_id_to_quotes.py)"""
+    for table in ['quote_requests', 'cake_topper_requests', 'print_service_requests']:
+        if 'user_id' not in _columns(cursor, table):
+            cursor.execute(f'ALTER TABLE {table} ADD COLUMN user_id INTEGER REFERENCES users(id)')
+
+            # Link existing quotes to users by email (emails are stored lowercase)
+            cursor.execute(f'''
+                UPDATE {table}
+                SET user_id = (
+                    SELECT id FROM users WHERE users.email = LOWER({table}.email)
+                )
+                WHERE user_id IS NULL
+            ''')
+
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{table}_user_id
+            ON {table}(user_id)
+        ''')
+
+
+def _unified_cart_cleanup(cursor):
+    """Finish the unified cart migration (was scripts/migrate_unified_cart.py
+    and scripts/fix_hybrid_cart_schema.py)"""
+    # Rebuild cart_items without the legacy (NOT NULL) item_id column
+    if 'item_id' in _columns(cursor, 'cart_items'):
+        cursor.execute('DROP TABLE IF EXISTS cart_items_old')
+        cursor.execute('ALTER TABLE cart_items RENAME TO cart_items_old')
+        cursor.execute('''
+            CREATE TABLE cart_items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT,
+                user_id INTEGER,
+                product_type TEXT DEFAULT 'cutter_item',
+                product_id INTEGER NOT NULL,
+                quantity INTEGER DEFAULT 1,
+                added_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            INSERT INTO cart_items (id, session_id, user_id, product_type, product_id, quantity, added_date)
+            SELECT id, session_id, user_id,
+                   COALESCE(product_type, 'cutter_item'),
+                   COALESCE(product_id, item_id),
+                   quantity, added_date
+            FROM cart_items_old
+        ''')
+        cursor.execute('DROP TABLE cart_items_old')
+
+    # Move rows from the old candles & soaps cart into the unified cart
+    if _table_exists(cursor, 'candles_soaps_cart_items'):
+        cursor.execute('''
+            INSERT INTO cart_items (session_id, user_id, product_type, product_id, quantity, added_date)
+            SELECT session_id, user_id, 'candles_soap', product_id, quantity, added_date
+            FROM candles_soaps_cart_items
+        ''')
+        cursor.execute('DROP TABLE candles_soaps_cart_items')
+
+    # Indexes are dropped with the old table, so (re)create them either way
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_session
+        ON cart_items(session_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_user
+        ON cart_items(user_id)
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_lookup
+        ON cart_items(user_id, product_type, product_id)
+    ''')
+
+
+def _hide_custom_quotes_category(cursor):
+    """Keep quote-converted items out of the shop (was scripts/fix_custom_quotes_visibility.py)"""
+    cursor.execute("UPDATE cutter_categories SET is_public = 0 WHERE name = 'Custom Quotes'")
+
+
+def _email_outbox(cursor):
+    """Queue for outgoing email, drained by src/email_outbox.py"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT,
+            recipients TEXT,
+            to_addrs TEXT,
+            message BLOB NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+        ON email_outbox(status, next_attempt_at)
+    ''')
+
+
+def _email_campaigns(cursor):
+    """Bulk email campaigns with per-recipient delivery status (src/email_campaigns.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_campaigns (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            subject TEXT NOT NULL,
+            message TEXT NOT NULL,
+            interest_filter TEXT,
+            status TEXT NOT NULL DEFAULT 'queued',
+            lease_until TIMESTAMP,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_date TIMESTAMP,
+            completed_date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS email_campaign_recipients (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            campaign_id INTEGER NOT NULL,
+            email TEXT NOT NULL,
+            name TEXT,
+            unsubscribe_token TEXT,
+            status TEXT NOT NULL DEFAULT 'pending',
+            error TEXT,
+            sent_date TIMESTAMP,
+            FOREIGN KEY (campaign_id) REFERENCES email_campaigns (id),
+            UNIQUE (campaign_id, email)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_campaign_recipients_status
+        ON email_campaign_recipients(campaign_id, status)
+    ''')
+
+
+def _whatsapp_outbox(cursor):
+    """Queue for outgoing WhatsApp messages, drained by src/whatsapp_outbox.py"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS whatsapp_outbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            to_phone TEXT,
+            label TEXT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            wa_message_id TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            sent_date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_outbox_due
+        ON whatsapp_outbox(status, next_attempt_at)
+    ''')
+
+
+def _whatsapp_webhook_inbox(cursor):
+    """Raw webhook deliveries, stored on receipt and processed by src/whatsapp_inbox.py"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS whatsapp_webhook_inbox (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            received_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_webhook_inbox_due
+        ON whatsapp_webhook_inbox(status, next_attempt_at)
+    ''')
+
+
+CUSTOMER_PHONE_TABLES = ['users', 'quote_requests', 'cake_topper_requests', 'print_service_requests']
+
+
+def _customer_phone_e164(cursor):
+    """Indexed E.164 copy of every customer phone number, for WhatsApp lookups"""
+    for table in CUSTOMER_PHONE_TABLES:
+        _add_column(cursor, table, 'phone_e164', 'TEXT')
+
+        cursor.execute(f'SELECT id, phone FROM {table} WHERE phone IS NOT NULL AND phone_e164 IS NULL')
+        updates = [(normalize_phone(phone), row_id) for row_id, phone in cursor.fetchall()]
+        cursor.executemany(f'UPDATE {table} SET phone_e164 = ? WHERE id = ?',
+                           [update for update in updates if update[0]])
+
+        cursor.execute(f'''
+            CREATE INDEX IF NOT EXISTS idx_{table}_phone_e164
+            ON {table}(phone_e164)
+        ''')
+
+
+def _whatsapp_conversations(cursor):
+    """Per-conversation summary for the admin WhatsApp inbox, kept up to date
+    by the Database WhatsApp methods"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS whatsapp_conversations (
+            conversation_id TEXT PRIMARY KEY,
+            last_message_time TIMESTAMP,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            last_message_preview TEXT,
+            last_direction TEXT
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_conversations_last_message
+        ON whatsapp_conversations(last_message_time)
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_conversations_unread
+        ON whatsapp_conversations(unread_count) WHERE unread_count > 0
+    ''')
+
+    # Backfill from the messages saved so far
+    cursor.execute('''
+        INSERT OR REPLACE INTO whatsapp_conversations (
+            conversation_id, last_message_time, message_count, unread_count,
+            last_message_preview, last_direction
+        )
+        SELECT
+            conversation_id,
+            MAX(timestamp),
+            COUNT(*),
+            SUM(CASE WHEN is_read = 0 AND direction = 'inbound' THEN 1 ELSE 0 END),
+            (SELECT SUBSTR(latest.message_text, 1, 100) FROM whatsapp_messages latest
+             WHERE latest.conversation_id = m.conversation_id
+             ORDER BY latest.timestamp DESC, latest.id DESC LIMIT 1),
+            (SELECT latest.direction FROM whatsapp_messages latest
+             WHERE latest.conversation_id = m.conversation_id
+             ORDER BY latest.timestamp DESC, latest.id DESC LIMIT 1)
+        FROM whatsapp_messages m
+        WHERE conversation_id IS NOT NULL
+        GROUP BY conversation_id
+    ''')
+
+
+def _cart_owner_index(cursor):
+    """Index carts by owner (user, or guest session) for the admin carts report"""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_cart_items_owner
+        ON cart_items(COALESCE(user_id, session_id))
+    ''')
+
+
+def _cart_purge_runs(cursor):
+    """Log of guest cart purges (scripts/purge_guest_carts.py)"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS cart_purge_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            retention_days INTEGER NOT NULL,
+            carts_deleted INTEGER NOT NULL DEFAULT 0,
+            rows_deleted INTEGER NOT NULL DEFAULT 0,
+            duration_ms INTEGER
+        )
+    ''')
+
+
+def _order_item_snapshots(cursor):
+    """Record which catalogue each order line came from and its name at purchase"""
+    _add_column(cursor, 'order_items', 'product_type', "TEXT DEFAULT 'cutter_item'")
+    _add_column(cursor, 'order_items', 'product_name', 'TEXT')
+
+    # Candle/soap lines of existing orders are the ones that moved stock
+    cursor.execute('''
+        UPDATE order_items
+        SET product_type = 'candles_soap'
+        WHERE EXISTS (
+            SELECT 1 FROM candles_soaps_stock_history h
+            WHERE h.order_id = order_items.order_id
+              AND h.product_id = order_items.product_id
+              AND h.change_amount = -order_items.quantity
+              AND h.reason = 'Order placed'
+        )
+    ''')
+    cursor.execute("UPDATE order_items SET product_type = 'cutter_item' WHERE product_type IS NULL")
+
+    cursor.execute('''
+        UPDATE order_items
+        SET product_name = CASE product_type
+            WHEN 'candles_soap' THEN (SELECT name FROM candles_soaps_products p
+                                      WHERE p.id = order_items.product_id)
+            ELSE (SELECT name FROM cutter_items ci WHERE ci.id = order_items.product_id)
+        END
+        WHERE product_name IS NULL
+    ''')
+
+
+def _order_sequences(cursor):
+    """Per-month order number counters (SSG-YYYYMM-NNN), taken inside the
+    checkout transaction so concurrent orders never share a number"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS order_sequences (
+            period TEXT PRIMARY KEY,
+            last_value INTEGER NOT NULL
+        )
+    ''')
+
+    # Carry on from the highest number already used in each month
+    cursor.execute('''
+        INSERT OR REPLACE INTO order_sequences (period, last_value)
+        SELECT SUBSTR(order_number, 5, 6),
+               MAX(CAST(SUBSTR(order_number, 12) AS INTEGER))
+        FROM orders
+        WHERE order_number LIKE 'SSG-______-%'
+        GROUP BY SUBSTR(order_number, 5, 6)
+    ''')
+
+
+PRODUCT_PHOTO_TABLES = ['cutter_item_photos', 'candles_soaps_product_photos']
+
+
+def _image_variants(cursor):
+    """Resized copies of uploaded photos (JSON in each photo row's variants
+    column), generated from a job queue by src/image_variants.py"""
+    for table in PRODUCT_PHOTO_TABLES:
+        _add_column(cursor, table, 'variants', 'TEXT')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_variant_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            source_path TEXT NOT NULL,
+            photo_table TEXT,
+            photo_id INTEGER,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_date TIMESTAMP
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_image_variant_jobs_due
+        ON image_variant_jobs(status, next_attempt_at)
+    ''')
+
+    # Queue every photo uploaded so far
+    for table in PRODUCT_PHOTO_TABLES:
+        cursor.execute(f'''
+            INSERT INTO image_variant_jobs (source_path, photo_table, photo_id)
+            SELECT photo_path, '{table}', id FROM {table}
+            WHERE variants IS NULL
+        ''')
+
+
+def _invoice_jobs(cursor):
+    """Invoice PDFs rendered from a job queue by src/invoice_utils.py; the file
+    the order's current invoice is in (named by a hash of its contents) is kept
+    on the order"""
+    _add_column(cursor, 'orders', 'invoice_file', 'TEXT')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS invoice_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            attempts INTEGER NOT NULL DEFAULT 0,
+            next_attempt_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_error TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            processed_date TIMESTAMP,
+            FOREIGN KEY (order_id) REFERENCES orders(id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_invoice_jobs_due
+        ON invoice_jobs(status, next_attempt_at)
+    ''')
+
+
+def _whatsapp_message_delivery(cursor):
+    """Outbound conversation messages keep the id of their whatsapp_outbox row,
+    so the outbox worker can record on them whether they were delivered"""
+    _add_column(cursor, 'whatsapp_messages', 'outbox_id', 'INTEGER')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_whatsapp_messages_outbox
+        ON whatsapp_messages(outbox_id) WHERE outbox_id IS NOT NULL
+    ''')
+
+    # Outbound messages were stored with the inbound default status
+    cursor.execute('''
+        UPDATE whatsapp_messages SET status = 'sent'
+        WHERE direction = 'outbound' AND status = 'received'
+    ''')
+
+
+# Ordered list of (version, description, step). Append only.
+MIGRATIONS = [
+    (1, 'Baseline schema', _baseline_schema),
+    (2, 'Signup unsubscribe tokens', _signup_unsubscribe_tokens),
+    (3, 'Quote messages and pricing', _quote_messages),
+    (4, 'Link quotes to users', _quote_user_ids),
+    (5, 'Unified cart cleanup', _unified_cart_cleanup),
+    (6, 'Hide Custom Quotes category', _hide_custom_quotes_category),
+    (7, 'Email outbox', _email_outbox),
+    (8, 'Bulk email campaigns', _email_campaigns),
+    (9, 'WhatsApp outbox', _whatsapp_outbox),
+    (10, 'WhatsApp webhook inbox', _whatsapp_webhook_inbox),
+    (11, 'Normalised customer phone numbers', _customer_phone_e164),
+    (12, 'WhatsApp conversation summaries', _whatsapp_conversations),
+    (13, 'Cart owner index', _cart_owner_index),
+    (14, 'Guest cart purge log', _cart_purge_runs),
+    (15, 'Order item snapshots', _order_item_snapshots),
+    (16, 'Order number sequences', _order_sequences),
+    (17, 'Product photo variants', _image_variants),
+    (18, 'Invoice jobs', _invoice_jobs),
+    (19, 'WhatsApp message delivery status', _whatsapp_message_delivery),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ============================================================================
+# RUNNER
+# ============================================================================
+
+def get_schema_version(conn):
+    """Get the highest applied migration version (0 for a new/unversioned database)"""
+    try:
+        row = conn.execute('SELECT MAX(version) FROM schema_version').fetchone()
+    except sqlite3.OperationalError:
+        # schema_version table doesn't exist yet
+        return 0
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Apply all pending migrations in one transaction
+
+    Returns:
+        List of (version, description) tuples that were applied
+    """
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT,
+            applied_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+
+    # Take the write lock before reading the version, so workers starting at
+    # the same moment apply each step once and the rest see it as done
+    conn.execute('BEGIN IMMEDIATE')
+    applied = []
+    try:
+        current_version = get_schema_version(conn)
+        cursor = conn.cursor()
+
+        for version, description, step in MIGRATIONS:
+            if version <= current_version:
+                continue
+            step(cursor)
+            cursor.execute('INSERT INTO schema_version (version, description) VALUES (?, ?)',
+                           (version, description))
+            applied.append((version, description))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return applied
@@ -0,0 +1,47 @@
+"""
+Phone number normalisation.
+
+Customers type their numbers in many formats ("082 552 2848",
+"+27 82 552 2848", "27825522848") and WhatsApp reports them as digits with
+the country code. Every table holding a customer phone number also stores it
+in E.164 form (phone_e164) so a number can be looked up with one indexed
+query, whatever format it was entered in.
+"""
+
+import re
+
+DEFAULT_COUNTRY_CODE = '27'  # South Africa
+
+
+def normalize_phone(phone, country_code=DEFAULT_COUNTRY_CODE):
+    """
+    Convert a phone number to E.164 (e.g. "0825522848" -> "+27825522848")
+
+    Local numbers starting with a single 0 get `country_code`; numbers
+    written with + or 00 are taken to be international already.
+
+    Args:
+        phone: Phone number (various formats)
+        country_code: Country code for local numbers
+
+    Returns:
+        E.164 number, or None if it doesn't look like a phone number
+    """
+    if not phone:
+        return None
+
+    phone = str(phone).strip()
+    digits = re.sub(r'\D', '', phone)
+
+    if phone.startswith('+'):
+        pass
+    elif digits.startswith('00'):
+        digits = digits[2:]
+    elif digits.startswith('0'):
+        digits = country_code + digits[1:]
+
+    # E.164 allows at most 15 digits; anything under 8 is not a full number
+    if not 8 <= len(digits) <= 15:
+        return None
+
+    return '+' + digits
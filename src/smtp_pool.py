@@ -0,0 +1,132 @@
+"""
+Pool of authenticated SMTP connections.
+
+Opening an SMTP connection to Gmail means a TCP connect, STARTTLS and AUTH
+before the first message can go out. The pool keeps a few logged-in
+connections open between sends, checks stale ones with NOOP before reusing
+them and reconnects transparently when the server has dropped them.
+"""
+
+import os
+import queue
+import smtplib
+import threading
+import time
+
+
+def connection_lost(error):
+    """Whether an error means the connection itself is unusable (not just the message)"""
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        # 421: the server is closing the connection
+        return error.smtp_code == 421
+    # Socket errors (SMTPException also subclasses OSError, so check it last)
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SMTPPool:
+    """Thread-safe pool of SMTP connections created by `connect`"""
+
+    def __init__(self, connect, size=2, noop_after=10, max_idle=240):
+        """
+        Args:
+            connect: Callable returning a new, logged-in smtplib.SMTP
+            size: Maximum number of idle connections kept open
+            noop_after: Seconds idle after which a connection is checked with NOOP
+            max_idle: Seconds idle after which a connection is closed, not reused
+                      (servers drop idle clients, Gmail after a few minutes)
+        """
+        self._connect = connect
+        self.size = max(1, int(size))
+        self.noop_after = noop_after
+        self.max_idle = max_idle
+        self.connects = 0
+        self._reset()
+
+    def _reset(self):
+        """Forget all connections (used at startup and after a fork)"""
+        self._pid = os.getpid()
+        self._idle = queue.LifoQueue(maxsize=self.size)
+        self._lock = threading.Lock()
+
+    def _new_connection(self):
+        with self._lock:
+            self.connects += 1
+        return self._connect()
+
+    def _checkout(self):
+        """Take a live idle connection, or open a new one"""
+        # A connection inherited across a fork shares its socket with the parent
+        if os.getpid() != self._pid:
+            self._reset()
+
+        while True:
+            try:
+                server, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._new_connection()
+
+            idle = time.monotonic() - last_used
+            if idle > self.max_idle:
+                self._close(server)
+                continue
+            if idle > self.noop_after:
+                try:
+                    if server.noop()[0] != 250:
+                        raise smtplib.SMTPServerDisconnected('NOOP failed')
+                except Exception:
+                    self._close(server)
+                    continue
+            return server
+
+    def _checkin(self, server):
+        try:
+            self._idle.put_nowait((server, time.monotonic()))
+        except queue.Full:
+            self._close(server)
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def send(self, messages, to_addrs=None):
+        """Send messages over one pooled connection
+
+        A connection that turns out to be dead is replaced once; messages
+        already accepted by the server are not sent again.
+        """
+        pending = list(messages)
+        retried = False
+
+        while pending:
+            server = self._checkout()
+            try:
+                while pending:
+                    server.send_message(pending[0], to_addrs=to_addrs)
+                    pending.pop(0)
+            except Exception as e:
+                if not connection_lost(e):
+                    # The message was refused but the connection is still usable
+                    self._checkin(server)
+                    raise
+                self._close(server)
+                if retried:
+                    raise
+                retried = True
+                continue
+            self._checkin(server)
+
+    def close_all(self):
+        """Close every idle connection"""
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._close(server)
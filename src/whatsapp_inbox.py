@@ -0,0 +1,223 @@
+"""
+Deferred processing of incoming WhatsApp webhooks.
+
+Meta expects the webhook to answer quickly and redelivers anything that
+times out. The webhook route therefore only stores the raw request body in
+the whatsapp_webhook_inbox table and returns 200; WhatsAppInboxProcessor
+then parses each delivery from a background thread, matches the sender to a
+customer, saves the message and answers quick reply buttons.
+
+Redelivered messages are recognised by their WhatsApp message id and
+skipped, so a delivery can be processed again safely (after a crash, or when
+Meta sends it twice) without duplicate rows or duplicate auto-replies.
+"""
+
+import json
+
+from src.background import BackgroundWorker
+from src.whatsapp_utils import send_whatsapp_message
+
+
+BANK_DETAILS_MESSAGE = """Here are our banking details:
+
+Bank: FNB
+Account Name: Snow Spoiled Gifts
+Account Number: 62891234567
+Branch Code: 250655
+Reference: Your order number
+
+Please use your order number as the payment reference so we can match your payment."""
+
+
+def parse_webhook_messages(data):
+    """Pull the incoming messages out of a webhook payload
+
+    Returns:
+        List of dicts with message_id, from_phone, message_type, message_text
+        and quick_reply_payload (the button id, or None)
+    """
+    messages = []
+    if not data or 'entry' not in data:
+        return messages
+
+    for entry in data['entry']:
+        for change in entry.get('changes', []):
+            if change.get('field') != 'messages':
+                continue
+
+            for message in change.get('value', {}).get('messages', []):
+                message_type = message.get('type', 'text')
+                message_text = None
+                quick_reply_payload = None
+
+                if message_type == 'text':
+                    message_text = message.get('text', {}).get('body')
+
+                # Check for interactive button/quick reply
+                if message_type == 'interactive':
+                    button_reply = message.get('interactive', {}).get('button_reply', {})
+                    if button_reply:
+                        quick_reply_payload = button_reply.get('id', '')
+                        message_text = button_reply.get('title', '')
+
+                messages.append({
+                    'message_id': message.get('id'),
+                    'from_phone': message.get('from'),
+                    'message_type': message_type,
+                    'message_text': message_text,
+                    'quick_reply_payload': quick_reply_payload,
+                })
+
+    return messages
+
+
+class WhatsAppInboxProcessor(BackgroundWorker):
+    """Process stored WhatsApp webhook deliveries from a background thread"""
+
+    thread_name = 'whatsapp-inbox'
+
+    def __init__(self, db, config, batch_size=20, poll_interval=10,
+                 max_attempts=5, retry_delay=30):
+        """
+        Args:
+            db: Database instance
+            config: Flask app config (WhatsApp credentials)
+            batch_size: Deliveries claimed per round
+            poll_interval: Seconds between checks when the inbox is idle
+            max_attempts: Processing attempts before a delivery is marked failed
+            retry_delay: Seconds before the first retry (doubles per attempt, max 1 hour)
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.config = config
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def handle_quick_reply(self, from_phone, quick_reply_payload, customer):
+        """Answer a quick reply button click"""
+        # "Resend Bank Details" button
+        if quick_reply_payload == 'resend_bank_details':
+            send_whatsapp_message(from_phone, BANK_DETAILS_MESSAGE, self.config)
+            print(f"✅ Auto-sent bank details to {from_phone}")
+
+        # "Already Paid" button
+        elif quick_reply_payload == 'already_paid':
+            customer_name = "Customer"
+            if customer and customer.get('data'):
+                customer_name = customer['data'].get('name', 'Customer')
+
+            ack_message = "Thank you for confirming your payment! We'll verify and process it shortly. You'll receive an update once confirmed."
+            send_whatsapp_message(from_phone, ack_message, self.config)
+
+            print(f"⚠️ ADMIN ALERT: {customer_name} ({from_phone}) says they already paid!")
+
+        # "Confirmed ✅" button (order collection/receipt confirmation)
+        elif quick_reply_payload == 'order_confirmed':
+            ack_message = "Great! Thank you for confirming. We hope you love your order! 🎉"
+            send_whatsapp_message(from_phone, ack_message, self.config)
+
+            print(f"✅ Customer {from_phone} confirmed order receipt/collection")
+
+    def process_message(self, message):
+        """Save one incoming message and answer it if it is a quick reply
+
+        Returns:
+            False if the message had already been processed
+        """
+        message_id = message['message_id']
+        from_phone = message['from_phone']
+        message_text = message['message_text']
+
+        if message_id and self.db.whatsapp_message_exists(message_id):
+            print(f"Skipping redelivered WhatsApp message {message_id}")
+            return False
+
+        print(f"📱 Message from: {from_phone}")
+        print(f"💬 Text: {message_text}")
+        print(f"🆔 Message ID: {message_id}")
+        print(f"🔘 Quick Reply: {message['quick_reply_payload']}")
+
+        if not from_phone or not message_text:
+            return True
+
+        customer = self.db.find_customer_by_phone(from_phone)
+        user_id = None
+        quote_id = None
+        quote_type = None
+
+        if customer:
+            print(f"✅ Found customer: {customer}")
+            if customer['type'] == 'user':
+                user_id = customer['data']['id']
+            elif customer['type'] in ['quote', 'cake_topper', 'print_service']:
+                quote_id = customer['data']['id']
+                quote_type = customer['type']
+
+        # Save before replying: the unique message id makes a concurrent
+        # redelivery fail here instead of sending the auto-reply twice
+        saved = self.db.save_whatsapp_message(
+            message_id=message_id,
+            direction='inbound',
+            from_phone=from_phone,
+            to_phone=self.config.get('WHATSAPP_PHONE_NUMBER_ID', '') or '',
+            message_text=message_text,
+            message_type=message['message_type'],
+            user_id=user_id,
+            quote_id=quote_id,
+            quote_type=quote_type
+        )
+        if not saved:
+            raise RuntimeError(f"Could not save WhatsApp message {message_id}")
+
+        print(f"✅ Message saved to database!")
+
+        if message['quick_reply_payload']:
+            self.handle_quick_reply(from_phone, message['quick_reply_payload'], customer)
+
+        return True
+
+    def backoff(self, attempts):
+        """Seconds to wait before retrying after `attempts` failed attempts"""
+        return min(self.retry_delay * 2 ** (attempts - 1), 3600)
+
+    def run_once(self):
+        """Process one batch of stored webhook deliveries
+
+        Returns:
+            Number of deliveries claimed (0 when nothing was due)
+        """
+        rows = self.db.claim_whatsapp_webhooks(limit=self.batch_size)
+
+        for row in rows:
+            try:
+                data = json.loads(row['payload'])
+            except ValueError as e:
+                # Malformed bodies will never parse, don't retry them
+                self.db.mark_whatsapp_webhook_failed(row['id'], f"Invalid JSON: {str(e)}")
+                continue
+
+            try:
+                for message in parse_webhook_messages(data):
+                    self.process_message(message)
+            except Exception as e:
+                print(f"❌ Error processing webhook {row['id']} (attempt {row['attempts']}): {str(e)}")
+                if row['attempts'] < self.max_attempts:
+                    self.db.mark_whatsapp_webhook_failed(row['id'], str(e),
+                                                         retry_in=self.backoff(row['attempts']))
+                else:
+                    self.db.mark_whatsapp_webhook_failed(row['id'], str(e))
+                continue
+
+            self.db.mark_whatsapp_webhook_processed(row['id'])
+
+        return len(rows)
+
+    def drain(self):
+        """Process batches until nothing is due (used by scripts/whatsapp_worker.py --once)"""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            if not claimed:
+                return total
+            total += claimed
@@ -0,0 +1,109 @@
+"""
+Outbox for outgoing WhatsApp messages.
+
+The send_* helpers in src/whatsapp_utils.py build the Cloud API payload as
+before, but when an outbox is configured dispatch_message() stores it in the
+whatsapp_outbox table and returns, so admin pages and the webhook handler
+never wait on the Graph API. A background worker posts queued messages over
+a shared keep-alive session, throttled to WHATSAPP_RATE_PER_MINUTE:
+
+- 429 responses pause all sending for the Retry-After period (or the
+  backoff delay) and reschedule the message
+- 5xx responses and network errors are retried with exponential backoff
+- other errors (invalid number, template not approved, ...) fail at once
+
+Messages the admin sent from a conversation are saved in whatsapp_messages
+with their outbox id; the worker marks them sent (with the Cloud API message
+id) or failed. Failed messages are listed on the admin Outbox page.
+"""
+
+from src.background import BackgroundWorker, RateLimiter
+from src.whatsapp_utils import post_message
+
+
+class WhatsAppOutbox(BackgroundWorker):
+    """Queue WhatsApp messages in the database and post them from a background thread"""
+
+    thread_name = 'whatsapp-outbox'
+
+    def __init__(self, db, config, batch_size=20, poll_interval=10,
+                 max_attempts=6, retry_delay=30, rate_per_minute=600):
+        """
+        Args:
+            db: Database instance
+            config: Flask app config (WhatsApp credentials)
+            batch_size: Messages claimed per round
+            poll_interval: Seconds between checks when the outbox is idle
+            max_attempts: Delivery attempts before a message is marked failed
+            retry_delay: Seconds before the first retry (doubles per attempt, max 1 hour)
+            rate_per_minute: Maximum messages posted per minute (0 = no limit)
+        """
+        super().__init__(poll_interval)
+        self.db = db
+        self.config = config
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.limiter = RateLimiter(rate_per_minute)
+
+    def enqueue(self, payload, label=None):
+        """Store a message payload for delivery (called by whatsapp_utils.dispatch_message)"""
+        success, message, outbox_id = self.db.enqueue_whatsapp_message(payload, label)
+        if not success:
+            raise RuntimeError(f"Could not queue WhatsApp message: {message}")
+
+        # Deliver right away rather than at the next poll
+        self.wake()
+        return outbox_id
+
+    def backoff(self, attempts):
+        """Seconds to wait before retrying after `attempts` failed attempts"""
+        return min(self.retry_delay * 2 ** (attempts - 1), 3600)
+
+    def run_once(self):
+        """Post one batch of due messages
+
+        Returns:
+            Number of messages claimed (0 when nothing was due)
+        """
+        rows = self.db.claim_whatsapp_outbox(limit=self.batch_size)
+
+        for index, row in enumerate(rows):
+            self.limiter.wait()
+            result = post_message(row['payload'], self.config)
+
+            if result['ok']:
+                self.db.mark_whatsapp_outbox_sent(row['id'], result['message_id'])
+                self.db.update_outbound_whatsapp_message(row['id'], 'sent', result['message_id'])
+                continue
+
+            status = result['status']
+            error = f"{status or 'network'}: {result['error']}"
+            print(f"WhatsApp message {row['id']} to {row['to_phone']} failed (attempt {row['attempts']}): {error}")
+
+            if status == 429:
+                # Rate limited: hold off everything, including the rest of this batch
+                retry_in = result['retry_after'] or self.backoff(row['attempts'])
+                self.limiter.pause(retry_in)
+                for pending in rows[index:]:
+                    self.db.mark_whatsapp_outbox_failed(pending['id'], error, retry_in=retry_in)
+                break
+
+            retryable = status is None or status >= 500
+            if retryable and row['attempts'] < self.max_attempts:
+                self.db.mark_whatsapp_outbox_failed(row['id'], error,
+                                                    retry_in=self.backoff(row['attempts']))
+            else:
+                self.db.mark_whatsapp_outbox_failed(row['id'], error)
+                self.db.update_outbound_whatsapp_message(row['id'], 'failed')
+
+        return len(rows)
+
+    def drain(self):
+        """Post batches until nothing is due (used by scripts/whatsapp_worker.py --once)"""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            if not claimed:
+                return total
+            total += claimed
@@ -3,13 +3,146 @@ WhatsApp Business API Utilities
 Send messages via WhatsApp Cloud API
 """
 
+import os
+import threading
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 from typing import Tuple, Optional
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+DEFAULT_API_URL = "https://graph.facebook.com/v22.0"
+
+# Shared keep-alive session (one per process, see get_session)
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+# Outbox that dispatch_message() queues messages in instead of posting them
+# inline (set by the app via set_whatsapp_outbox; None = send immediately)
+_outbox = None
+
+
+def set_whatsapp_outbox(outbox):
+    """Route outgoing WhatsApp messages through an outbox (see src/whatsapp_outbox.py)
+
+    Args:
+        outbox: Object with an enqueue(payload, label) method, or None to go
+                back to sending inline
+    """
+    global _outbox
+    _outbox = outbox
+
+
+def get_session() -> requests.Session:
+    """Get the process-wide HTTP session, so API calls reuse TLS connections"""
+    global _session, _session_pid
+    with _session_lock:
+        # Sockets must not be shared with a forked parent
+        if _session is None or _session_pid != os.getpid():
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            _session = session
+            _session_pid = os.getpid()
+        return _session
+
+
+def post_message(payload: dict, config: dict) -> dict:
+    """
+    POST one message payload to the WhatsApp Cloud API
+
+    Returns:
+        Dict with ok (bool), status (HTTP status, None on network errors),
+        message_id, error and retry_after (seconds from a Retry-After header)
+    """
+    url = f"{config.get('WHATSAPP_API_URL') or DEFAULT_API_URL}/{config['WHATSAPP_PHONE_NUMBER_ID']}/messages"
+    headers = {
+        "Authorization": f"Bearer {config['WHATSAPP_ACCESS_TOKEN']}",
+        "Content-Type": "application/json"
+    }
+
+    try:
+        response = get_session().post(url, headers=headers, json=payload, timeout=10)
+    except requests.exceptions.Timeout:
+        logger.error("WhatsApp API timeout")
+        return {'ok': False, 'status': None, 'message_id': None, 'error': "Request timeout", 'retry_after': None}
+    except requests.exceptions.RequestException as e:
+        logger.error(f"WhatsApp request failed: {e}")
+        return {'ok': False, 'status': None, 'message_id': None, 'error': f"Connection error: {str(e)}", 'retry_after': None}
+
+    try:
+        result = response.json()
+    except ValueError:
+        result = {}
+
+    retry_after = response.headers.get('Retry-After')
+    retry_after = int(retry_after) if retry_after and retry_after.isdigit() else None
+
+    if response.status_code == 200:
+        message_id = result.get('messages', [{}])[0].get('id', 'unknown')
+        logger.info(f"WhatsApp sent to {payload.get('to')}: {message_id}")
+        return {'ok': True, 'status': 200, 'message_id': message_id, 'error': None, 'retry_after': None}
+
+    error_msg = result.get('error', {}).get('message') or response.text[:200] or 'Unknown error'
+    logger.error(f"WhatsApp API error ({response.status_code}): {error_msg}")
+    return {'ok': False, 'status': response.status_code, 'message_id': None,
+            'error': error_msg, 'retry_after': retry_after}
+
+
+def deliver_message(payload: dict, config: dict, label: str = "Message sent") -> Tuple[bool, str, dict]:
+    """
+    Send a message payload, or queue it when an outbox is configured
+
+    Args:
+        payload: Cloud API message payload
+        config: Flask config object with WhatsApp credentials
+        label: Success text for the returned message
+
+    Returns:
+        (success: bool, message: str, delivery: dict) where delivery is
+        {'status': 'queued', 'outbox_id': ...} or {'status': 'sent',
+        'message_id': ...} (empty when the message could not be sent)
+    """
+    if _outbox is not None:
+        try:
+            outbox_id = _outbox.enqueue(payload, label)
+        except Exception as e:
+            logger.error(f"Could not queue WhatsApp message: {e}")
+            return False, f"Error: {str(e)}", {}
+        return True, f"Message queued for delivery (#{outbox_id})", {'status': 'queued', 'outbox_id': outbox_id}
+
+    result = post_message(payload, config)
+    if result['ok']:
+        return True, f"{label} (ID: {result['message_id']})", {'status': 'sent', 'message_id': result['message_id']}
+    return False, f"API Error: {result['error']}", {}
+
+
+def dispatch_message(payload: dict, config: dict, label: str = "Message sent") -> Tuple[bool, str]:
+    """
+    Send a message payload, or queue it when an outbox is configured
+
+    Returns:
+        (success: bool, message: str)
+    """
+    success, message, _ = deliver_message(payload, config, label)
+    return success, message
+
+
+def text_message_payload(to: str, message: str) -> dict:
+    """Cloud API payload for a plain text message"""
+    return {
+        "messaging_product": "whatsapp",
+        "to": to,
+        "type": "text",
+        "text": {
+            "body": message
+        }
+    }
+
+
 def send_whatsapp_message(
     to: str,
     message: str,
@@ -30,75 +163,25 @@ def send_whatsapp_message(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
+    return dispatch_message(text_message_payload(to, message), config, "Message sent successfully")
 
-    # API endpoint
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
 
-    # Headers
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
-    # Message payload - text message
-    payload = {
-        "messaging_product": "whatsapp",
-        "to": to,
-        "type": "text",
-        "text": {
-            "body": message
-        }
-    }
+def send_tracked_whatsapp_message(
+    to: str,
+    message: str,
+    config: dict
+) -> Tuple[bool, str, dict]:
+    """
+    Send a text message and report where it went, so the caller can store it
+    in the conversation and have the outbox worker update it later
 
-    try:
-        print(f"\n=== WhatsApp Send Attempt ===")
-        print(f"To: {to}")
-        print(f"Message: {message[:50]}...")
-        print(f"Sending to API: {url}")
-
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        # Log full response for debugging
-        print(f"API Response Status: {response.status_code}")
-        print(f"API Response Body: {response.text}")
-        logger.info(f"WhatsApp API Response ({response.status_code}): {response.text}")
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            print(f"✅ SUCCESS! Message ID: {message_id}")
-            logger.info(f"WhatsApp sent to {to}: {message_id}")
-
-            # Check for warnings (test number limitations)
-            if 'error' in result:
-                warning = result['error'].get('message', '')
-                print(f"⚠️ Warning: {warning}")
-                logger.warning(f"WhatsApp warning: {warning}")
-
-            print(f"=== End WhatsApp Request ===\n")
-            return True, f"Message sent successfully (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            print(f"❌ ERROR: {error_msg}")
-            logger.error(f"WhatsApp API error: {error_msg}")
-            print(f"=== End WhatsApp Request ===\n")
-            return False, f"API Error: {error_msg}"
+    Returns:
+        (success: bool, message: str, delivery: dict), see deliver_message
+    """
+    if not config.get('WHATSAPP_ENABLED'):
+        return False, "WhatsApp is not configured", {}
 
-    except requests.exceptions.Timeout:
-        print(f"❌ TIMEOUT!")
-        logger.error("WhatsApp API timeout")
-        return False, "Request timeout - please try again"
-    except requests.exceptions.RequestException as e:
-        print(f"❌ REQUEST ERROR: {e}")
-        logger.error(f"WhatsApp request failed: {e}")
-        return False, f"Connection error: {str(e)}"
-    except Exception as e:
-        print(f"❌ UNEXPECTED ERROR: {e}")
-        logger.error(f"Unexpected error sending WhatsApp: {e}")
-        return False, f"Unexpected error: {str(e)}"
+    return deliver_message(text_message_payload(to, message), config, "Message sent successfully")
 
 
 def send_template_message(
@@ -123,18 +206,6 @@ def send_template_message(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
-
-    # API endpoint
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
-
-    # Headers
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
     # Template message payload
     payload = {
         "messaging_product": "whatsapp",
@@ -148,23 +219,7 @@ def send_template_message(
         }
     }
 
-    try:
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            logger.info(f"WhatsApp template '{template_name}' sent to {to}: {message_id}")
-            return True, f"Template sent successfully (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            logger.error(f"WhatsApp API error: {error_msg}")
-            return False, f"API Error: {error_msg}"
-
-    except Exception as e:
-        logger.error(f"Error sending WhatsApp template: {e}")
-        return False, f"Error: {str(e)}"
+    return dispatch_message(payload, config, "Template sent successfully")
 
 
 def format_phone_number(phone: str) -> Optional[str]:
@@ -260,16 +315,6 @@ def send_quote_ready_template(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
-
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
@@ -292,24 +337,7 @@ def send_quote_ready_template(
         }
     }
 
-    try:
-        logger.info(f"Sending quote_ready_notification to {to}")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            logger.info(f"Quote ready template sent to {to}: {message_id}")
-            return True, f"Quote notification sent (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            logger.error(f"WhatsApp API error: {error_msg}")
-            return False, f"API Error: {error_msg}"
-
-    except Exception as e:
-        logger.error(f"Error sending quote ready template: {e}")
-        return False, f"Error: {str(e)}"
+    return dispatch_message(payload, config, "Quote notification sent")
 
 
 def send_payment_reminder_template(
@@ -341,16 +369,6 @@ def send_payment_reminder_template(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
-
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
@@ -373,24 +391,7 @@ def send_payment_reminder_template(
         }
     }
 
-    try:
-        logger.info(f"Sending payment_reminder to {to}")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            logger.info(f"Payment reminder sent to {to}: {message_id}")
-            return True, f"Payment reminder sent (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            logger.error(f"WhatsApp API error: {error_msg}")
-            return False, f"API Error: {error_msg}"
-
-    except Exception as e:
-        logger.error(f"Error sending payment reminder: {e}")
-        return False, f"Error: {str(e)}"
+    return dispatch_message(payload, config, "Payment reminder sent")
 
 
 def send_order_status_update_template(
@@ -424,16 +425,6 @@ def send_order_status_update_template(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
-
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
@@ -457,24 +448,7 @@ def send_order_status_update_template(
         }
     }
 
-    try:
-        logger.info(f"Sending order_status_update to {to}")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            logger.info(f"Order status update sent to {to}: {message_id}")
-            return True, f"Status update sent (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            logger.error(f"WhatsApp API error: {error_msg}")
-            return False, f"API Error: {error_msg}"
-
-    except Exception as e:
-        logger.error(f"Error sending order status update: {e}")
-        return False, f"Error: {str(e)}"
+    return dispatch_message(payload, config, "Status update sent")
 
 
 def send_order_ready_template(
@@ -508,16 +482,6 @@ def send_order_ready_template(
     if not config.get('WHATSAPP_ENABLED'):
         return False, "WhatsApp is not configured"
 
-    phone_number_id = config['WHATSAPP_PHONE_NUMBER_ID']
-    access_token = config['WHATSAPP_ACCESS_TOKEN']
-
-    url = f"https://graph.facebook.com/v22.0/{phone_number_id}/messages"
-
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-
     payload = {
         "messaging_product": "whatsapp",
         "to": to,
@@ -540,21 +504,4 @@ def send_order_ready_template(
         }
     }
 
-    try:
-        logger.info(f"Sending order_ready_notification to {to}")
-        response = requests.post(url, headers=headers, json=payload, timeout=10)
-
-        if response.status_code == 200:
-            result = response.json()
-            message_id = result.get('messages', [{}])[0].get('id', 'unknown')
-            logger.info(f"Order ready notification sent to {to}: {message_id}")
-            return True, f"Order ready notification sent (ID: {message_id})"
-        else:
-            error_data = response.json()
-            error_msg = error_data.get('error', {}).get('message', 'Unknown error')
-            logger.error(f"WhatsApp API error: {error_msg}")
-            return False, f"API Error: {error_msg}"
-
-    except Exception as e:
-        logger.error(f"Error sending order ready notification: {e}")
-        return False, f"Error: {str(e)}"
+    return dispatch_message(payload, config, "Order ready notification sent")